@@ -1,20 +1,34 @@
 """MaintenanceController."""
 
 # pylint: disable=invalid-name
+import asyncio
 from datetime import datetime
+import inspect
 import os
 import pytz
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from bson.codec_options import CodecOptions
 import pymongo
-from pymongo.errors import ConnectionFailure, ExecutionTimeout
-from tenacity import retry_if_exception_type, stop_after_attempt, wait_random
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:  # pymongo < 4.9
+    AsyncMongoClient = None
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random,
+)
 
 from kytos.core import log
 from kytos.core.db import Mongo
 from kytos.core.retry import before_sleep, for_all_methods, retries
+from napps.kytos.maintenance import metrics
 from napps.kytos.maintenance.models import (
+    MaintenanceFilter,
     MaintenanceWindow,
     MaintenanceWindows,
     MaintenanceID,
@@ -22,8 +36,15 @@ from napps.kytos.maintenance.models import (
 )
 
 
-@for_all_methods(
-    retries,
+def _before_sleep(retry_state):
+    """Count the retry of a method, then log it as kytos does."""
+    metrics.DB_RETRIES.inc(
+        method=getattr(retry_state.fn, "__name__", "unknown")
+    )
+    before_sleep(retry_state)
+
+
+_RETRY = dict(
     stop=stop_after_attempt(
         int(os.environ.get("MONGO_AUTO_RETRY_STOP_AFTER_ATTEMPT", 3))
     ),
@@ -31,9 +52,229 @@ from napps.kytos.maintenance.models import (
         min=int(os.environ.get("MONGO_AUTO_RETRY_WAIT_RANDOM_MIN", 0.1)),
         max=int(os.environ.get("MONGO_AUTO_RETRY_WAIT_RANDOM_MAX", 1)),
     ),
-    before_sleep=before_sleep,
+    before_sleep=_before_sleep,
     retry=retry_if_exception_type((ConnectionFailure, ExecutionTimeout)),
 )
+
+
+def _retry_coroutines(cls):
+    """Retry the public coroutine methods of a class as the kytos retries
+    do for methods, sleeping between attempts without blocking the loop."""
+    for name, func in list(vars(cls).items()):
+        if inspect.iscoroutinefunction(func) and not name.startswith("_"):
+            setattr(cls, name, retry(**_RETRY)(func))
+    return cls
+
+
+def _new_document(window: MaintenanceWindow, now: datetime) -> dict:
+    """DB document of a window inserted now."""
+    return {
+        **window.model_dump(exclude={'inserted_at', 'updated_at'}),
+        'inserted_at': now,
+        'updated_at': now,
+    }
+
+
+def _duplicate_ids(err: BulkWriteError, documents: list[dict]) -> list[MaintenanceID]:
+    """Get the IDs of the documents an unordered insert failed to insert
+    for being duplicates, raising err if it failed for other reasons."""
+    write_errors = err.details.get('writeErrors', [])
+    duplicates = [
+        documents[error['index']]['id']
+        for error in write_errors
+        if error['code'] == 11000
+    ]
+    if len(duplicates) != len(write_errors):
+        raise err
+    return duplicates
+
+
+def _replace_requests(windows: list[MaintenanceWindow]) -> list[ReplaceOne]:
+    """Bulk write requests inserting windows or replacing the existing
+    windows with the same ids."""
+    now = datetime.now(pytz.utc)
+    return [
+        ReplaceOne({'id': window.id}, _new_document(window, now), upsert=True)
+        for window in windows
+    ]
+
+
+def _update_pipeline(window: MaintenanceWindow) -> list[dict]:
+    """Update pipeline setting the fields of a window."""
+    return [{
+        '$set': {
+            **window.model_dump(exclude={'inserted_at', 'updated_at'}),
+            'updated_at': '$$NOW',
+        },
+    }]
+
+
+def _status_pipeline(status: Status) -> list[dict]:
+    """Update pipeline setting the status of windows."""
+    return [{
+        '$set': {
+            'status': status,
+            'last_modified': '$$NOW',
+        },
+    }]
+
+
+def _archive_query(before: datetime) -> dict:
+    """Query selecting the windows finished before the given time."""
+    return {
+        'status': Status.FINISHED,
+        '$or': [
+            {'last_modified': {'$lt': before}},
+            {'last_modified': {'$exists': False}, 'end': {'$lt': before}},
+        ],
+    }
+
+
+def _overlap_query(window: MaintenanceWindow, force: bool) -> dict:
+    """Query selecting the unfinished windows that may overlap a window.
+    If force=True, only windows sharing components are selected."""
+    # Windows overlap when each one starts before the other ends.
+    # Recurring windows may overlap in a later occurrence, so they are
+    # fetched by start and checked occurrence by occurrence.
+    end = window.last_end()
+    query = {'$and': [
+        {'status': {'$in': [Status.PENDING, Status.RUNNING]}},
+        {'$or': [
+            {'start': {'$lt': end}, 'end': {'$gt': window.start}},
+            {'start': {'$lt': end}, 'recurrence': {'$ne': None}},
+        ]},
+    ]}
+    if force:
+        query['$and'].append({'$or': [
+            {'switches': {"$in": window.switches}},
+            {'interfaces': {"$in": window.interfaces}},
+            {'links': {"$in": window.links}},
+        ]})
+    return query
+
+
+def _overlapping(
+    window: MaintenanceWindow,
+    documents: Iterable[dict],
+) -> MaintenanceWindows:
+    """Get the windows of the documents selected by _overlap_query
+    which do overlap the given window."""
+    windows = [MaintenanceWindow.model_construct(**other) for other in documents]
+    return MaintenanceWindows.model_construct(
+        root=[
+            other
+            for other in windows
+            if window.recurrence is None and other.recurrence is None
+            or window.overlaps(other)
+        ]
+    )
+
+
+def _projection(fields: Optional[list[str]]) -> dict:
+    """Projection fetching the given fields, or all of them."""
+    projection = {'_id': False}
+    if fields:
+        projection.update(
+            {field: True for field in {*fields, 'id', 'start'}}
+        )
+    return projection
+
+
+def _all_windows_pipeline(
+    query: dict,
+    projection: dict,
+    limit: Optional[int],
+    after: Optional[tuple[datetime, MaintenanceID]],
+    archive: str,
+) -> list[dict]:
+    """Aggregation pipeline getting the documents of the windows matching
+    query from both the windows and the archive collections."""
+    if len(projection) == 1:
+        projection = {**projection, 'archived_at': False}
+    pipeline = [
+        {'$match': query},
+        {'$unionWith': {
+            'coll': archive,
+            'pipeline': [{'$match': query}],
+        }},
+        {'$project': projection},
+    ]
+    if limit is not None or after is not None:
+        pipeline.append({'$sort': {'start': 1, 'id': 1}})
+    if limit is not None:
+        pipeline.append({'$limit': limit})
+    return pipeline
+
+
+def _sorted_page(
+    cursor,
+    limit: Optional[int],
+    after: Optional[tuple[datetime, MaintenanceID]],
+):
+    """Sort a cursor by start and id and limit it, if a page is asked."""
+    if limit is not None or after is not None:
+        cursor = cursor.sort(
+            [('start', pymongo.ASCENDING), ('id', pymongo.ASCENDING)]
+        )
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    return cursor
+
+
+def _filter_query(
+    window_filter: Optional[MaintenanceFilter] = None,
+    after: Optional[tuple[datetime, MaintenanceID]] = None,
+) -> dict:
+    """Build the query selecting the windows matching window_filter,
+    placed after the given (start, id) key."""
+    conditions = []
+    if window_filter is not None:
+        if window_filter.ids:
+            conditions.append({'id': {'$in': window_filter.ids}})
+        if window_filter.status:
+            conditions.append({'status': {'$in': window_filter.status}})
+        if window_filter.since is not None:
+            conditions.append({'end': {'$gt': window_filter.since}})
+        if window_filter.until is not None:
+            conditions.append({'start': {'$lt': window_filter.until}})
+        for key in ('switches', 'interfaces', 'links'):
+            items = getattr(window_filter, key)
+            if items:
+                conditions.append({key: {'$in': items}})
+    if after is not None:
+        start, mw_id = after
+        conditions.append({'$or': [
+            {'start': {'$gt': start}},
+            {'start': start, 'id': {'$gt': mw_id}},
+        ]})
+    if not conditions:
+        return {}
+    return {'$and': conditions}
+
+
+class WindowPages:
+    """Keyset pagination of window documents sorted by start and id.
+
+    Each page is read with its own query after the last window of the
+    previous one, so no cursor is kept open while a page is consumed.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.after: Optional[tuple[datetime, MaintenanceID]] = None
+        self.done = False
+
+    def add(self, page: list[dict]) -> list[dict]:
+        """Record a page read after self.after, returning it."""
+        if len(page) < self.size:
+            self.done = True
+        else:
+            self.after = (page[-1]['start'], page[-1]['id'])
+        return page
+
+
+@metrics.time_methods(metrics.DB_LATENCY, "method", metrics.is_public)
+@for_all_methods(retries, **_RETRY)
 class MaintenanceController:
     """MaintenanceController."""
 
@@ -47,35 +288,125 @@ class MaintenanceController:
                 tz_aware=True,
             )
         )
+        self.archive = self.db['maintenance.windows_archive'].with_options(
+            codec_options=CodecOptions(
+                tz_aware=True,
+            )
+        )
 
-    def bootstrap_indexes(self) -> None:
-        """Bootstrap all maintenance related indexes."""
+    def bootstrap_indexes(self, archive_ttl: int = 0) -> None:
+        """Bootstrap all maintenance related indexes.
+        Archived windows expire archive_ttl seconds after being archived,
+        unless it is 0.
+        """
         unique_index_tuples = [
             ("maintenance.windows", [("id", pymongo.ASCENDING)]),
+            ("maintenance.windows_archive", [("id", pymongo.ASCENDING)]),
         ]
         for collection, keys in unique_index_tuples:
             if self.mongo.bootstrap_index(collection, keys, unique=True):
                 log.info(
                     f"Created DB unique index {keys}, collection: {collection})"
                 )
+        index_tuples = [
+            # Unfinished windows and their start or end, used when
+            # checking overlaps, loading and starting windows.
+            (
+                "maintenance.windows",
+                [("status", pymongo.ASCENDING), ("start", pymongo.ASCENDING)],
+            ),
+            (
+                "maintenance.windows",
+                [("status", pymongo.ASCENDING), ("end", pymongo.ASCENDING)],
+            ),
+            # Finished windows by when they finished, used when archiving
+            (
+                "maintenance.windows",
+                [
+                    ("status", pymongo.ASCENDING),
+                    ("last_modified", pymongo.ASCENDING),
+                ],
+            ),
+            # Sort key of paginated listings
+            (
+                "maintenance.windows",
+                [("start", pymongo.ASCENDING), ("id", pymongo.ASCENDING)],
+            ),
+            # Windows containing a given component
+            ("maintenance.windows", [("switches", pymongo.ASCENDING)]),
+            ("maintenance.windows", [("interfaces", pymongo.ASCENDING)]),
+            ("maintenance.windows", [("links", pymongo.ASCENDING)]),
+            (
+                "maintenance.windows_archive",
+                [("start", pymongo.ASCENDING), ("id", pymongo.ASCENDING)],
+            ),
+        ]
+        for collection, keys in index_tuples:
+            if self.mongo.bootstrap_index(collection, keys):
+                log.info(
+                    f"Created DB index {keys}, collection: {collection})"
+                )
+        if archive_ttl:
+            collection = "maintenance.windows_archive"
+            keys = [("archived_at", pymongo.ASCENDING)]
+            if self.mongo.bootstrap_index(
+                collection, keys, expireAfterSeconds=archive_ttl
+            ):
+                log.info(
+                    f"Created DB TTL index {keys}, collection: {collection})"
+                )
 
-    def insert_window(self, window: MaintenanceWindow):
+    def insert_window(self, window: MaintenanceWindow) -> MaintenanceWindow:
+        """Insert a window, returning it as stored."""
+        document = _new_document(window, datetime.now(pytz.utc))
+        self.windows.insert_one(document)
+        document.pop('_id', None)
+        return MaintenanceWindow.model_construct(**document)
+
+    def insert_windows(
+        self,
+        windows: list[MaintenanceWindow],
+    ) -> list[MaintenanceID]:
+        """Insert many windows with a single unordered insert.
+        Returns the IDs of the windows not inserted due to being duplicates.
+        """
+        if not windows:
+            return []
         now = datetime.now(pytz.utc)
-        self.windows.insert_one({
-                    **window.model_dump(exclude={'inserted_at', 'updated_at'}),
-                    'inserted_at': now,
-                    'updated_at': now,
-        })
-
-    def update_window(self, window: MaintenanceWindow):
-        self.windows.update_one(
+        documents = [_new_document(window, now) for window in windows]
+        try:
+            self.windows.insert_many(documents, ordered=False)
+        except BulkWriteError as err:
+            return _duplicate_ids(err, documents)
+        return []
+
+    def upsert_windows(self, windows: list[MaintenanceWindow]):
+        """Insert many windows with a single unordered bulk write,
+        replacing the existing windows with the same ids."""
+        if not windows:
+            return
+        self.windows.bulk_write(_replace_requests(windows), ordered=False)
+
+    def update_window(self, window: MaintenanceWindow) -> MaintenanceWindow:
+        """Update a window, returning it as stored."""
+        stored = self.windows.find_one_and_update(
             {'id': window.id},
-            [{
-                '$set': {
-                    **window.model_dump(exclude={'inserted_at', 'updated_at'}),
-                    'updated_at': '$$NOW',
-                },
-            }],
+            _update_pipeline(window),
+            {'_id': False},
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        return MaintenanceWindow.model_construct(**stored)
+
+    def update_windows(self, windows: list[MaintenanceWindow]):
+        """Update many windows with a single bulk write."""
+        if not windows:
+            return
+        self.windows.bulk_write(
+            [
+                UpdateOne({'id': window.id}, _update_pipeline(window))
+                for window in windows
+            ],
+            ordered=False,
         )
 
     def get_window(self, mw_id: MaintenanceID) -> Optional[MaintenanceWindow]:
@@ -91,104 +422,391 @@ class MaintenanceController:
     def start_window(self, mw_id: MaintenanceID) -> MaintenanceWindow:
         window = self.windows.find_one_and_update(
             {'id': mw_id},
-            [{
-                '$set': {
-                    'status': Status.RUNNING,
-                    'last_modified': '$$NOW',
-                },
-            }],
+            _status_pipeline(Status.RUNNING),
             {'_id': False},
             return_document=pymongo.ReturnDocument.AFTER,
         )
         return MaintenanceWindow.model_construct(**window)
 
+    def start_windows(self, mw_ids: list[MaintenanceID]):
+        """Start many windows with a single write."""
+        self.windows.update_many(
+            {'id': {'$in': mw_ids}},
+            _status_pipeline(Status.RUNNING),
+        )
+
     def end_window(self, mw_id: MaintenanceID) -> MaintenanceWindow:
         window = self.windows.find_one_and_update(
             {'id': mw_id},
-            [{
-                '$set': {
-                    'status': Status.FINISHED,
-                    'last_modified': '$$NOW',
-                },
-            }],
+            _status_pipeline(Status.FINISHED),
             {'_id': False},
             return_document=pymongo.ReturnDocument.AFTER,
         )
         return MaintenanceWindow.model_construct(**window)
 
+    def end_windows(self, mw_ids: list[MaintenanceID]):
+        """Finish many windows with a single write."""
+        self.windows.update_many(
+            {'id': {'$in': mw_ids}},
+            _status_pipeline(Status.FINISHED),
+        )
+
     def check_overlap(self, window: MaintenanceWindow, force: bool):
         """Check for overlap in the time periods of the MWs.
          If force=False, check for overlapping between MWs.
          If force=True, check for overlapping only between components.
         """
-        query = {'$and': [
-            {'status': {'$ne': Status.FINISHED}},
-            {'$or': [
-                {'$and': [
-                    {'start': {'$lte': window.start}},
-                    {'end': {'$gt': window.start}},
-                ]},
-                {'$and': [
-                    {'start': {'$gte': window.start}},
-                    {'start': {'$lt': window.end}},
-                ]},
-            ]},
-        ]}
-        if force:
-            query['$and'].append({'$or': [
-                {'switches': {"$in": window.switches}},
-                {'interfaces': {"$in": window.interfaces}},
-                {'links': {"$in": window.links}},
-            ]})
         windows = self.windows.find(
-            query,
+            _overlap_query(window, force),
             {'_id': False}
         )
-        return MaintenanceWindows.model_construct(
-            root = [MaintenanceWindow.model_construct(**window) for window in windows]
-        )
+        return _overlapping(window, windows)
 
-    def get_windows(self) -> MaintenanceWindows:
-        windows = self.windows.find(projection={'_id': False})
+    def get_windows(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+    ) -> MaintenanceWindows:
+        """Get the windows matching window_filter.
+        When limit or after are given, windows are sorted by start and id,
+        and only the ones after the given (start, id) key are returned.
+        If fields are given, the other fields are not fetched
+        and take their default values.
+        """
+        documents = self.get_window_documents(
+            window_filter,
+            fields=fields,
+            limit=limit,
+            after=after,
+        )
         return MaintenanceWindows.model_construct(
-            root = [MaintenanceWindow.model_construct(**window) for window in windows]
+            root=[MaintenanceWindow.model_construct(**window) for window in documents]
         )
 
+    def get_window_documents(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+        archived: bool = False,
+    ) -> list[dict]:
+        """Get the DB documents of the windows matching window_filter,
+        as get_windows does, without building MaintenanceWindow objects.
+        If archived is True, archived windows are included.
+        """
+        projection = _projection(fields)
+        query = _filter_query(window_filter, after)
+        if archived:
+            return list(self.windows.aggregate(
+                _all_windows_pipeline(
+                    query, projection, limit, after, self.archive.name
+                )
+            ))
+        windows = self.windows.find(query, projection=projection)
+        return list(_sorted_page(windows, limit, after))
+
+    def iter_window_documents(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        batch_size: int = 1000,
+        archived: bool = False,
+    ) -> Iterator[list[dict]]:
+        """Yield the DB documents of the windows matching window_filter in
+        batches, sorted by start and id, as paginated by WindowPages.
+        If archived is True, archived windows are included.
+        """
+        pages = WindowPages(batch_size)
+        while not pages.done:
+            batch = pages.add(self.get_window_documents(
+                window_filter, limit=batch_size, after=pages.after, archived=archived
+            ))
+            if batch:
+                yield batch
+
     def get_unfinished_windows(self) -> MaintenanceWindows:
         windows = self.windows.find(
-            {'status': {'$ne': Status.FINISHED}},
+            {'status': {'$in': [Status.PENDING, Status.RUNNING]}},
             projection={'_id': False}
         )
         return MaintenanceWindows.model_construct(
-            root = [MaintenanceWindow.model_construct(**window) for window in windows]
+            root=[MaintenanceWindow.model_construct(**window) for window in windows]
+        )
+
+    def archive_windows(
+        self,
+        before: datetime,
+        batch_size: int = 1000,
+    ) -> list[MaintenanceID]:
+        """Move up to batch_size windows finished before the given time
+        to the archive collection, returning their IDs.
+        Windows finish when their status last changed, which is their end
+        unless they were ended early. Windows imported already finished
+        have no status change, so their end is used.
+        Windows are copied before being removed, so an interrupted pass
+        is completed by the next one.
+        """
+        documents = list(
+            self.windows.find(
+                _archive_query(before),
+                projection={'_id': False},
+                limit=batch_size,
+            )
         )
+        if not documents:
+            return []
+        now = datetime.now(pytz.utc)
+        self.archive.bulk_write(
+            [
+                ReplaceOne(
+                    {'id': document['id']},
+                    {**document, 'archived_at': now},
+                    upsert=True,
+                )
+                for document in documents
+            ],
+            ordered=False,
+        )
+        mw_ids = [document['id'] for document in documents]
+        self.windows.delete_many({'id': {'$in': mw_ids}})
+        return mw_ids
 
     def remove_window(self, mw_id: MaintenanceID):
         self.windows.delete_one({'id': mw_id})
 
+    def remove_windows(self, mw_ids: list[MaintenanceID]):
+        self.windows.delete_many({'id': {'$in': mw_ids}})
+
     def prepare_start(self):
+        """Bring the status of the unfinished windows up to date with a
+        single write, starting the pending windows whose start passed and
+        finishing the ones whose end passed. Recurring windows are left to
+        MaintenanceScheduler.start, which moves them to their current
+        occurrence."""
         now = datetime.now(pytz.utc)
         self.windows.update_many(
-            {'$and': [
-                {'status': {'$eq': Status.PENDING}},
-                {'start': {'$lte': now}},
+            {'recurrence': None, '$or': [
+                {'status': Status.PENDING, 'start': {'$lte': now}},
+                {'status': Status.RUNNING, 'end': {'$lte': now}},
             ]},
-            {
+            [{
                 '$set': {
-                    'status': Status.RUNNING,
+                    'status': {
+                        '$cond': [
+                            {'$lte': ['$end', now]},
+                            Status.FINISHED,
+                            Status.RUNNING,
+                        ],
+                    },
                     'last_modified': now,
                 },
-            }
+            }],
         )
-        self.windows.update_many(
-            {'$and': [
-                {'status': {'$eq': Status.RUNNING}},
-                {'end': {'$lte': now}},
-            ]},
-            {
-                '$set': {
-                    'status': Status.FINISHED,
-                    'last_modified': now,
-                },
-            }
+
+
+def _async_client() -> "AsyncMongoClient":
+    """Create an asyncio client with the settings kytos.core.db.mongo_client
+    reads from the environment for the kytos client."""
+    return AsyncMongoClient(
+        os.environ.get(
+            "MONGO_HOST_SEEDS", "mongo1:27017,mongo2:27018,mongo3:27099"
+        ).split(","),
+        username=os.environ.get("MONGO_USERNAME") or "invalid_user",
+        password=os.environ.get("MONGO_PASSWORD") or "invalid_password",
+        authsource=os.environ.get("MONGO_DBNAME") or "napps",
+        connect=False,
+        retrywrites=True,
+        retryreads=True,
+        readpreference="primaryPreferred",
+        maxpoolsize=int(os.environ.get("MONGO_MAX_POOLSIZE") or 300),
+        minpoolsize=int(os.environ.get("MONGO_MIN_POOLSIZE") or 30),
+        serverselectiontimeoutms=int(os.environ.get("MONGO_TIMEOUTMS") or 30000),
+    )
+
+
+@metrics.time_methods(metrics.DB_LATENCY, "method", metrics.is_public)
+@_retry_coroutines
+class AsyncMaintenanceController:
+    """Asyncio counterpart of the MaintenanceController methods used by
+    the REST handlers, so waiting for the DB or for a retry does not hold
+    a thread. Requires pymongo 4.9 or later."""
+
+    def __init__(self, get_mongo=lambda: Mongo(), new_client=_async_client) -> None:
+        """Constructor of AsyncMaintenanceController."""
+        self.mongo = get_mongo()
+        self.db_client = new_client()
+        self.db = self.db_client[self.mongo.db_name]
+        self.windows = self.db['maintenance.windows'].with_options(
+            codec_options=CodecOptions(
+                tz_aware=True,
+            )
+        )
+        self.archive = self.db['maintenance.windows_archive'].with_options(
+            codec_options=CodecOptions(
+                tz_aware=True,
+            )
         )
+
+    def close(self):
+        """Close the client. On the event loop, the closing is scheduled
+        on it, otherwise it is run to completion."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.db_client.close())
+        else:
+            loop.create_task(self.db_client.close())
+
+    async def insert_window(self, window: MaintenanceWindow) -> MaintenanceWindow:
+        """Insert a window, returning it as stored."""
+        document = _new_document(window, datetime.now(pytz.utc))
+        await self.windows.insert_one(document)
+        document.pop('_id', None)
+        return MaintenanceWindow.model_construct(**document)
+
+    async def insert_windows(
+        self,
+        windows: list[MaintenanceWindow],
+    ) -> list[MaintenanceID]:
+        """Insert many windows with a single unordered insert.
+        Returns the IDs of the windows not inserted due to being duplicates.
+        """
+        if not windows:
+            return []
+        now = datetime.now(pytz.utc)
+        documents = [_new_document(window, now) for window in windows]
+        try:
+            await self.windows.insert_many(documents, ordered=False)
+        except BulkWriteError as err:
+            return _duplicate_ids(err, documents)
+        return []
+
+    async def upsert_windows(self, windows: list[MaintenanceWindow]):
+        """Insert many windows with a single unordered bulk write,
+        replacing the existing windows with the same ids."""
+        if not windows:
+            return
+        await self.windows.bulk_write(_replace_requests(windows), ordered=False)
+
+    async def update_window(self, window: MaintenanceWindow) -> MaintenanceWindow:
+        """Update a window, returning it as stored."""
+        stored = await self.windows.find_one_and_update(
+            {'id': window.id},
+            _update_pipeline(window),
+            {'_id': False},
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        return MaintenanceWindow.model_construct(**stored)
+
+    async def update_windows(self, windows: list[MaintenanceWindow]):
+        """Update many windows with a single bulk write."""
+        if not windows:
+            return
+        await self.windows.bulk_write(
+            [
+                UpdateOne({'id': window.id}, _update_pipeline(window))
+                for window in windows
+            ],
+            ordered=False,
+        )
+
+    async def get_window(
+        self,
+        mw_id: MaintenanceID,
+    ) -> Optional[MaintenanceWindow]:
+        """Get a window, if it exists."""
+        window = await self.windows.find_one({'id': mw_id}, {'_id': False})
+        if window is None:
+            return None
+        return MaintenanceWindow.model_construct(**window)
+
+    async def end_window(self, mw_id: MaintenanceID) -> MaintenanceWindow:
+        """Finish a window, returning it as stored."""
+        window = await self.windows.find_one_and_update(
+            {'id': mw_id},
+            _status_pipeline(Status.FINISHED),
+            {'_id': False},
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        return MaintenanceWindow.model_construct(**window)
+
+    async def end_windows(self, mw_ids: list[MaintenanceID]):
+        """Finish many windows with a single write."""
+        await self.windows.update_many(
+            {'id': {'$in': mw_ids}},
+            _status_pipeline(Status.FINISHED),
+        )
+
+    async def check_overlap(self, window: MaintenanceWindow, force: bool):
+        """Get the unfinished windows overlapping the given window, as
+        MaintenanceController.check_overlap does."""
+        windows = self.windows.find(_overlap_query(window, force), {'_id': False})
+        return _overlapping(window, await windows.to_list(None))
+
+    async def get_windows(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+    ) -> MaintenanceWindows:
+        """Get the windows matching window_filter, as
+        MaintenanceController.get_windows does."""
+        documents = await self.get_window_documents(
+            window_filter,
+            fields=fields,
+            limit=limit,
+            after=after,
+        )
+        return MaintenanceWindows.model_construct(
+            root=[MaintenanceWindow.model_construct(**window) for window in documents]
+        )
+
+    async def get_window_documents(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+        archived: bool = False,
+    ) -> list[dict]:
+        """Get the DB documents of the windows matching window_filter,
+        as MaintenanceController.get_window_documents does."""
+        projection = _projection(fields)
+        query = _filter_query(window_filter, after)
+        if archived:
+            windows = await self.windows.aggregate(
+                _all_windows_pipeline(
+                    query, projection, limit, after, self.archive.name
+                )
+            )
+            return await windows.to_list(None)
+        windows = self.windows.find(query, projection=projection)
+        return await _sorted_page(windows, limit, after).to_list(None)
+
+    async def remove_window(self, mw_id: MaintenanceID):
+        """Remove a window."""
+        await self.windows.delete_one({'id': mw_id})
+
+    async def remove_windows(self, mw_ids: list[MaintenanceID]):
+        """Remove many windows with a single write."""
+        await self.windows.delete_many({'id': {'$in': mw_ids}})
+
+
+class ThreadedMaintenanceController:
+    """Stand-in of AsyncMaintenanceController running the methods of a
+    MaintenanceController in threads, for pymongo versions without an
+    asyncio client."""
+
+    def __init__(self, db_controller: MaintenanceController) -> None:
+        self.db_controller = db_controller
+
+    def __getattr__(self, name: str):
+        method = getattr(self.db_controller, name)
+
+        async def run_in_thread(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return run_in_thread
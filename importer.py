@@ -0,0 +1,274 @@
+"""Import of maintenance windows from NDJSON or CSV records.
+
+Used by POST /v1/import and as an offline command writing straight to
+the DB, for instance to migrate windows between deployments:
+
+    python -m napps.kytos.maintenance.importer windows.ndjson [--upsert]
+
+Windows imported offline are scheduled when the NApp next starts.
+"""
+
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional
+
+import pytz
+from napps.kytos.maintenance import settings
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.models import Status, validate_windows
+
+from kytos.core.rest_api import error_msg
+
+FORMATS = ("ndjson", "csv")
+LIST_FIELDS = ("switches", "interfaces", "links")
+
+
+def parse_ndjson(
+    lines: Iterable[str],
+    start: int = 1,
+) -> Iterator[tuple[int, object]]:
+    """Parse NDJSON lines, yielding each record with its line number,
+    counted from start. Blank lines are skipped and invalid JSON is
+    yielded as a ValueError.
+    """
+    for number, line in enumerate(lines, start=start):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as err:
+            yield number, ValueError(f"Invalid JSON: {err}")
+
+
+def _parse_list(cell: str) -> list[str]:
+    """Parse a CSV cell with a JSON array or whitespace separated values."""
+    if cell.lstrip().startswith("["):
+        return json.loads(cell)
+    return cell.split()
+
+
+def parse_csv(
+    lines: Iterable[str],
+    start: int = 1,
+    fieldnames: Optional[list[str]] = None,
+) -> Iterator[tuple[int, object]]:
+    """Parse CSV lines with a header of window fields, yielding each
+    record with its line number, counted from start. Empty cells take the
+    default value. If fieldnames is given, the lines have no header.
+    """
+    reader = csv.DictReader(lines, fieldnames=fieldnames)
+    for row in reader:
+        record = {}
+        try:
+            for name, cell in row.items():
+                if name is None or cell is None or cell == "":
+                    continue
+                record[name] = _parse_list(cell) if name in LIST_FIELDS else cell
+        except ValueError as err:
+            yield start - 1 + reader.line_num, ValueError(f"Invalid list: {err}")
+            continue
+        yield start - 1 + reader.line_num, record
+
+
+def parse_records(
+    lines: Iterable[str],
+    data_format: str,
+    start: int = 1,
+    fieldnames: Optional[list[str]] = None,
+) -> Iterator[tuple[int, object]]:
+    """Parse lines in the given format, numbered from start. The CSV
+    header is read from the lines unless fieldnames is given."""
+    if data_format == "csv":
+        return parse_csv(lines, start, fieldnames)
+    if data_format == "ndjson":
+        return parse_ndjson(lines, start)
+    raise ValueError(f"Unknown format: {data_format}")
+
+
+def set_status(window: MW, now: datetime) -> MW:
+    """Set the status a window would have now, as done on start.
+    Unfinished recurring windows are moved to their current occurrence."""
+    if window.recurrence is not None and window.status != Status.FINISHED:
+        return window.catch_up(now)
+    status = window.status
+    if status == Status.PENDING and window.start <= now:
+        status = Status.RUNNING
+    if status == Status.RUNNING and window.end <= now:
+        status = Status.FINISHED
+    if status != window.status:
+        window = window.copy(update={"status": status})
+    return window
+
+
+def validate_records(
+    records: Iterable[tuple[int, object]],
+) -> tuple[list[MW], list[dict]]:
+    """Validate parsed records into windows.
+    Returns the windows and the errors of the invalid records.
+    """
+    now = datetime.now(pytz.utc)
+    errors = []
+    numbers = []
+    candidates = []
+    for number, record in records:
+        if isinstance(record, Exception):
+            errors.append({"line": number, "description": f"{record}"})
+            continue
+        if not isinstance(record, dict):
+            errors.append(
+                {"line": number, "description": f"Invalid window value: {record}"}
+            )
+            continue
+        numbers.append(number)
+        candidates.append(record)
+    valid, invalid_errors = validate_windows(
+        candidates, context={"allow_past_start": True}
+    )
+    for position, window_errors in invalid_errors.items():
+        errors.append(
+            {"line": numbers[position], "description": error_msg(window_errors)}
+        )
+    errors.sort(key=lambda error: error["line"])
+    windows = [set_status(window, now) for window in valid]
+    return windows, errors
+
+
+def validate_chunks(
+    lines: Iterable[str],
+    data_format: str,
+    chunk_size: int = settings.IMPORT_BATCH_SIZE,
+) -> Iterator[tuple[list[MW], list[dict]]]:
+    """Parse and validate lines in chunks of chunk_size records."""
+    records = parse_records(lines, data_format)
+    while chunk := list(islice(records, chunk_size)):
+        yield validate_records(chunk)
+
+
+async def aread_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Decode a stream of UTF-8 bytes as it arrives, yielding each line
+    without its line ending. Raises UnicodeDecodeError on invalid UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        # The last line may be incomplete, or end in the \r of a \r\n
+        # split between chunks, so it waits for the next chunk.
+        lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+        pending = lines.pop() if lines else ""
+        for line in lines:
+            yield line.splitlines()[0]
+    for line in (pending + decoder.decode(b"", final=True)).splitlines():
+        yield line
+
+
+def validate_lines(
+    lines: list[str],
+    data_format: str,
+    start: int = 1,
+    fieldnames: Optional[list[str]] = None,
+) -> tuple[list[MW], list[dict]]:
+    """Parse and validate lines numbered from start."""
+    return validate_records(parse_records(lines, data_format, start, fieldnames))
+
+
+async def avalidate_chunks(
+    chunks: AsyncIterable[bytes],
+    data_format: str,
+    chunk_size: int = settings.IMPORT_BATCH_SIZE,
+) -> AsyncIterator[tuple[list[MW], list[dict]]]:
+    """Parse and validate a stream of UTF-8 bytes in chunks of about
+    chunk_size lines, as validate_chunks does.
+
+    The stream is read as it arrives, and each chunk is parsed and
+    validated in a worker thread, without blocking the event loop.
+    CSV chunks only end outside quoted cells, so cells spanning many
+    lines are never split.
+    """
+    start = 1
+    fieldnames = None
+    lines: list[str] = []
+    quotes = 0
+    async for line in aread_lines(chunks):
+        if data_format == "csv":
+            if fieldnames is None:
+                fieldnames = next(csv.reader([line]), [])
+                start += 1
+                continue
+            quotes += line.count('"')
+        lines.append(line)
+        if len(lines) >= chunk_size and not quotes % 2:
+            yield await asyncio.to_thread(
+                validate_lines, lines, data_format, start, fieldnames
+            )
+            start += len(lines)
+            lines = []
+    if lines:
+        yield await asyncio.to_thread(
+            validate_lines, lines, data_format, start, fieldnames
+        )
+
+
+def import_file(
+    lines: Iterable[str],
+    data_format: str,
+    upsert: bool = False,
+    chunk_size: int = settings.IMPORT_BATCH_SIZE,
+) -> dict:
+    """Import windows straight into the DB, without scheduling them."""
+    # pylint: disable=import-outside-toplevel
+    from napps.kytos.maintenance.controllers import MaintenanceController
+
+    db_controller = MaintenanceController()
+    db_controller.bootstrap_indexes(
+        archive_ttl=int(timedelta(days=settings.ARCHIVE_TTL_DAYS).total_seconds())
+    )
+    result = {"imported": 0, "skipped": [], "errors": []}
+    for windows, errors in validate_chunks(lines, data_format, chunk_size):
+        result["errors"].extend(errors)
+        if upsert:
+            db_controller.upsert_windows(windows)
+            skipped = []
+        else:
+            skipped = db_controller.insert_windows(windows)
+        result["imported"] += len(windows) - len(skipped)
+        result["skipped"].extend(skipped)
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Import windows from a file into the DB."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="File with the windows, - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="Format of the file, guessed from its extension by default",
+    )
+    parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="Replace existing windows with the same id instead of skipping them",
+    )
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    data_format = args.format
+    if data_format is None:
+        data_format = "csv" if args.file.endswith(".csv") else "ndjson"
+    if args.file == "-":
+        result = import_file(sys.stdin, data_format, args.upsert, args.chunk_size)
+    else:
+        with open(args.file, encoding="utf-8", newline="") as file:
+            result = import_file(file, data_format, args.upsert, args.chunk_size)
+    print(json.dumps(result, indent=2))
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
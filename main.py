@@ -4,35 +4,184 @@ This NApp creates maintenance windows, allowing the maintenance of network
 devices (switch, link, and interface) without receiving alerts.
 """
 
+import asyncio
+import base64
+import binascii
 import pathlib
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
 
+import pytz
+from napps.kytos.maintenance import metrics, settings
+from napps.kytos.maintenance.importer import FORMATS, avalidate_chunks
 from napps.kytos.maintenance.managers import MaintenanceDeployer as Deployer
 from napps.kytos.maintenance.managers import MaintenanceScheduler as Scheduler
-from napps.kytos.maintenance.models import MaintenanceID
+from napps.kytos.maintenance.models import MaintenanceFilter, MaintenanceID
 from napps.kytos.maintenance.models import MaintenanceWindow as MW
-from napps.kytos.maintenance.models import OverlapError, Status
+from napps.kytos.maintenance.models import OverlapError, Status, validate_windows
+from napps.kytos.maintenance.serializers import (
+    dump_window,
+    dump_windows,
+    dump_windows_ndjson,
+)
 from pydantic import ValidationError
 from pymongo.errors import DuplicateKeyError
+from starlette.responses import StreamingResponse
 
-from kytos.core import KytosNApp, rest
-from kytos.core.helpers import load_spec, validate_openapi
+from kytos.core import KytosNApp, log, rest
+from kytos.core.helpers import listen_to, load_spec, validate_openapi
 from kytos.core.rest_api import (
     HTTPException,
     JSONResponse,
     Request,
     Response,
+    aget_json_or_400,
     error_msg,
-    get_json_or_400,
 )
 
 
+def _get_list_param(params, name: str) -> list[str]:
+    """Get a query argument given repeatedly or as a comma separated list."""
+    return [
+        value for param in params.getlist(name) for value in param.split(",") if value
+    ]
+
+
+def _get_filter(params) -> MaintenanceFilter:
+    """Get the window filter given in the query arguments."""
+    try:
+        return MaintenanceFilter.model_validate(
+            {
+                "status": _get_list_param(params, "status"),
+                "since": params.get("since"),
+                "until": params.get("until"),
+                "switches": _get_list_param(params, "switch"),
+                "interfaces": _get_list_param(params, "interface"),
+                "links": _get_list_param(params, "link"),
+            }
+        )
+    except ValidationError as err:
+        msg = error_msg(err.errors())
+        raise HTTPException(400, detail=msg) from err
+
+
+def _get_archived(params) -> bool:
+    """Get whether archived windows are included, from the query arguments."""
+    archived = params.get("archived", "false").lower()
+    if archived not in ("true", "false"):
+        raise HTTPException(400, detail=f"archived must be true or false: {archived}")
+    return archived == "true"
+
+
+def _encode_cursor(start: datetime, mw_id: MaintenanceID) -> str:
+    """Encode the pagination key of a window as an opaque cursor."""
+    key = f"{start.isoformat()}|{mw_id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[tuple[datetime, MaintenanceID]]:
+    """Decode a cursor created by _encode_cursor."""
+    if cursor is None:
+        return None
+    try:
+        key = base64.urlsafe_b64decode(cursor.encode()).decode()
+        start, mw_id = key.split("|", 1)
+        return datetime.fromisoformat(start), MaintenanceID(mw_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as err:
+        raise HTTPException(400, detail=f"Invalid cursor: {cursor}") from err
+
+
+def _bulk_error(code: int, description: str, mw_id: Optional[str] = None) -> dict:
+    """Result of a window that failed in a bulk request."""
+    if mw_id is None:
+        return {"code": code, "description": description}
+    return {"mw_id": mw_id, "code": code, "description": description}
+
+
+def _bulk_response(results: list[dict], success_code: int) -> JSONResponse:
+    """Response of a bulk request, given the result of each window."""
+    if all(result["code"] == success_code for result in results):
+        status_code = success_code
+    else:
+        status_code = 207
+    return JSONResponse({"windows": results}, status_code=status_code)
+
+
+def _parse_bulk_items(items: list) -> tuple[list[Optional[dict]], dict[int, MW]]:
+    """Validate the items of a bulk creation as maintenance windows.
+
+    Returns the result of each invalid item, None for the valid ones, and
+    the windows of the valid ones by position.
+    """
+    results: list[Optional[dict]] = [None] * len(items)
+    candidates: list[int] = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or not item:
+            results[position] = _bulk_error(400, f"Invalid window value: {item}")
+        elif "status" in item:
+            results[position] = _bulk_error(
+                400, "Setting a maintenance status is not allowed"
+            )
+        else:
+            candidates.append(position)
+
+    valid, invalid_errors = validate_windows(
+        [items[position] for position in candidates]
+    )
+    for candidate, item_errors in invalid_errors.items():
+        results[candidates[candidate]] = _bulk_error(400, error_msg(item_errors))
+    valid_positions = [
+        position
+        for candidate, position in enumerate(candidates)
+        if candidate not in invalid_errors
+    ]
+    return results, dict(zip(valid_positions, valid))
+
+
+def _fill_bulk_created(
+    results: list[Optional[dict]],
+    windows: dict[int, MW],
+    errors: dict[int, Exception],
+    rejected: bool,
+):
+    """Set the results of the windows given to a bulk creation.
+
+    errors holds the error of each window that could not be added, by
+    its index in windows. If rejected is set, none of them was added.
+    """
+    for index, (position, window) in enumerate(windows.items()):
+        err = errors.get(index)
+        if isinstance(err, DuplicateKeyError):
+            results[position] = _bulk_error(409, f"{err}")
+        elif err is not None:
+            results[position] = _bulk_error(400, f"{err}")
+        elif rejected:
+            results[position] = _bulk_error(
+                400, "Window not created, other windows are invalid"
+            )
+        else:
+            results[position] = {"mw_id": window.id, "code": 201}
+
+
+def _check_running(window: MW) -> Optional[str]:
+    """Get the reason why a window is not running, if any."""
+    if window.status == Status.PENDING:
+        return f"Maintenance window {window.id} has not yet started"
+    if window.status == Status.FINISHED:
+        return f"Maintenance window {window.id} has already finished"
+    return None
+
+
+@metrics.time_methods(metrics.REST_LATENCY, "handler", metrics.is_handler)
 class Main(KytosNApp):
     """Main class of kytos/maintenance NApp.
 
     This class is the entry point for this napp.
     """
 
+    # REST handlers and event listeners have to be methods of the NApp
+    # pylint: disable=too-many-public-methods
+
     spec = load_spec(pathlib.Path(__file__).parent / "openapi.yml")
 
     def setup(self):
@@ -46,15 +195,26 @@ class Main(KytosNApp):
         self.maintenance_deployer = Deployer.new_deployer(self.controller)
         self.scheduler = Scheduler.new_scheduler(self.maintenance_deployer)
         self.scheduler.start()
+        if settings.ARCHIVE_FINISHED_AFTER_DAYS:
+            self.execute_as_loop(settings.ARCHIVE_INTERVAL)
 
     def execute(self):
         """Run after the setup method execution.
 
-        You can also use this method in loop mode if you add to the above setup
-        method a line like the following example:
-
-            self.execute_as_loop(30)  # 30-second interval.
+        When archival is enabled, this runs every ARCHIVE_INTERVAL seconds
+        and moves the windows finished more than ARCHIVE_FINISHED_AFTER_DAYS
+        days ago to the archive collection.
         """
+        if not settings.ARCHIVE_FINISHED_AFTER_DAYS:
+            return
+        before = datetime.now(pytz.utc) - timedelta(
+            days=settings.ARCHIVE_FINISHED_AFTER_DAYS
+        )
+        archived = self.scheduler.archive_maintenances(
+            before, settings.ARCHIVE_BATCH_SIZE
+        )
+        if archived:
+            log.info("Archived %s windows finished before %s", archived, before)
 
     def shutdown(self):
         """Run when your napp is unloaded.
@@ -64,32 +224,149 @@ class Main(KytosNApp):
         self.scheduler.shutdown()
 
     @rest("/v1", methods=["GET"])
-    def get_all_mw(self, _request: Request) -> Response:
-        """Return all maintenance windows."""
-        maintenances = self.scheduler.list_maintenances()
+    async def get_all_mw(self, request: Request) -> Response:
+        """Return all maintenance windows.
+
+        Windows can be filtered with the query arguments status, since,
+        until, switch, interface and link. Only the fields listed in
+        fields are returned. When limit is given, at most limit windows
+        sorted by start and id are returned, and the X-Next-Cursor header
+        holds the cursor argument to get the next page. Archived windows
+        are only included when archived is true.
+        """
+        params = request.query_params
+        window_filter = _get_filter(params)
+
+        fields = _get_list_param(params, "fields")
+        unknown_fields = set(fields) - set(MW.model_fields)
+        if unknown_fields:
+            raise HTTPException(400, detail=f"Unknown fields: {sorted(unknown_fields)}")
+
+        limit = params.get("limit")
+        if limit is not None:
+            if not limit.isdigit() or int(limit) < 1:
+                raise HTTPException(
+                    400, detail=f"limit must be a positive integer: {limit}"
+                )
+            limit = int(limit)
+
+        after = _decode_cursor(params.get("cursor"))
+        archived = _get_archived(params)
+
+        documents = await self.scheduler.alist_maintenance_documents(
+            window_filter,
+            fields=fields or None,
+            limit=limit + 1 if limit is not None else None,
+            after=after,
+            archived=archived,
+        )
+        headers = {}
+        if limit is not None and len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            headers["X-Next-Cursor"] = _encode_cursor(last["start"], last["id"])
         return Response(
-            f"{maintenances.json()}\n",
+            dump_windows(documents, fields) + b"\n",
             status_code=200,
             media_type="application/json",
+            headers=headers,
+        )
+
+    @rest("/v1/export", methods=["GET"])
+    async def export_mw(self, request: Request) -> StreamingResponse:
+        """Stream the maintenance windows as newline delimited JSON.
+
+        Windows can be filtered with the same query arguments as GET /v1,
+        and are sorted by start and id. They are read from the DB in
+        batches, so memory use does not grow with the number of windows.
+        Archived windows are only included when archived is true.
+        """
+        window_filter = _get_filter(request.query_params)
+        archived = _get_archived(request.query_params)
+        batches = self.scheduler.aexport_maintenances(
+            window_filter, settings.EXPORT_BATCH_SIZE, archived=archived
+        )
+        return StreamingResponse(
+            (dump_windows_ndjson(batch) async for batch in batches),
+            status_code=200,
+            media_type="application/x-ndjson",
+        )
+
+    @rest("/v1/report", methods=["POST"])
+    async def report_mw(self, request: Request) -> JSONResponse:
+        """Simulate a maintenance window and report the affected devices."""
+        data = await aget_json_or_400(request)
+        if not isinstance(data, dict) or not data:
+            raise HTTPException(400, detail=f"Invalid json body value: {data}")
+        try:
+            maintenance = MW.model_validate(data)
+        except ValidationError as err:
+            msg = error_msg(err.errors())
+            raise HTTPException(400, detail=msg) from err
+        force = data.get("force", False)
+        affected = await asyncio.to_thread(
+            self.maintenance_deployer.simulate_mw, maintenance
+        )
+        overlapping = self.scheduler.get_overlapping(maintenance, force=force)
+        return JSONResponse(
+            {
+                "mw_id": maintenance.id,
+                **affected,
+                "overlapping": [window.id for window in overlapping],
+            }
         )
 
+    @rest("/v1/metrics", methods=["GET"])
+    def get_metrics(self, request: Request) -> Response:
+        """Return the metrics of the NApp in the Prometheus text format."""
+        # pylint: disable=unused-argument
+        cache = self.scheduler.window_cache
+        cache_name = "maintenance_window_cache_requests_total"
+        cache_samples = [
+            (cache_name, {"result": "hit"}, cache.hits),
+            (cache_name, {"result": "miss"}, cache.misses),
+        ]
+        merged_name = "maintenance_merged_events_total"
+        merged_samples = [
+            (merged_name, {"operation": operation}, count)
+            for operation, count in sorted(
+                self.maintenance_deployer.merged_events.items()
+            )
+        ]
+        body = (
+            metrics.render()
+            + metrics.format_metric(
+                cache_name,
+                "counter",
+                "Lookups of maintenance windows, by whether the cache had them.",
+                cache_samples,
+            )
+            + metrics.format_metric(
+                merged_name,
+                "counter",
+                "Interruption events merged into another event, by operation.",
+                merged_samples,
+            )
+        )
+        return Response(body, status_code=200, media_type=metrics.CONTENT_TYPE)
+
     @rest("/v1/{mw_id}", methods=["GET"])
-    def get_mw(self, request: Request) -> Response:
+    async def get_mw(self, request: Request) -> Response:
         """Return one maintenance window."""
         mw_id: MaintenanceID = request.path_params["mw_id"]
-        window = self.scheduler.get_maintenance(mw_id)
+        window = await self.scheduler.aget_maintenance(mw_id)
         if window:
             return Response(
-                f"{window.json()}\n",
+                dump_window(window) + b"\n",
                 status_code=200,
                 media_type="application/json",
             )
         raise HTTPException(404, f"Maintenance with id {mw_id} not found")
 
     @rest("/v1", methods=["POST"])
-    def create_mw(self, request: Response) -> JSONResponse:
+    async def create_mw(self, request: Response) -> JSONResponse:
         """Create a new maintenance window."""
-        data = get_json_or_400(request, self.controller.loop)
+        data = await aget_json_or_400(request)
         if not isinstance(data, dict) or not data:
             raise HTTPException(400, detail=f"Invalid json body value: {data}")
 
@@ -107,7 +384,7 @@ class Main(KytosNApp):
             ignore_no_exists = data.get("ignore_no_exists")
             if not ignore_no_exists:
                 self.validate_item_existence(maintenance)
-            self.scheduler.add(maintenance, force=force)
+            await self.scheduler.aadd(maintenance, force=force)
         except ValidationError as err:
             msg = error_msg(err.errors())
             raise HTTPException(400, detail=msg) from err
@@ -121,15 +398,212 @@ class Main(KytosNApp):
             raise HTTPException(400, detail=f"{err}") from err
         return JSONResponse({"mw_id": maintenance.id}, status_code=201)
 
+    @rest("/v1/bulk", methods=["POST"])
+    async def create_mw_bulk(self, request: Request) -> JSONResponse:
+        """Create many maintenance windows at once.
+
+        The response holds the result of each window, in the given order.
+        If atomic is true, no window is created unless all of them can be.
+        """
+        data = await aget_json_or_400(request)
+        if not isinstance(data, dict) or not isinstance(data.get("windows"), list):
+            raise HTTPException(400, detail=f"Invalid json body value: {data}")
+        items = data["windows"]
+        if not items:
+            raise HTTPException(400, detail="At least one window must be provided")
+        if len(items) > settings.BULK_MAX_WINDOWS:
+            raise HTTPException(
+                400,
+                detail=f"At most {settings.BULK_MAX_WINDOWS} windows can be created"
+                " at once",
+            )
+        force = data.get("force", False)
+        ignore_no_exists = data.get("ignore_no_exists", False)
+        atomic = data.get("atomic", False)
+
+        results, windows = self._validate_bulk_items(items, ignore_no_exists)
+        invalid = any(results)
+        if atomic and invalid:
+            errors = {}
+        else:
+            errors = await self.scheduler.aadd_many(
+                list(windows.values()), force=force, atomic=atomic
+            )
+        rejected = atomic and (invalid or bool(errors))
+        _fill_bulk_created(results, windows, errors, rejected)
+
+        if rejected:
+            return JSONResponse({"windows": results}, status_code=400)
+        return _bulk_response(results, 201)
+
+    def _validate_bulk_items(
+        self, items: list, ignore_no_exists: bool
+    ) -> tuple[list[Optional[dict]], dict[int, MW]]:
+        """Validate the windows of a bulk creation.
+
+        Returns the result of each invalid window, None for the valid
+        ones, and the valid windows by position.
+        """
+        results, valid = _parse_bulk_items(items)
+        if ignore_no_exists:
+            return results, valid
+        windows = {}
+        for position, window in valid.items():
+            items_not_found = self.get_non_existant_items(window)
+            if items_not_found:
+                results[position] = _bulk_error(
+                    400,
+                    f"Window contains non-existant items: {items_not_found}",
+                )
+            else:
+                windows[position] = window
+        return results, windows
+
+    @rest("/v1/import", methods=["POST"])
+    async def import_mw(self, request: Request) -> JSONResponse:
+        """Import maintenance windows from NDJSON or CSV records.
+
+        The format is given by the format query argument or the content
+        type. Records are validated and written in chunks, and windows
+        whose id already exists are skipped, or replaced if the duplicates
+        query argument is upsert. Only pending and running windows are
+        scheduled. The body is read as it arrives, so invalid UTF-8 stops
+        the import after the chunks before it were written.
+        """
+        params = request.query_params
+        data_format = params.get("format")
+        if data_format is None:
+            content_type = request.headers.get("content-type", "")
+            data_format = "csv" if content_type.startswith("text/csv") else "ndjson"
+        if data_format not in FORMATS:
+            raise HTTPException(415, detail=f"Unsupported format: {data_format}")
+        duplicates = params.get("duplicates", "skip")
+        if duplicates not in ("skip", "upsert"):
+            raise HTTPException(
+                400, detail=f"duplicates must be skip or upsert: {duplicates}"
+            )
+
+        imported = 0
+        skipped = []
+        errors = []
+        chunks = avalidate_chunks(
+            request.stream(), data_format, settings.IMPORT_BATCH_SIZE
+        )
+        try:
+            async for windows, chunk_errors in chunks:
+                errors.extend(chunk_errors)
+                chunk_skipped = await self.scheduler.aimport_windows(
+                    windows, upsert=duplicates == "upsert"
+                )
+                imported += len(windows) - len(chunk_skipped)
+                skipped.extend(chunk_skipped)
+        except UnicodeDecodeError as err:
+            raise HTTPException(
+                400, detail=f"Invalid body after importing {imported} windows: {err}"
+            ) from err
+        return JSONResponse(
+            {"imported": imported, "skipped": skipped, "errors": errors},
+            status_code=207 if errors else 201,
+        )
+
+    @rest("/v1/bulk/delete", methods=["POST"])
+    @validate_openapi(spec)
+    async def remove_mw_bulk(self, request: Request) -> JSONResponse:
+        """Delete many maintenance windows at once."""
+        data = await aget_json_or_400(request)
+        windows, results = await self._get_bulk_windows(data)
+        removed = []
+        for window in windows:
+            if window.status == Status.RUNNING:
+                results.append(
+                    _bulk_error(
+                        400,
+                        "Deleting a running maintenance is not allowed",
+                        window.id,
+                    )
+                )
+                continue
+            removed.append(window)
+            results.append({"mw_id": window.id, "code": 200})
+        await self.scheduler.aremove_many(removed)
+        return _bulk_response(results, 200)
+
+    @rest("/v1/bulk/end", methods=["POST"])
+    @validate_openapi(spec)
+    async def end_mw_bulk(self, request: Request) -> JSONResponse:
+        """Finish many maintenance windows right now."""
+        data = await aget_json_or_400(request)
+        windows, results = await self._get_bulk_windows(data)
+        running = []
+        for window in windows:
+            error = _check_running(window)
+            if error:
+                results.append(_bulk_error(400, error, window.id))
+                continue
+            running.append(window)
+            results.append({"mw_id": window.id, "code": 200})
+        await self.scheduler.aend_maintenances_early(running)
+        return _bulk_response(results, 200)
+
+    @rest("/v1/bulk/extend", methods=["POST"])
+    @validate_openapi(spec)
+    async def extend_mw_bulk(self, request: Request) -> JSONResponse:
+        """Extend many running maintenance windows at once."""
+        data = await aget_json_or_400(request)
+        extension = timedelta(**data["extension"])
+        windows, results = await self._get_bulk_windows(data)
+        extended = []
+        for window in windows:
+            error = _check_running(window)
+            if error is None and window.recurrence is not None:
+                error = f"Recurring maintenance window {window.id} cannot be extended"
+            if error:
+                results.append(_bulk_error(400, error, window.id))
+                continue
+            extended.append(window.copy(update={"end": window.end + extension}))
+            results.append({"mw_id": window.id, "code": 200})
+        await self.scheduler.aupdate_many(extended)
+        return _bulk_response(results, 200)
+
+    async def _get_bulk_windows(self, data: dict) -> tuple[list[MW], list[dict]]:
+        """Get the windows selected by the mw_ids and filter of a bulk request.
+        Also returns the results of the requested ids that were not found.
+        """
+        mw_ids = data.get("mw_ids", [])
+        if not mw_ids and not data.get("filter"):
+            raise HTTPException(400, detail="Either mw_ids or filter must be given")
+        try:
+            window_filter = MaintenanceFilter.model_validate(
+                {**data.get("filter", {}), "ids": mw_ids}
+            )
+        except ValidationError as err:
+            msg = error_msg(err.errors())
+            raise HTTPException(400, detail=msg) from err
+        windows = await self.scheduler.alist_maintenances(
+            window_filter, limit=settings.BULK_MAX_WINDOWS + 1
+        )
+        if len(windows) > settings.BULK_MAX_WINDOWS:
+            raise HTTPException(
+                400,
+                detail=f"More than {settings.BULK_MAX_WINDOWS} windows selected",
+            )
+        found = {window.id for window in windows}
+        results = [
+            _bulk_error(404, f"Maintenance with id {mw_id} not found", mw_id)
+            for mw_id in dict.fromkeys(mw_ids)
+            if mw_id not in found
+        ]
+        return list(windows), results
+
     @rest("/v1/{mw_id}", methods=["PATCH"])
-    def update_mw(self, request: Request) -> JSONResponse:
+    async def update_mw(self, request: Request) -> JSONResponse:
         """Update a maintenance window."""
-        data = get_json_or_400(request, self.controller.loop)
+        data = await aget_json_or_400(request)
         if not isinstance(data, dict) or not data:
             raise HTTPException(400, detail=f"Invalid json body value: {data}")
 
         mw_id: MaintenanceID = request.path_params["mw_id"]
-        old_maintenance = self.scheduler.get_maintenance(mw_id)
+        old_maintenance = await self.scheduler.aget_maintenance(mw_id)
         if old_maintenance is None:
             raise HTTPException(404, detail=f"Maintenance with id {mw_id} not found")
         if old_maintenance.status == Status.RUNNING:
@@ -141,38 +615,36 @@ class Main(KytosNApp):
                 400, detail="Updating a maintenance status is not allowed"
             )
         try:
-            new_maintenance = MW.model_validate(
-                {**old_maintenance.model_dump(), **data}
-            )
+            new_maintenance = old_maintenance.validate_changes(data)
         except ValidationError as err:
             msg = error_msg(err.errors())
             raise HTTPException(400, detail=msg) from err
         if new_maintenance.id != old_maintenance.id:
             raise HTTPException(400, detail="Updated id must match old id")
-        self.scheduler.update(new_maintenance)
+        await self.scheduler.aupdate(new_maintenance)
         return JSONResponse({"response": f"Maintenance {mw_id} updated"})
 
     @rest("/v1/{mw_id}", methods=["DELETE"])
-    def remove_mw(self, request: Request) -> JSONResponse:
+    async def remove_mw(self, request: Request) -> JSONResponse:
         """Delete a maintenance window."""
         mw_id: MaintenanceID = request.path_params["mw_id"]
-        maintenance = self.scheduler.get_maintenance(mw_id)
+        maintenance = await self.scheduler.aget_maintenance(mw_id)
         if maintenance is None:
             raise HTTPException(404, detail=f"Maintenance with id {mw_id} not found")
         if maintenance.status == Status.RUNNING:
             raise HTTPException(
                 400, detail="Deleting a running maintenance is not allowed"
             )
-        self.scheduler.remove(mw_id)
+        await self.scheduler.aremove(mw_id)
         return JSONResponse(
             {"response": f"Maintenance with id {mw_id} successfully removed"}
         )
 
     @rest("/v1/{mw_id}/end", methods=["PATCH"])
-    def end_mw(self, request: Request) -> JSONResponse:
+    async def end_mw(self, request: Request) -> JSONResponse:
         """Finish a maintenance window right now."""
         mw_id: MaintenanceID = request.path_params["mw_id"]
-        maintenance = self.scheduler.get_maintenance(mw_id)
+        maintenance = await self.scheduler.aget_maintenance(mw_id)
         if maintenance is None:
             raise HTTPException(404, detail=f"Maintenance with id {mw_id} not found")
         if maintenance.status == Status.PENDING:
@@ -183,19 +655,19 @@ class Main(KytosNApp):
             raise HTTPException(
                 400, detail=f"Maintenance window {mw_id} has already finished"
             )
-        self.scheduler.end_maintenance_early(mw_id)
+        await self.scheduler.aend_maintenance_early(mw_id)
         return JSONResponse({"response": f"Maintenance window {mw_id} " f"finished"})
 
     @rest("/v1/{mw_id}/extend", methods=["PATCH"])
     @validate_openapi(spec)
-    def extend_mw(self, request: Request) -> JSONResponse:
+    async def extend_mw(self, request: Request) -> JSONResponse:
         """Extend a running maintenance window."""
         mw_id: MaintenanceID = request.path_params["mw_id"]
-        data = get_json_or_400(request, self.controller.loop)
+        data = await aget_json_or_400(request)
         if not isinstance(data, dict):
             raise HTTPException(400, detail=f"Invalid json body value: {data}")
 
-        maintenance = self.scheduler.get_maintenance(mw_id)
+        maintenance = await self.scheduler.aget_maintenance(mw_id)
         if maintenance is None:
             raise HTTPException(404, detail=f"Maintenance with id {mw_id} not found")
         if maintenance.status == Status.PENDING:
@@ -206,14 +678,51 @@ class Main(KytosNApp):
             raise HTTPException(
                 400, detail=f"Maintenance window {mw_id} has already finished"
             )
+        if maintenance.recurrence is not None:
+            raise HTTPException(
+                400, detail=f"Recurring maintenance window {mw_id} cannot be extended"
+            )
         maintenance_end = maintenance.end + timedelta(**data)
         new_maintenance = maintenance.copy(update={"end": maintenance_end})
 
-        self.scheduler.update(new_maintenance)
+        await self.scheduler.aupdate(new_maintenance)
         return JSONResponse({"response": f"Maintenance {mw_id} extended"})
 
-    def validate_item_existence(self, window: MW):
-        """Validate that all items in a maintenance window exist."""
+    @listen_to(
+        ".*.switch.interface.created",
+        ".*.switch.interface.deleted",
+    )
+    def on_interface_changed(self, event):
+        """Refresh the maintenance state of the interface switch."""
+        self.handle_interface_changed(event)
+
+    def handle_interface_changed(self, event):
+        """Handle interface created/deleted"""
+        interface = event.content["interface"]
+        self.maintenance_deployer.refresh_topology([interface.switch.id])
+
+    @listen_to(
+        "kytos/topology.link_up",
+        "kytos/topology.link.deleted",
+    )
+    def on_link_changed(self, event):
+        """Refresh the maintenance state of the link endpoint switches."""
+        self.handle_link_changed(event)
+
+    def handle_link_changed(self, event):
+        """Handle link up/deleted"""
+        link = event.content["link"]
+        self.maintenance_deployer.refresh_topology(
+            [link.endpoint_a.switch.id, link.endpoint_b.switch.id]
+        )
+
+    @listen_to("kytos/topology.topology_loaded")
+    def on_topology_loaded(self, _event):
+        """Refresh the maintenance state of every switch."""
+        self.maintenance_deployer.refresh_topology()
+
+    def get_non_existant_items(self, window: MW) -> Optional[dict[str, list[str]]]:
+        """Get the items of a maintenance window that do not exist."""
         non_existant_switches = list(
             filter(
                 lambda switch_id: self.controller.switches.get(switch_id) is None,
@@ -235,9 +744,15 @@ class Main(KytosNApp):
         )
 
         if non_existant_switches or non_existant_interfaces or non_existant_links:
-            items = {
+            return {
                 "switches": non_existant_switches,
                 "interfaces": non_existant_interfaces,
                 "links": non_existant_links,
             }
+        return None
+
+    def validate_item_existence(self, window: MW):
+        """Validate that all items in a maintenance window exist."""
+        items = self.get_non_existant_items(window)
+        if items:
             raise HTTPException(400, f"Window contains non-existant items: {items}")
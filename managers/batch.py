@@ -0,0 +1,124 @@
+"""Module batching the APScheduler jobs due at the same instant."""
+from collections.abc import Callable
+from datetime import datetime
+from itertools import count
+from threading import Lock
+
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.schedulers.base import BaseScheduler
+
+BatchKey = tuple[datetime, type]
+
+
+class _Batch:
+    """Jobs of a class due at the same instant, run by one APScheduler job.
+    """
+
+    __slots__ = ('job_id', 'funcs')
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.funcs: dict[str, Callable] = {}
+
+
+class BatchScheduler:
+    """Adapter of an APScheduler scheduler adding a single job for all the
+    jobs of a class due at the same instant.
+
+    Implements the same interface as TimerQueue, so it can replace the
+    APScheduler scheduler it wraps. When the single job runs, the jobs of
+    a class with a run_batch classmethod are given to it as a single list,
+    the other jobs are called one by one.
+    """
+
+    def __init__(self, scheduler: BaseScheduler):
+        self.scheduler = scheduler
+        self.batches: dict[BatchKey, _Batch] = {}
+        self.jobs: dict[str, BatchKey] = {}
+        self.sequence = count()
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def add_job(
+        self,
+        func: Callable,
+        trigger: str = 'date',
+        *,
+        id: str,
+        run_date: datetime,
+    ):
+        """Add a job to run func at run_date, replacing the one with its id.
+        """
+        # pylint: disable=redefined-builtin
+        if trigger != 'date':
+            raise ValueError(f'Unsupported trigger: {trigger}')
+        key = (run_date, type(func))
+        with self.lock:
+            self._cancel(id)
+            batch = self.batches.get(key)
+            if batch is None:
+                batch = self.batches[key] = _Batch(
+                    f'batch-{next(self.sequence)}'
+                )
+                self.scheduler.add_job(
+                    self._run,
+                    'date',
+                    id=batch.job_id,
+                    run_date=run_date,
+                    args=[key],
+                )
+            batch.funcs[id] = func
+            self.jobs[id] = key
+
+    def remove_job(self, job_id: str):
+        """Remove a job, raising JobLookupError if not found."""
+        with self.lock:
+            if not self._cancel(job_id):
+                raise JobLookupError(job_id)
+
+    def remove_all_jobs(self):
+        """Remove every job."""
+        with self.lock:
+            self.batches = {}
+            self.jobs = {}
+            self.scheduler.remove_all_jobs()
+
+    def start(self):
+        """Start the wrapped scheduler."""
+        self.scheduler.start()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the wrapped scheduler."""
+        self.scheduler.shutdown(wait=wait)
+
+    def _cancel(self, job_id: str) -> bool:
+        key = self.jobs.pop(job_id, None)
+        if key is None:
+            return False
+        batch = self.batches[key]
+        del batch.funcs[job_id]
+        if not batch.funcs:
+            del self.batches[key]
+            try:
+                self.scheduler.remove_job(batch.job_id)
+            except JobLookupError:
+                pass
+        return True
+
+    def _run(self, key: BatchKey):
+        """Run the jobs of a batch, batching them when possible."""
+        with self.lock:
+            batch = self.batches.pop(key, None)
+            if batch is None:
+                return
+            for job_id in batch.funcs:
+                del self.jobs[job_id]
+        funcs = list(batch.funcs.values())
+        run_batch = getattr(key[1], 'run_batch', None)
+        if run_batch is not None:
+            run_batch(funcs)
+        else:
+            for func in funcs:
+                func()
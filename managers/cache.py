@@ -0,0 +1,85 @@
+"""Module for caching maintenance windows in memory."""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Iterable, Optional
+
+from .. import settings
+from ..models import MaintenanceID, MaintenanceWindow, Status
+
+
+@dataclass
+class WindowCache:
+    """Write-through cache of maintenance windows, keyed by id.
+
+    Unfinished windows are always kept, as they are few and frequently
+    requested. Finished windows are kept in a LRU bounded by
+    finished_size, so memory stays flat as they pile up in the DB.
+    """
+    finished_size: int = settings.CACHE_FINISHED_SIZE
+    active: dict[MaintenanceID, MaintenanceWindow] = field(default_factory=dict)
+    finished: OrderedDict[MaintenanceID, MaintenanceWindow] = field(
+        default_factory=OrderedDict
+    )
+    hits: int = 0
+    misses: int = 0
+    lock: Lock = field(default_factory=Lock)
+
+    def __len__(self) -> int:
+        return len(self.active) + len(self.finished)
+
+    def get(self, mw_id: MaintenanceID) -> Optional[MaintenanceWindow]:
+        """Get a window from the cache, if present."""
+        with self.lock:
+            window = self.active.get(mw_id)
+            if window is None:
+                window = self.finished.get(mw_id)
+                if window is not None:
+                    self.finished.move_to_end(mw_id)
+            if window is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return window
+
+    def put(self, window: MaintenanceWindow):
+        """Add a window as stored in the DB, replacing the cached one."""
+        with self.lock:
+            self._put(window)
+
+    def put_if_absent(self, window: MaintenanceWindow) -> MaintenanceWindow:
+        """Add a window read from the DB unless the cache has it already,
+        as a window put while reading was stored later. Return the cached
+        window."""
+        with self.lock:
+            cached = self.active.get(window.id)
+            if cached is None:
+                cached = self.finished.get(window.id)
+            if cached is not None:
+                return cached
+            self._put(window)
+            return window
+
+    def _put(self, window: MaintenanceWindow):
+        if window.status == Status.FINISHED:
+            self.active.pop(window.id, None)
+            self.finished[window.id] = window
+            self.finished.move_to_end(window.id)
+            while len(self.finished) > self.finished_size:
+                self.finished.popitem(last=False)
+        else:
+            self.finished.pop(window.id, None)
+            self.active[window.id] = window
+
+    def discard(self, mw_ids: Iterable[MaintenanceID]):
+        """Remove windows from the cache, if present."""
+        with self.lock:
+            for mw_id in mw_ids:
+                self.active.pop(mw_id, None)
+                self.finished.pop(mw_id, None)
+
+    def clear(self):
+        """Remove every window from the cache."""
+        with self.lock:
+            self.active.clear()
+            self.finished.clear()
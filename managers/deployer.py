@@ -1,8 +1,9 @@
 """Module for handling the deployment of maintenance windows."""
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from itertools import chain
-from threading import Lock
+from threading import Lock, Timer
+from typing import Iterable, Optional
 
 from kytos.core.common import EntityStatus
 from kytos.core.controller import Controller
@@ -11,24 +12,143 @@ from kytos.core.switch import Switch
 from kytos.core.interface import Interface
 from kytos.core.link import Link
 
+from .. import metrics, settings
 from ..models import MaintenanceWindow
 
+DEVICE_KINDS = ('switches', 'interfaces', 'links')
+
+# Bound once, so the status functions count their calls without locking
+_count_switch_call = metrics.STATUS_FUNC_CALLS.incrementer('switch')
+_count_switch_reason_call = metrics.STATUS_FUNC_CALLS.incrementer(
+    'switch_reason'
+)
+_count_interface_call = metrics.STATUS_FUNC_CALLS.incrementer('interface')
+_count_interface_reason_call = metrics.STATUS_FUNC_CALLS.incrementer(
+    'interface_reason'
+)
+_count_link_call = metrics.STATUS_FUNC_CALLS.incrementer('link')
+_count_link_reason_call = metrics.STATUS_FUNC_CALLS.incrementer('link_reason')
+
+# Interface IDs of a switch, and the IDs of the interfaces and switches at
+# both ends of each of its links, keyed by link ID
+SwitchClosure = tuple[frozenset[str], dict[str, tuple[str, str, str, str]]]
+
+
+def _link_endpoints(link: Link) -> tuple[str, str, str, str]:
+    """Get the IDs of the interfaces and switches at both ends of a link."""
+    return (
+        link.endpoint_a.id,
+        link.endpoint_a.switch.id,
+        link.endpoint_b.id,
+        link.endpoint_b.switch.id,
+    )
+
+
+def _subtract(counter: Counter, dev_ids: Iterable[str]):
+    """Subtract devices from a maintenance counter, dropping the ones
+    no longer in maintenance, so only maintained devices are keys."""
+    for dev_id in dev_ids:
+        count = counter[dev_id] - 1
+        if count > 0:
+            counter[dev_id] = count
+        else:
+            counter.pop(dev_id, None)
+
+
+def _merge_windows(windows: list[MaintenanceWindow]) -> MaintenanceWindow:
+    """Merge the devices of many maintenance windows into a single window.
+    Devices present in many windows are repeated.
+    """
+    return MaintenanceWindow.model_construct(
+        id=','.join(window.id for window in windows),
+        switches=list(chain.from_iterable(w.switches for w in windows)),
+        interfaces=list(chain.from_iterable(w.interfaces for w in windows)),
+        links=list(chain.from_iterable(w.links for w in windows)),
+    )
+
+
+@dataclass(frozen=True)
+class MaintenanceSnapshot:
+    """IDs of the devices effectively under maintenance, either explicitly
+    or through the device they belong to.
+
+    Snapshots are immutable: changes build a new snapshot, which the
+    deployer swaps in with a single assignment. Readers holding a
+    snapshot always see a consistent state without locking.
+    """
+    switches: frozenset[str] = frozenset()
+    interfaces: frozenset[str] = frozenset()
+    links: frozenset[str] = frozenset()
+
+    def add(self, dev_ids: dict[str, frozenset[str]]) -> 'MaintenanceSnapshot':
+        """Get a snapshot with the given devices, by kind, added."""
+        return MaintenanceSnapshot(
+            self.switches | dev_ids['switches'],
+            self.interfaces | dev_ids['interfaces'],
+            self.links | dev_ids['links'],
+        )
+
+    def remove(
+        self,
+        dev_ids: dict[str, frozenset[str]],
+    ) -> 'MaintenanceSnapshot':
+        """Get a snapshot with the given devices, by kind, removed."""
+        return MaintenanceSnapshot(
+            self.switches - dev_ids['switches'],
+            self.interfaces - dev_ids['interfaces'],
+            self.links - dev_ids['links'],
+        )
+
 
 @dataclass
 class MaintenanceDeployer:
     """Class for deploying maintenances"""
+    # Kytos takes a status and a status reason function per device kind
+    # pylint: disable=too-many-public-methods
     controller: Controller
     maintenance_switches: Counter
     maintenance_interfaces: Counter
     maintenance_links: Counter
     lock: Lock
+    # Devices effectively under maintenance. Replaced as a whole by
+    # start_mw, end_mw and refresh_topology under the lock, and read
+    # without locking by the status functions, which only need a
+    # membership test.
+    snapshot: MaintenanceSnapshot = field(default_factory=MaintenanceSnapshot)
+    # Interface IDs and link endpoints of each switch, keyed by switch ID.
+    # Must be invalidated whenever the topology of a switch changes.
+    switch_closures: dict[str, SwitchClosure] = field(default_factory=dict)
+    # Seconds to wait for other windows starting or ending before emitting
+    # an interruption event, merging all of them into a single event.
+    # Events are emitted right away when it is 0.
+    event_delay: float = 0.0
+    # Devices of the events waiting to be emitted, by operation and kind.
+    # A device ended while its start is still pending, or vice versa,
+    # cancels out and is emitted in neither event.
+    pending_events: dict[str, dict[str, set[str]]] = field(
+        default_factory=lambda: {
+            operation: {kind: set() for kind in DEVICE_KINDS}
+            for operation in ('start', 'end')
+        }
+    )
+    pending_requests: Counter = field(default_factory=Counter)
+    event_timer: Optional[Timer] = None
+    # Number of events that were merged into another, by operation
+    merged_events: Counter = field(default_factory=Counter)
 
     @classmethod
     def new_deployer(cls, controller: Controller):
         """
         Creates a new MaintenanceDeployer from the given Kytos Controller
         """
-        instance = cls(controller, Counter(), Counter(), Counter(), Lock())
+        instance = cls(
+            controller,
+            Counter(),
+            Counter(),
+            Counter(),
+            Lock(),
+            event_delay=settings.EVENT_COALESCE_DELAY,
+        )
         Switch.register_status_func(
             'maintenance_status',
             instance.switch_status_func
@@ -57,7 +177,27 @@ class MaintenanceDeployer:
         return instance
 
     def _maintenance_event(self, window_devices: dict, operation: str):
-        """Create events to start/end a maintenance."""
+        """Create events to start/end a maintenance.
+        If event_delay is set, the event is merged with the other ones
+        created until the delay expires.
+        """
+        if not self.event_delay:
+            self._put_event(window_devices, operation)
+            return
+        opposite = 'end' if operation == 'start' else 'start'
+        pending = self.pending_events[operation]
+        cancelled = self.pending_events[opposite]
+        for kind in DEVICE_KINDS:
+            dev_ids = set(window_devices[kind])
+            pending[kind] |= dev_ids - cancelled[kind]
+            cancelled[kind] -= dev_ids
+        self.pending_requests[operation] += 1
+        if self.event_timer is None:
+            self.event_timer = Timer(self.event_delay, self.flush_events)
+            self.event_timer.daemon = True
+            self.event_timer.start()
+
+    def _put_event(self, window_devices: dict, operation: str):
         event = KytosEvent(
             f'topology.interruption.{operation}',
             content={
@@ -67,92 +207,171 @@ class MaintenanceDeployer:
         )
         self.controller.buffers.app.put(event)
 
-    def _get_affected_ids(
-        self,
-        window: MaintenanceWindow
-    ) -> dict[str, list[str]]:
-        explicit_switches = filter(
-            lambda switch: switch is not None,
-            map(
-                self.controller.switches.get,
-                window.switches
-            )
-        )
-
-        tot_switches = list(filter(
-            self.switch_not_in_maintenance,
-            explicit_switches
-        ))
-
-        implicit_interfaces = chain.from_iterable(
-            map(
-                lambda switch: switch.interfaces.values(),
-                tot_switches
-            )
-        )
-
-        explicit_interfaces = filter(
-            lambda interface: interface is not None,
-            map(
-                self.controller.get_interface_by_id,
-                window.interfaces
+    def flush_events(self):
+        """Emit the pending interruption events right away."""
+        with self.lock:
+            if self.event_timer is not None:
+                self.event_timer.cancel()
+                self.event_timer = None
+            events = []
+            for operation, pending in self.pending_events.items():
+                requests = self.pending_requests.pop(operation, 0)
+                if not requests:
+                    continue
+                window_devices = {
+                    kind: sorted(pending[kind]) for kind in DEVICE_KINDS
+                }
+                for dev_ids in pending.values():
+                    dev_ids.clear()
+                if any(window_devices.values()):
+                    events.append((window_devices, operation))
+                    requests -= 1
+                self.merged_events[operation] += requests
+        for window_devices, operation in events:
+            self._put_event(window_devices, operation)
+
+    def _get_switch_closure(self, switch: Switch) -> SwitchClosure:
+        """Get the interface IDs and link endpoints of a switch,
+        using the cache."""
+        closure = self.switch_closures.get(switch.id)
+        if closure is None:
+            interfaces = switch.interfaces.values()
+            closure = (
+                frozenset(interface.id for interface in interfaces),
+                {
+                    interface.link.id: _link_endpoints(interface.link)
+                    for interface in interfaces
+                    if interface.link is not None
+                },
             )
+            self.switch_closures[switch.id] = closure
+        return closure
+
+    def invalidate_closures(self, switch_ids: Optional[Iterable[str]] = None):
+        """Drop the cached closures of the given switches, or all of them."""
+        if switch_ids is None:
+            self.switch_closures.clear()
+            return
+        for switch_id in switch_ids:
+            self.switch_closures.pop(switch_id, None)
+
+    def refresh_topology(self, switch_ids: Optional[Iterable[str]] = None):
+        """Drop the cached closures of the given switches, or all of them,
+        and rebuild the snapshot against the current topology.
+
+        Devices added to or removed from the topology while under
+        maintenance are only found by expanding the maintained devices
+        again, as start_mw and end_mw only update the devices they see.
+        """
+        with self.lock:
+            self.invalidate_closures(switch_ids)
+            self.snapshot = self._build_snapshot()
+
+    def _build_snapshot(self) -> MaintenanceSnapshot:
+        """Build the snapshot of every device under maintenance from the
+        maintenance counters."""
+        window = MaintenanceWindow.model_construct(
+            switches=list(self.maintenance_switches),
+            interfaces=list(self.maintenance_interfaces),
+            links=list(self.maintenance_links),
         )
-
-        tot_interfaces = list(
-            filter(
-                self.interface_not_in_maintenance,
-                chain(implicit_interfaces, explicit_interfaces)
-            )
+        return MaintenanceSnapshot(
+            **self._get_affected_ids(window, include_maintained=True)
         )
 
-        implicit_links = filter(
-            lambda link: link is not None,
-            map(
-                lambda interface: interface.link,
-                tot_interfaces
-            )
-        )
+    def _get_affected_ids(
+        self,
+        window: MaintenanceWindow,
+        include_maintained: bool = False,
+    ) -> dict[str, frozenset[str]]:
+        """Get the IDs of the devices affected by a maintenance window,
+        recording the time taken and the number of devices found."""
+        with metrics.EXPANSION_LATENCY.time():
+            affected_ids = self._expand_window(window, include_maintained)
+        metrics.EXPANSION_SIZE.observe(sum(map(len, affected_ids.values())))
+        return affected_ids
+
+    def _expand_window(
+        self,
+        window: MaintenanceWindow,
+        include_maintained: bool = False,
+    ) -> dict[str, frozenset[str]]:
+        """Get the IDs of the devices affected by a maintenance window.
+
+        Unless include_maintained is set, devices already undergoing
+        maintenance are left out. Devices are handled by ID, so leaving
+        them out is a set difference against the maintenance counters.
+        """
+        maintained_switches = self.maintenance_switches
+        maintained_interfaces = self.maintenance_interfaces
+        maintained_links = self.maintenance_links
+        if include_maintained:
+            maintained_switches = maintained_interfaces = {}
+            maintained_links = {}
+
+        switches = self.controller.switches
+        switch_ids = {
+            switch_id
+            for switch_id in window.switches
+            if switch_id not in maintained_switches
+            and switches.get(switch_id) is not None
+        }
 
-        explicit_links = filter(
-            lambda link: link is not None,
-            map(
-                self.controller.links.get,
-                window.links
+        interface_ids = set()
+        link_endpoints = {}
+        for switch_id in switch_ids:
+            closure_interfaces, closure_links = self._get_switch_closure(
+                switches[switch_id]
             )
-        )
+            interface_ids.update(closure_interfaces)
+            link_endpoints.update(closure_links)
+
+        for interface in map(
+            self.controller.get_interface_by_id,
+            window.interfaces
+        ):
+            if interface is None:
+                continue
+            if interface.switch.id not in maintained_switches:
+                interface_ids.add(interface.id)
+            if interface.link is not None:
+                link_endpoints[interface.link.id] = _link_endpoints(
+                    interface.link
+                )
 
-        tot_links = list(
-            filter(
-                self.link_not_in_maintenance,
-                chain(implicit_links, explicit_links)
-            )
-        )
+        for link in map(self.controller.links.get, window.links):
+            if link is not None:
+                link_endpoints[link.id] = _link_endpoints(link)
 
-        affected_switch_ids = frozenset(
-            map(
-                lambda switch: switch.id,
-                tot_switches
-            )
-        )
+        return {
+            'switches': frozenset(switch_ids),
+            'interfaces': frozenset(
+                interface_id
+                for interface_id in interface_ids
+                if interface_id not in maintained_interfaces
+            ),
+            'links': frozenset(
+                link_id
+                for link_id, (
+                    interface_a, switch_a, interface_b, switch_b
+                ) in link_endpoints.items()
+                if link_id not in maintained_links
+                and interface_a not in maintained_interfaces
+                and interface_b not in maintained_interfaces
+                and switch_a not in maintained_switches
+                and switch_b not in maintained_switches
+            ),
+        }
 
-        affected_interface_ids = frozenset(
-            map(
-                lambda interface: interface.id,
-                tot_interfaces
-            )
-        )
+    def simulate_mw(self, window: MaintenanceWindow) -> dict[str, list[str]]:
+        """Get every device a maintenance window would cover.
 
-        affected_link_ids = frozenset(
-            map(
-                lambda link: link.id,
-                tot_links
-            )
-        )
+        The maintenance counters are not modified.
+        """
+        affected_ids = self._get_affected_ids(window, include_maintained=True)
         return {
-            'switches': affected_switch_ids,
-            'interfaces': affected_interface_ids,
-            'links': affected_link_ids,
+            key: sorted(ids)
+            for key, ids in affected_ids.items()
         }
 
     def start_mw(self, window: MaintenanceWindow):
@@ -164,6 +383,8 @@ class MaintenanceDeployer:
             self.maintenance_interfaces.update(window.interfaces)
             self.maintenance_links.update(window.links)
 
+            self.snapshot = self.snapshot.add(affected_ids)
+
             self._maintenance_event(
                 affected_ids,
                 'start'
@@ -172,17 +393,46 @@ class MaintenanceDeployer:
     def end_mw(self, window: MaintenanceWindow):
         """Actions taken when a maintenance window finishes."""
         with self.lock:
-            self.maintenance_switches.subtract(window.switches)
-            self.maintenance_interfaces.subtract(window.interfaces)
-            self.maintenance_links.subtract(window.links)
+            _subtract(self.maintenance_switches, window.switches)
+            _subtract(self.maintenance_interfaces, window.interfaces)
+            _subtract(self.maintenance_links, window.links)
 
             affected_ids = self._get_affected_ids(window)
 
+            self.snapshot = self.snapshot.remove(affected_ids)
+
             self._maintenance_event(
                 affected_ids,
                 'end'
             )
 
+    def start_mws(self, windows: Iterable[MaintenanceWindow]):
+        """Start many maintenance windows, emitting a single event."""
+        windows = list(windows)
+        if windows:
+            self.start_mw(_merge_windows(windows))
+
+    def end_mws(self, windows: Iterable[MaintenanceWindow]):
+        """End many maintenance windows, emitting a single event."""
+        windows = list(windows)
+        if windows:
+            self.end_mw(_merge_windows(windows))
+
+    @property
+    def effective_switches(self) -> frozenset[str]:
+        """IDs of the switches effectively under maintenance."""
+        return self.snapshot.switches
+
+    @property
+    def effective_interfaces(self) -> frozenset[str]:
+        """IDs of the interfaces effectively under maintenance."""
+        return self.snapshot.interfaces
+
+    @property
+    def effective_links(self) -> frozenset[str]:
+        """IDs of the links effectively under maintenance."""
+        return self.snapshot.links
+
     def switch_not_in_maintenance(self, dev: Switch) -> bool:
         """Checks if a switch is not undergoing maintenance"""
         return not self.maintenance_switches[dev.id]
@@ -208,36 +458,42 @@ class MaintenanceDeployer:
 
     def switch_status_func(self, dev: Switch) -> EntityStatus:
         """Checks if a given device is undergoing maintenance"""
-        if self.switch_not_in_maintenance(dev):
-            return EntityStatus.UP
-        return EntityStatus.DOWN
+        _count_switch_call()
+        if dev.id in self.snapshot.switches:
+            return EntityStatus.DOWN
+        return EntityStatus.UP
 
     def switch_status_reason_func(self, dev: Switch) -> frozenset:
         """Checks if a given device is undergoing maintenance"""
-        if self.switch_not_in_maintenance(dev):
-            return frozenset()
-        return frozenset({'maintenance'})
+        _count_switch_reason_call()
+        if dev.id in self.snapshot.switches:
+            return frozenset({'maintenance'})
+        return frozenset()
 
     def interface_status_func(self, dev: Interface) -> EntityStatus:
         """Checks if a given device is undergoing maintenance"""
-        if self.interface_not_in_maintenance(dev):
-            return EntityStatus.UP
-        return EntityStatus.DOWN
+        _count_interface_call()
+        if dev.id in self.snapshot.interfaces:
+            return EntityStatus.DOWN
+        return EntityStatus.UP
 
     def interface_status_reason_func(self, dev: Interface) -> frozenset:
         """Checks if a given device is undergoing maintenance"""
-        if self.interface_not_in_maintenance(dev):
-            return frozenset()
-        return frozenset({'maintenance'})
+        _count_interface_reason_call()
+        if dev.id in self.snapshot.interfaces:
+            return frozenset({'maintenance'})
+        return frozenset()
 
     def link_status_func(self, dev: Link) -> EntityStatus:
         """Checks if a given device is undergoing maintenance"""
-        if self.link_not_in_maintenance(dev):
-            return EntityStatus.UP
-        return EntityStatus.DOWN
+        _count_link_call()
+        if dev.id in self.snapshot.links:
+            return EntityStatus.DOWN
+        return EntityStatus.UP
 
     def link_status_reason_func(self, dev: Link) -> frozenset:
         """Checks if a given device is undergoing maintenance"""
-        if self.link_not_in_maintenance(dev):
-            return frozenset()
-        return frozenset({'maintenance'})
\ No newline at end of file
+        _count_link_reason_call()
+        if dev.id in self.snapshot.links:
+            return frozenset({'maintenance'})
+        return frozenset()
@@ -0,0 +1,304 @@
+"""Module for detecting overlapping maintenance windows in memory."""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Any, Hashable, Iterable, Optional
+
+from ..models import MaintenanceID, MaintenanceWindow
+
+
+class _Node:
+    """Node of an IntervalTree."""
+
+    __slots__ = ('key', 'end', 'max_end', 'value', 'priority', 'left', 'right')
+
+    def __init__(self, key: tuple, end: datetime, value: Any):
+        self.key = key
+        self.end = end
+        self.max_end = end
+        self.value = value
+        self.priority = random.random()
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+
+    def update(self):
+        """Recompute the maximum end of the subtree."""
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _rotate_right(node: _Node) -> _Node:
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    node.update()
+    pivot.update()
+    return pivot
+
+
+def _rotate_left(node: _Node) -> _Node:
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    node.update()
+    pivot.update()
+    return pivot
+
+
+def _build(nodes: list[_Node]) -> Optional[_Node]:
+    """Build a treap from nodes sorted by key in O(n), as a Cartesian
+    tree of their priorities, and compute the maximum end of each node.
+    """
+    stack: list[_Node] = []
+    for node in nodes:
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+    if not stack:
+        return None
+    root = stack[0]
+    # Update children before their parents, in reverse preorder
+    order = []
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        order.append(node)
+        if node.left is not None:
+            pending.append(node.left)
+        if node.right is not None:
+            pending.append(node.right)
+    for node in reversed(order):
+        node.update()
+    return root
+
+
+class IntervalTree:
+    """Set of half-open [start, end) intervals supporting overlap queries.
+
+    Intervals are kept in a treap sorted by start, where every node knows
+    the maximum end of its subtree. Insertion and removal take O(log n)
+    and finding the k intervals overlapping another one takes
+    O(log n + k) expected time.
+    """
+
+    def __init__(self):
+        self.root: Optional[_Node] = None
+        self.keys: dict[Hashable, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self.keys
+
+    def insert(
+        self,
+        item_id: Hashable,
+        start: datetime,
+        end: datetime,
+        value: Any,
+    ):
+        """Insert an interval, replacing the one with the same id."""
+        self.remove(item_id)
+        key = (start, item_id)
+        self.keys[item_id] = key
+        self.root = self._insert(self.root, _Node(key, end, value))
+
+    def insert_many(
+        self,
+        items: Iterable[tuple[Hashable, datetime, datetime, Any]],
+    ):
+        """Insert many (item_id, start, end, value) intervals.
+        An empty tree is built at once in O(n log n), sorting the
+        intervals, instead of inserting them one by one.
+        """
+        if self.root is not None:
+            for item in items:
+                self.insert(*item)
+            return
+        nodes = {}
+        for item_id, start, end, value in items:
+            nodes[item_id] = _Node((start, item_id), end, value)
+        self.keys = {item_id: node.key for item_id, node in nodes.items()}
+        self.root = _build(sorted(nodes.values(), key=lambda node: node.key))
+
+    def remove(self, item_id: Hashable) -> bool:
+        """Remove the interval with the given id, if present."""
+        key = self.keys.pop(item_id, None)
+        if key is None:
+            return False
+        self.root = self._remove(self.root, key)
+        return True
+
+    def overlapping(self, start: datetime, end: datetime) -> list:
+        """Get the values of the intervals overlapping [start, end)."""
+        result = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            if node.key[0] < end:
+                if node.end > start:
+                    result.append(node.value)
+                stack.append(node.right)
+        return result
+
+    def _insert(self, node: Optional[_Node], new: _Node) -> _Node:
+        if node is None:
+            return new
+        if new.key < node.key:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                node = _rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                node = _rotate_left(node)
+        node.update()
+        return node
+
+    def _remove(self, node: Optional[_Node], key: tuple) -> Optional[_Node]:
+        if node is None:
+            return None
+        if key < node.key:
+            node.left = self._remove(node.left, key)
+        elif key > node.key:
+            node.right = self._remove(node.right, key)
+        elif node.left is None:
+            return node.right
+        elif node.right is None:
+            return node.left
+        elif node.left.priority > node.right.priority:
+            node = _rotate_right(node)
+            node.right = self._remove(node.right, key)
+        else:
+            node = _rotate_left(node)
+            node.left = self._remove(node.left, key)
+        node.update()
+        return node
+
+
+@dataclass
+class OverlapIndex:
+    """In-memory index of unfinished maintenance windows.
+
+    Windows are indexed by their execution period, both globally and
+    for each switch, interface and link they contain. Recurring windows
+    are indexed from the start of their current occurrence to the end of
+    their last one, and their occurrences are then checked one against
+    the other with MaintenanceWindow.overlaps.
+    """
+    windows: dict[MaintenanceID, MaintenanceWindow] = field(
+        default_factory=dict
+    )
+    timeline: IntervalTree = field(default_factory=IntervalTree)
+    assets: dict[tuple[str, str], IntervalTree] = field(default_factory=dict)
+    lock: Lock = field(default_factory=Lock)
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    @staticmethod
+    def _asset_keys(window: MaintenanceWindow) -> set[tuple[str, str]]:
+        return {
+            *(('switches', dev_id) for dev_id in window.switches),
+            *(('interfaces', dev_id) for dev_id in window.interfaces),
+            *(('links', dev_id) for dev_id in window.links),
+        }
+
+    def add(self, window: MaintenanceWindow):
+        """Add a window to the index, replacing the one with the same id."""
+        with self.lock:
+            self._remove(window.id)
+            self.windows[window.id] = window
+            end = window.last_end()
+            self.timeline.insert(window.id, window.start, end, window)
+            for asset in self._asset_keys(window):
+                tree = self.assets.get(asset)
+                if tree is None:
+                    tree = self.assets[asset] = IntervalTree()
+                tree.insert(window.id, window.start, end, window)
+
+    def add_many(self, windows: Iterable[MaintenanceWindow]):
+        """Add many windows to the index, building the trees at once
+        when they are empty."""
+        with self.lock:
+            by_asset: dict[tuple[str, str], list] = {}
+            timeline = []
+            windows = {window.id: window for window in windows}
+            for window in windows.values():
+                self._remove(window.id)
+                self.windows[window.id] = window
+                item = (window.id, window.start, window.last_end(), window)
+                timeline.append(item)
+                for asset in self._asset_keys(window):
+                    by_asset.setdefault(asset, []).append(item)
+            self.timeline.insert_many(timeline)
+            for asset, items in by_asset.items():
+                tree = self.assets.get(asset)
+                if tree is None:
+                    tree = self.assets[asset] = IntervalTree()
+                tree.insert_many(items)
+
+    def remove(self, mw_id: MaintenanceID):
+        """Remove a window from the index, if present."""
+        with self.lock:
+            self._remove(mw_id)
+
+    def clear(self):
+        """Remove every window from the index."""
+        with self.lock:
+            self.windows = {}
+            self.timeline = IntervalTree()
+            self.assets = {}
+
+    def _remove(self, mw_id: MaintenanceID):
+        window = self.windows.pop(mw_id, None)
+        if window is None:
+            return
+        self.timeline.remove(mw_id)
+        for asset in self._asset_keys(window):
+            tree = self.assets[asset]
+            tree.remove(mw_id)
+            if not tree:
+                del self.assets[asset]
+
+    def overlapping(
+        self,
+        window: MaintenanceWindow,
+        force=False,
+    ) -> list[MaintenanceWindow]:
+        """Get the indexed windows overlapping with the given window.
+        If force=True, only windows sharing components are considered.
+        """
+        end = window.last_end()
+        with self.lock:
+            if not force:
+                overlapping = self.timeline.overlapping(window.start, end)
+            else:
+                found = {}
+                for asset in self._asset_keys(window):
+                    tree = self.assets.get(asset)
+                    if tree is None:
+                        continue
+                    for other in tree.overlapping(window.start, end):
+                        found[other.id] = other
+                overlapping = found.values()
+        overlapping = [
+            other
+            for other in overlapping
+            if window.recurrence is None and other.recurrence is None
+            or window.overlaps(other)
+        ]
+        return sorted(overlapping, key=lambda other: (other.start, other.id))
@@ -1,23 +1,53 @@
 """Module for handling the scheduled execution of maintenance windows."""
-import pytz
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import AsyncIterator, Iterable, Iterator, Optional, Union
 
+import pytz
+from apscheduler.executors.debug import DebugExecutor
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.schedulers.base import BaseScheduler
+from pymongo.errors import DuplicateKeyError
 
+from kytos.core import log
 
-from .deployer import MaintenanceDeployer
-from ..controllers import MaintenanceController
+from .. import metrics, settings
+from ..controllers import (
+    AsyncMaintenanceController,
+    AsyncMongoClient,
+    MaintenanceController,
+    ThreadedMaintenanceController,
+    WindowPages,
+)
 from ..models import (
+    MaintenanceFilter,
     MaintenanceID,
     MaintenanceWindow,
     MaintenanceWindows,
     OverlapError,
     Status,
 )
+from .batch import BatchScheduler
+from .cache import WindowCache
+from .deployer import MaintenanceDeployer
+from .overlap import OverlapIndex
+from .timer import TimerQueue
+
+
+def _next_occurrences(
+    windows: Iterable[MaintenanceWindow],
+) -> list[MaintenanceWindow]:
+    """Get the next occurrences of the ended recurring windows."""
+    return [
+        occurrence
+        for window in windows
+        if (occurrence := window.next_occurrence()) is not None
+    ]
 
-from kytos.core import log
 
 @dataclass
 class MaintenanceStart:
@@ -26,9 +56,19 @@ class MaintenanceStart:
     """
     maintenance_scheduler: 'MaintenanceScheduler'
     mw_id: MaintenanceID
+    run_at: Optional[datetime] = field(default=None, compare=False)
 
     def __call__(self):
-        self.maintenance_scheduler.start_maintenance(self.mw_id)
+        if self.maintenance_scheduler.apply_misfire_policy('start', [self]):
+            self.maintenance_scheduler.start_maintenance(self.mw_id)
+
+    @classmethod
+    def run_batch(cls, jobs: list['MaintenanceStart']):
+        """Start the windows of many jobs due at the same time."""
+        scheduler = jobs[0].maintenance_scheduler
+        mw_ids = scheduler.apply_misfire_policy('start', jobs)
+        if mw_ids:
+            scheduler.start_maintenances(mw_ids)
 
 
 @dataclass
@@ -38,43 +78,113 @@ class MaintenanceEnd:
     """
     maintenance_scheduler: 'MaintenanceScheduler'
     mw_id: MaintenanceID
+    run_at: Optional[datetime] = field(default=None, compare=False)
 
     def __call__(self):
-        self.maintenance_scheduler.end_maintenance(self.mw_id)
+        if self.maintenance_scheduler.apply_misfire_policy('end', [self]):
+            self.maintenance_scheduler.end_maintenance(self.mw_id)
+
+    @classmethod
+    def run_batch(cls, jobs: list['MaintenanceEnd']):
+        """End the windows of many jobs due at the same time."""
+        scheduler = jobs[0].maintenance_scheduler
+        mw_ids = scheduler.apply_misfire_policy('end', jobs)
+        if mw_ids:
+            scheduler.end_maintenances(mw_ids)
+
 
 @dataclass
 class MaintenanceScheduler:
     """Class for scheduling maintenance windows."""
     deployer: MaintenanceDeployer
     db_controller: MaintenanceController
-    scheduler: BaseScheduler
+    scheduler: Union[BaseScheduler, BatchScheduler, TimerQueue]
+    overlap_index: OverlapIndex = field(default_factory=OverlapIndex)
+    window_cache: WindowCache = field(default_factory=WindowCache)
+    # DB controller of the coroutine methods, used by the REST handlers.
+    # When not given, the methods of db_controller are run in threads.
+    async_db_controller: Optional[
+        Union[AsyncMaintenanceController, ThreadedMaintenanceController]
+    ] = None
+
+    def __post_init__(self):
+        if self.async_db_controller is None:
+            self.async_db_controller = ThreadedMaintenanceController(
+                self.db_controller
+            )
 
     @classmethod
     def new_scheduler(cls, deployer: MaintenanceDeployer):
         """
         Creates a new scheduler from the given MaintenanceDeployer
         """
-        scheduler = BackgroundScheduler(timezone=pytz.utc)
+        if settings.SCHEDULER_ENGINE == 'timer':
+            scheduler = TimerQueue()
+        else:
+            if settings.SCHEDULER_EXECUTOR == 'debug':
+                executor = DebugExecutor()
+            else:
+                executor = ThreadPoolExecutor(settings.SCHEDULER_MAX_WORKERS)
+            # Late jobs always run, leaving them to the MISFIRE_POLICY
+            scheduler = BackgroundScheduler(
+                timezone=pytz.utc,
+                executors={'default': executor},
+                job_defaults={'misfire_grace_time': None},
+            )
+            if settings.SCHEDULER_BATCH_JOBS:
+                scheduler = BatchScheduler(scheduler)
         db_controller = MaintenanceController()
-        db_controller.bootstrap_indexes()
-        instance = cls(deployer, db_controller, scheduler)
+        db_controller.bootstrap_indexes(
+            archive_ttl=int(timedelta(days=settings.ARCHIVE_TTL_DAYS).total_seconds())
+        )
+        async_db_controller = None
+        if AsyncMongoClient is not None:
+            async_db_controller = AsyncMaintenanceController()
+        else:
+            log.warning(
+                'pymongo has no asyncio client, REST handlers will access '
+                'the DB from threads'
+            )
+        instance = cls(
+            deployer,
+            db_controller,
+            scheduler,
+            async_db_controller=async_db_controller,
+        )
         return instance
 
     def start(self):
         """
         Begin running the scheduler.
+
+        Unfinished windows are recovered in batch, starting all the
+        running ones with a single deployer call and a single event.
+        Recurring windows are first moved to their current occurrence.
         """
+        started_at = monotonic()
         self.db_controller.prepare_start()
 
         # Populate the scheduler with all pending tasks
-        windows = self.db_controller.get_unfinished_windows()
+        windows = self._catch_up(self.db_controller.get_unfinished_windows())
+        unfinished = []
+        running = []
         for window in windows:
+            self.window_cache.put(window)
+            if window.status != Status.FINISHED:
+                unfinished.append(window)
             if window.status == Status.RUNNING:
-                self.deployer.start_mw(window)
-            self._schedule(window)
+                running.append(window)
+        self.overlap_index.add_many(unfinished)
+        self.deployer.start_mws(running)
+        scheduled = self._schedule_many(windows)
 
         # Start the scheduler
         self.scheduler.start()
+        log.info(
+            f'Recovered {len(windows)} maintenance windows, '
+            f'{len(running)} running and {scheduled} scheduled, '
+            f'in {monotonic() - started_at:.3f}s'
+        )
 
     def shutdown(self):
         """
@@ -85,15 +195,22 @@ class MaintenanceScheduler:
         # Depopulate the scheduler
         for window in windows:
             self._unschedule(window)
+        self.deployer.flush_events()
 
         self.scheduler.remove_all_jobs()
         self.scheduler.shutdown()
+        self.overlap_index.clear()
+        self.window_cache.clear()
+        if isinstance(self.async_db_controller, AsyncMaintenanceController):
+            self.async_db_controller.close()
 
     def start_maintenance(self, mw_id: MaintenanceID):
         """Begins executing the maintenance window
         """
         # Get Maintenance from DB and Update
         window = self.db_controller.start_window(mw_id)
+        self.window_cache.put(window)
+        self.overlap_index.add(window)
 
         # Activate Running
         self.deployer.start_mw(window)
@@ -106,56 +223,523 @@ class MaintenanceScheduler:
         """
         # Get Maintenance from DB
         window = self.db_controller.end_window(mw_id)
+        self.window_cache.put(window)
+        self.overlap_index.remove(mw_id)
 
         # Set to Ending
         self.deployer.end_mw(window)
+        self._recur([window])
+
+    def start_maintenances(self, mw_ids: list[MaintenanceID]):
+        """Begins executing many maintenance windows at once,
+        emitting a single event for all of them.
+        """
+        self.db_controller.start_windows(mw_ids)
+        windows = self.db_controller.get_windows(
+            MaintenanceFilter(ids=mw_ids)
+        )
+        for window in windows:
+            self.window_cache.put(window)
+            self.overlap_index.add(window)
+        self.deployer.start_mws(windows)
+        for window in windows:
+            self._schedule(window)
+
+    def end_maintenances(self, mw_ids: list[MaintenanceID]):
+        """Ends execution of many maintenance windows at once,
+        emitting a single event for all of them.
+        """
+        windows = self.db_controller.get_windows(
+            MaintenanceFilter(ids=mw_ids)
+        )
+        self.db_controller.end_windows(mw_ids)
+        self.window_cache.discard(mw_ids)
+        for window in windows:
+            self.overlap_index.remove(window.id)
+        self.deployer.end_mws(windows)
+        self._recur(windows)
+
+    def apply_misfire_policy(
+        self,
+        job: str,
+        jobs: list[Union[MaintenanceStart, MaintenanceEnd]],
+    ) -> list[MaintenanceID]:
+        """Record the lag of start or end jobs and apply MISFIRE_POLICY to
+        the ones running more than MISFIRE_GRACE_TIME seconds late.
+
+        Windows whose start is skipped are finished without starting,
+        and recurring ones are moved to their next occurrence.
+        Returns the ids of the windows to start or end.
+        """
+        now = datetime.now(pytz.utc)
+        to_run = []
+        skipped = []
+        for item in jobs:
+            lag = metrics.observe_lag(job, item.run_at)
+            if lag is None or lag <= settings.MISFIRE_GRACE_TIME:
+                to_run.append(item.mw_id)
+                continue
+            late = f'{lag:.3f}s late, scheduled at {item.run_at}'
+            if job == 'start' and self._skip_start(item.mw_id, now):
+                metrics.JOB_MISFIRES.inc(job=job, action='skip')
+                log.error(f'Skipped the start of "{item.mw_id}", {late}')
+                skipped.append(item.mw_id)
+                continue
+            metrics.JOB_MISFIRES.inc(job=job, action='run')
+            log.warning(f'Running the {job} of "{item.mw_id}" {late}')
+            to_run.append(item.mw_id)
+        if skipped:
+            windows = self.db_controller.get_windows(
+                MaintenanceFilter(ids=skipped)
+            )
+            self.db_controller.end_windows(skipped)
+            self.window_cache.discard(skipped)
+            for mw_id in skipped:
+                self.overlap_index.remove(mw_id)
+            self._recur(windows)
+        return to_run
+
+    def _skip_start(self, mw_id: MaintenanceID, now: datetime) -> bool:
+        """Whether MISFIRE_POLICY skips the misfired start of a window."""
+        if settings.MISFIRE_POLICY == 'skip':
+            return True
+        if settings.MISFIRE_POLICY == 'coalesce':
+            window = self.get_maintenance(mw_id)
+            return window is not None and window.end <= now
+        return False
 
     def end_maintenance_early(self, mw_id: MaintenanceID):
         """Ends execution of the maintenance window early
         """
         # Get Maintenance from DB
         window = self.db_controller.end_window(mw_id)
+        self._ended_early(window)
+        self._recur([window])
+
+    async def aend_maintenance_early(self, mw_id: MaintenanceID):
+        """Ends execution of the maintenance window early, as
+        end_maintenance_early does, without blocking the event loop."""
+        window = await self.async_db_controller.end_window(mw_id)
+        await asyncio.to_thread(self._ended_early, window)
+        await self._arecur([window])
+
+    def _ended_early(self, window: MaintenanceWindow):
+        """Unschedule a window ended early."""
+        self.window_cache.put(window)
+        self.overlap_index.remove(window.id)
 
         # Unschedule tasks
         self._unschedule(window)
 
+    def get_overlapping(
+        self,
+        window: MaintenanceWindow,
+        force=False
+    ) -> MaintenanceWindows:
+        """Get the unfinished windows overlapping with the given window.
+        If force=True, only windows sharing components are considered.
+        """
+        return MaintenanceWindows.model_construct(
+            root=self.overlap_index.overlapping(window, force)
+        )
+
+    def end_maintenances_early(self, windows: list[MaintenanceWindow]):
+        """Ends execution of many maintenance windows early,
+        emitting a single event for all of them.
+        """
+        if not windows:
+            return
+        mw_ids = [window.id for window in windows]
+        self.db_controller.end_windows(mw_ids)
+        self.window_cache.discard(mw_ids)
+        self._unschedule_many(windows)
+        self._recur(windows)
+
+    async def aend_maintenances_early(self, windows: list[MaintenanceWindow]):
+        """Ends execution of many maintenance windows early, as
+        end_maintenances_early does, without blocking the event loop."""
+        if not windows:
+            return
+        mw_ids = [window.id for window in windows]
+        await self.async_db_controller.end_windows(mw_ids)
+        self.window_cache.discard(mw_ids)
+        await asyncio.to_thread(self._unschedule_many, windows)
+        await self._arecur(windows)
+
     def add(self, window: MaintenanceWindow, force=False):
         """Add jobs to start and end a maintenance window."""
-        overlapping_windows = self.db_controller.check_overlap(window, force)
+        self._check_overlapping(window, force)
+
+        # Add window to DB
+        stored = self.db_controller.insert_window(window)
+        self._added(window, stored)
+
+    async def aadd(self, window: MaintenanceWindow, force=False):
+        """Add a maintenance window, as add does, without blocking the
+        event loop."""
+        self._check_overlapping(window, force)
+        stored = await self.async_db_controller.insert_window(window)
+        self._added(window, stored)
+
+    def _check_overlapping(self, window: MaintenanceWindow, force: bool):
+        """Raise OverlapError if unfinished windows overlap the window."""
+        overlapping_windows = self.get_overlapping(window, force)
         if overlapping_windows:
             raise OverlapError(window, overlapping_windows)
 
-        # Add window to DB
-        self.db_controller.insert_window(window)
+    def _added(self, window: MaintenanceWindow, stored: MaintenanceWindow):
+        """Index and schedule a window added to the DB."""
+        self.window_cache.put(stored)
+        self.overlap_index.add(window)
 
         # Schedule next task
         self._schedule(window)
 
+    def add_many(
+        self,
+        windows: list[MaintenanceWindow],
+        force=False,
+        atomic=False,
+    ) -> dict[int, Exception]:
+        """Add many maintenance windows at once.
+
+        Windows are checked for overlaps against the existing windows and
+        the previous windows of the batch, then inserted with a single
+        write. Returns the errors of the windows not added, by position.
+        If atomic=True, no window is added unless all of them can be.
+        """
+        errors = self._check_batch(windows, force)
+        if atomic and errors:
+            return errors
+
+        accepted = [
+            window
+            for position, window in enumerate(windows)
+            if position not in errors
+        ]
+        duplicates = set(self.db_controller.insert_windows(accepted))
+        self._add_duplicate_errors(windows, errors, duplicates)
+        if atomic and errors:
+            self.db_controller.remove_windows(
+                [window.id for window in accepted if window.id not in duplicates]
+            )
+            return errors
+
+        self._added_many(accepted, duplicates)
+        return errors
+
+    async def aadd_many(
+        self,
+        windows: list[MaintenanceWindow],
+        force=False,
+        atomic=False,
+    ) -> dict[int, Exception]:
+        """Add many maintenance windows at once, as add_many does, without
+        blocking the event loop."""
+        errors = self._check_batch(windows, force)
+        if atomic and errors:
+            return errors
+
+        accepted = [
+            window
+            for position, window in enumerate(windows)
+            if position not in errors
+        ]
+        duplicates = set(await self.async_db_controller.insert_windows(accepted))
+        self._add_duplicate_errors(windows, errors, duplicates)
+        if atomic and errors:
+            await self.async_db_controller.remove_windows(
+                [window.id for window in accepted if window.id not in duplicates]
+            )
+            return errors
+
+        self._added_many(accepted, duplicates)
+        return errors
+
+    def _check_batch(
+        self,
+        windows: list[MaintenanceWindow],
+        force: bool,
+    ) -> dict[int, Exception]:
+        """Check windows for overlaps against the existing windows and the
+        previous windows of the batch, and for repeated ids.
+        Returns the errors of the windows that cannot be added, by position.
+        """
+        errors: dict[int, Exception] = {}
+        batch_index = OverlapIndex()
+        for position, window in enumerate(windows):
+            if window.id in batch_index.windows:
+                errors[position] = DuplicateKeyError(
+                    f'Window with id: {window.id} is repeated'
+                )
+                continue
+            overlapping_windows = [
+                *self.overlap_index.overlapping(window, force),
+                *batch_index.overlapping(window, force),
+            ]
+            if overlapping_windows:
+                errors[position] = OverlapError(
+                    window,
+                    MaintenanceWindows.model_construct(root=overlapping_windows),
+                )
+                continue
+            batch_index.add(window)
+        return errors
+
+    @staticmethod
+    def _add_duplicate_errors(
+        windows: list[MaintenanceWindow],
+        errors: dict[int, Exception],
+        duplicates: set[MaintenanceID],
+    ):
+        """Add the errors of the windows the DB found to be duplicates."""
+        for position, window in enumerate(windows):
+            if position not in errors and window.id in duplicates:
+                errors[position] = DuplicateKeyError(
+                    f'Window with id: {window.id} already exists'
+                )
+
+    def _added_many(
+        self,
+        accepted: list[MaintenanceWindow],
+        duplicates: set[MaintenanceID],
+    ):
+        """Index and schedule the windows added to the DB."""
+        for window in accepted:
+            if window.id in duplicates:
+                continue
+            self.overlap_index.add(window)
+            self._schedule(window)
+
+    def import_windows(
+        self,
+        windows: list[MaintenanceWindow],
+        upsert=False,
+    ) -> list[MaintenanceID]:
+        """Import windows created elsewhere, such as in another deployment.
+
+        Windows are written as given with a single write, without checking
+        overlaps. Existing windows with the same ids are replaced if
+        upsert=True, and skipped otherwise. Only the imported windows
+        still pending or running are scheduled.
+        Returns the ids of the skipped windows.
+        """
+        if not windows:
+            return []
+        if upsert:
+            replaced = self.db_controller.get_windows(
+                MaintenanceFilter(ids=[window.id for window in windows])
+            )
+            self._unschedule_many(replaced)
+            self.db_controller.upsert_windows(windows)
+            skipped = []
+        else:
+            skipped = self.db_controller.insert_windows(windows)
+        self._imported(windows, skipped)
+        return skipped
+
+    async def aimport_windows(
+        self,
+        windows: list[MaintenanceWindow],
+        upsert=False,
+    ) -> list[MaintenanceID]:
+        """Import windows created elsewhere, as import_windows does,
+        without blocking the event loop."""
+        if not windows:
+            return []
+        if upsert:
+            replaced = await self.async_db_controller.get_windows(
+                MaintenanceFilter(ids=[window.id for window in windows])
+            )
+            await asyncio.to_thread(self._unschedule_many, replaced)
+            await self.async_db_controller.upsert_windows(windows)
+            skipped = []
+        else:
+            skipped = await self.async_db_controller.insert_windows(windows)
+        await asyncio.to_thread(self._imported, windows, skipped)
+        return skipped
+
+    def _imported(
+        self,
+        windows: list[MaintenanceWindow],
+        skipped: list[MaintenanceID],
+    ):
+        """Index, start and schedule the imported windows."""
+        self.window_cache.discard(window.id for window in windows)
+        skipped_ids = set(skipped)
+
+        imported = [window for window in windows if window.id not in skipped_ids]
+        for window in imported:
+            if window.status != Status.FINISHED:
+                self.overlap_index.add(window)
+        self.deployer.start_mws(
+            window for window in imported if window.status == Status.RUNNING
+        )
+        for window in imported:
+            self._schedule(window)
+
     def update(self, window: MaintenanceWindow):
         """Update an existing Maintenance Window."""
 
         # Update window
-        self.db_controller.update_window(window)
+        stored = self.db_controller.update_window(window)
+        self._updated(window, stored)
+
+    async def aupdate(self, window: MaintenanceWindow):
+        """Update an existing Maintenance Window, as update does, without
+        blocking the event loop."""
+        stored = await self.async_db_controller.update_window(window)
+        self._updated(window, stored)
+
+    def _updated(self, window: MaintenanceWindow, stored: MaintenanceWindow):
+        """Index and reschedule a window updated in the DB."""
+        self.window_cache.put(stored)
+        self._reindex(window)
 
         # Reschedule any pending tasks
         self._reschedule(window)
 
     def remove(self, mw_id: MaintenanceID):
         """Remove jobs that start and end a maintenance window."""
-        # Get Maintenance from DB
-        window = self.db_controller.get_window(mw_id)
+        # Get Maintenance from cache or DB
+        window = self.get_maintenance(mw_id)
 
         # Remove from schedule
         self._unschedule(window)
 
         # Remove from DB
         self.db_controller.remove_window(mw_id)
+        self.window_cache.discard([mw_id])
+        self.overlap_index.remove(mw_id)
+
+    async def aremove(self, mw_id: MaintenanceID):
+        """Remove a maintenance window and its jobs, as remove does,
+        without blocking the event loop."""
+        window = await self.aget_maintenance(mw_id)
+        await asyncio.to_thread(self._unschedule, window)
+        await self.async_db_controller.remove_window(mw_id)
+        self.window_cache.discard([mw_id])
+        self.overlap_index.remove(mw_id)
+
+    def update_many(self, windows: list[MaintenanceWindow]):
+        """Update many existing Maintenance Windows at once."""
+        if not windows:
+            return
+        self.db_controller.update_windows(windows)
+        self._updated_many(windows)
+
+    async def aupdate_many(self, windows: list[MaintenanceWindow]):
+        """Update many existing Maintenance Windows at once, as update_many
+        does, without blocking the event loop."""
+        if not windows:
+            return
+        await self.async_db_controller.update_windows(windows)
+        self._updated_many(windows)
+
+    def _updated_many(self, windows: list[MaintenanceWindow]):
+        """Index and reschedule the windows updated in the DB."""
+        self.window_cache.discard(window.id for window in windows)
+        for window in windows:
+            self._reindex(window)
+            self._reschedule(window)
+
+    def _reindex(self, window: MaintenanceWindow):
+        """Index an updated window, unless it is finished, as finished
+        windows do not interfere with other windows."""
+        if window.status == Status.FINISHED:
+            self.overlap_index.remove(window.id)
+        else:
+            self.overlap_index.add(window)
+
+    def remove_many(self, windows: list[MaintenanceWindow]):
+        """Remove many maintenance windows and their jobs at once."""
+        if not windows:
+            return
+        self._unschedule_many(windows)
+        mw_ids = [window.id for window in windows]
+        self.db_controller.remove_windows(mw_ids)
+        self.window_cache.discard(mw_ids)
+
+    async def aremove_many(self, windows: list[MaintenanceWindow]):
+        """Remove many maintenance windows and their jobs at once, as
+        remove_many does, without blocking the event loop."""
+        if not windows:
+            return
+        await asyncio.to_thread(self._unschedule_many, windows)
+        mw_ids = [window.id for window in windows]
+        await self.async_db_controller.remove_windows(mw_ids)
+        self.window_cache.discard(mw_ids)
+
+    def archive_maintenances(
+        self,
+        before: datetime,
+        batch_size: int = 1000,
+    ) -> int:
+        """Move the maintenances finished before the given time to the
+        archive, in batches of batch_size. Returns how many were moved."""
+        archived = 0
+        while True:
+            mw_ids = self.db_controller.archive_windows(before, batch_size)
+            self.window_cache.discard(mw_ids)
+            archived += len(mw_ids)
+            if len(mw_ids) < batch_size:
+                return archived
+
+    def _catch_up(
+        self,
+        windows: Iterable[MaintenanceWindow],
+    ) -> list[MaintenanceWindow]:
+        """Move the recurring windows to the first occurrence not ended
+        by now, storing the ones moved with a single write."""
+        now = datetime.now(pytz.utc)
+        current = []
+        moved = []
+        for window in windows:
+            if window.recurrence is not None:
+                occurrence = window.catch_up(now)
+                if (occurrence.start, occurrence.status) != (
+                    window.start, window.status
+                ):
+                    moved.append(occurrence)
+                window = occurrence
+            current.append(window)
+        if moved:
+            self.db_controller.update_windows(moved)
+            log.info(
+                f'Moved {len(moved)} recurring windows to their current occurrence'
+            )
+        return current
+
+    def _recur(self, windows: Iterable[MaintenanceWindow]):
+        """Replace the ended recurring windows with their next occurrence,
+        with a single write, and schedule it."""
+        occurrences = _next_occurrences(windows)
+        if not occurrences:
+            return
+        self.db_controller.update_windows(occurrences)
+        self._recurred(occurrences)
+
+    async def _arecur(self, windows: Iterable[MaintenanceWindow]):
+        """Replace the ended recurring windows with their next occurrence,
+        as _recur does, without blocking the event loop."""
+        occurrences = _next_occurrences(windows)
+        if not occurrences:
+            return
+        await self.async_db_controller.update_windows(occurrences)
+        self._recurred(occurrences)
+
+    def _recurred(self, occurrences: list[MaintenanceWindow]):
+        """Index and schedule the next occurrences of recurring windows."""
+        self.window_cache.discard(window.id for window in occurrences)
+        for occurrence in occurrences:
+            self.overlap_index.add(occurrence)
+            self._schedule(occurrence)
 
     def _schedule(self, window: MaintenanceWindow):
         log.info(f'Scheduling "{window.id}"')
         if window.status == Status.PENDING:
             self.scheduler.add_job(
-                MaintenanceStart(self, window.id),
+                MaintenanceStart(self, window.id, window.start),
                 'date',
                 id=f'{window.id}-start',
                 run_date=window.start
@@ -163,13 +747,38 @@ class MaintenanceScheduler:
             log.info(f'Scheduled "{window.id}" start at {window.start}')
         if window.status == Status.RUNNING:
             self.scheduler.add_job(
-                MaintenanceEnd(self, window.id),
+                MaintenanceEnd(self, window.id, window.end),
                 'date',
                 id=f'{window.id}-end',
                 run_date=window.end
             )
             log.info(f'Scheduled "{window.id}" end at {window.end}')
 
+    def _schedule_many(self, windows: Iterable[MaintenanceWindow]) -> int:
+        """Schedule the next transition of many windows, as _schedule
+        does, without logging each of them. Returns how many were
+        scheduled."""
+        scheduled = 0
+        for window in windows:
+            if window.status == Status.PENDING:
+                self.scheduler.add_job(
+                    MaintenanceStart(self, window.id, window.start),
+                    'date',
+                    id=f'{window.id}-start',
+                    run_date=window.start
+                )
+            elif window.status == Status.RUNNING:
+                self.scheduler.add_job(
+                    MaintenanceEnd(self, window.id, window.end),
+                    'date',
+                    id=f'{window.id}-end',
+                    run_date=window.end
+                )
+            else:
+                continue
+            scheduled += 1
+        return scheduled
+
     def _reschedule(self, window: MaintenanceWindow):
         log.info(f'Rescheduling "{window.id}"')
         try:
@@ -177,7 +786,7 @@ class MaintenanceScheduler:
                 f'{window.id}-start',
             )
             self.scheduler.add_job(
-                MaintenanceStart(self, window.id),
+                MaintenanceStart(self, window.id, window.start),
                 'date',
                 id=f'{window.id}-start',
                 run_date=window.start
@@ -190,7 +799,7 @@ class MaintenanceScheduler:
                 f'{window.id}-end',
             )
             self.scheduler.add_job(
-                MaintenanceEnd(self, window.id),
+                MaintenanceEnd(self, window.id, window.end),
                 'date',
                 id=f'{window.id}-end',
                 run_date=window.end
@@ -204,6 +813,23 @@ class MaintenanceScheduler:
         Does not update DB, due to being
         primarily for shutdown startup cases.
         """
+        if self._remove_jobs(window):
+            self.deployer.end_mw(window)
+
+    def _unschedule_many(self, windows: Iterable[MaintenanceWindow]):
+        """Remove many windows from the overlap index and their jobs from
+        the scheduler, ending the running ones with a single event."""
+        running = []
+        for window in windows:
+            self.overlap_index.remove(window.id)
+            if self._remove_jobs(window):
+                running.append(window)
+        self.deployer.end_mws(running)
+
+    def _remove_jobs(self, window: MaintenanceWindow) -> bool:
+        """Remove the jobs of a maintenance window.
+        Returns whether the window was running.
+        """
         started = False
         ended = False
         try:
@@ -216,13 +842,122 @@ class MaintenanceScheduler:
         except JobLookupError:
             ended = True
             log.info(f'Job to end "{window.id}" already removed.')
-        if started and not ended:
-            self.deployer.end_mw(window)
+        return started and not ended
 
     def get_maintenance(self, mw_id: MaintenanceID) -> MaintenanceWindow:
-        """Get a single maintenance by id"""
-        return self.db_controller.get_window(mw_id)
-
-    def list_maintenances(self) -> MaintenanceWindows:
-        """Returns a list of all maintenances"""
-        return self.db_controller.get_windows()
+        """Get a single maintenance by id, from the cache if possible."""
+        window = self.window_cache.get(mw_id)
+        if window is None:
+            window = self.db_controller.get_window(mw_id)
+            if window is not None:
+                window = self.window_cache.put_if_absent(window)
+        return window
+
+    async def aget_maintenance(self, mw_id: MaintenanceID) -> MaintenanceWindow:
+        """Get a single maintenance by id, as get_maintenance does, without
+        blocking the event loop."""
+        window = self.window_cache.get(mw_id)
+        if window is None:
+            window = await self.async_db_controller.get_window(mw_id)
+            if window is not None:
+                window = self.window_cache.put_if_absent(window)
+        return window
+
+    def list_maintenances(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+    ) -> MaintenanceWindows:
+        """Returns a list of the maintenances matching window_filter"""
+        return self.db_controller.get_windows(
+            window_filter,
+            fields=fields,
+            limit=limit,
+            after=after,
+        )
+
+    async def alist_maintenances(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+    ) -> MaintenanceWindows:
+        """Returns a list of the maintenances matching window_filter,
+        without blocking the event loop."""
+        return await self.async_db_controller.get_windows(
+            window_filter,
+            fields=fields,
+            limit=limit,
+            after=after,
+        )
+
+    def export_maintenances(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        batch_size: int = 1000,
+        archived: bool = False,
+    ) -> Iterator[list[dict]]:
+        """Yields the DB documents of the maintenances matching
+        window_filter in batches, sorted by start and id.
+        If archived is True, archived maintenances are included."""
+        return self.db_controller.iter_window_documents(
+            window_filter, batch_size=batch_size, archived=archived
+        )
+
+    async def aexport_maintenances(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        batch_size: int = 1000,
+        archived: bool = False,
+    ) -> AsyncIterator[list[dict]]:
+        """Yields the DB documents of the maintenances matching
+        window_filter in batches, as export_maintenances does, without
+        blocking the event loop."""
+        pages = WindowPages(batch_size)
+        while not pages.done:
+            batch = await self.async_db_controller.get_window_documents(
+                window_filter, limit=batch_size, after=pages.after, archived=archived
+            )
+            if pages.add(batch):
+                yield batch
+
+    def list_maintenance_documents(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+        archived: bool = False,
+    ) -> list[dict]:
+        """Returns the DB documents of the maintenances matching
+        window_filter, for serializing them without building models.
+        If archived is True, archived maintenances are included."""
+        return self.db_controller.get_window_documents(
+            window_filter,
+            fields=fields,
+            limit=limit,
+            after=after,
+            archived=archived,
+        )
+
+    async def alist_maintenance_documents(
+        self,
+        window_filter: Optional[MaintenanceFilter] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, MaintenanceID]] = None,
+        archived: bool = False,
+    ) -> list[dict]:
+        """Returns the DB documents of the maintenances matching
+        window_filter, as list_maintenance_documents does, without
+        blocking the event loop."""
+        return await self.async_db_controller.get_window_documents(
+            window_filter,
+            fields=fields,
+            limit=limit,
+            after=after,
+            archived=archived,
+        )
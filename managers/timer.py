@@ -0,0 +1,184 @@
+"""Module with a single thread timer queue for scheduling transitions."""
+import heapq
+from collections.abc import Callable
+from datetime import datetime
+from itertools import count, groupby
+from threading import Condition, Thread
+from time import time
+from typing import Optional
+
+from apscheduler.jobstores.base import JobLookupError
+
+from kytos.core import log
+
+
+class _Entry:
+    """Job waiting in a TimerQueue."""
+
+    __slots__ = ('run_at', 'seq', 'job_id', 'func', 'cancelled')
+
+    def __init__(self, run_at: float, seq: int, job_id: str, func: Callable):
+        self.run_at = run_at
+        self.seq = seq
+        self.job_id = job_id
+        self.func = func
+        self.cancelled = False
+
+    def __lt__(self, other: '_Entry') -> bool:
+        return (self.run_at, self.seq) < (other.run_at, other.seq)
+
+
+class TimerQueue:
+    """Scheduler running date jobs from a heap with a single timer thread.
+
+    Implements the part of the APScheduler interface used by the
+    MaintenanceScheduler, so both can be used interchangeably. Adding a
+    job takes O(log n), while removing one only marks it as cancelled.
+
+    Jobs due at the same instant run together. The ones of a class with
+    a run_batch classmethod are given to it as a single list, the other
+    jobs are called one by one.
+    """
+
+    def __init__(self):
+        self.heap: list[_Entry] = []
+        self.jobs: dict[str, _Entry] = {}
+        self.cancelled = 0
+        self.sequence = count()
+        self.condition = Condition()
+        self.thread: Optional[Thread] = None
+        self.running = False
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def add_job(
+        self,
+        func: Callable,
+        trigger: str = 'date',
+        *,
+        id: str,
+        run_date: datetime,
+    ):
+        """Add a job to run func at run_date, replacing the one with its id.
+        """
+        # pylint: disable=redefined-builtin
+        if trigger != 'date':
+            raise ValueError(f'Unsupported trigger: {trigger}')
+        entry = _Entry(run_date.timestamp(), next(self.sequence), id, func)
+        with self.condition:
+            self._cancel(id)
+            self.jobs[id] = entry
+            heapq.heappush(self.heap, entry)
+            if self.heap[0] is entry:
+                self.condition.notify()
+
+    def remove_job(self, job_id: str):
+        """Remove a job, raising JobLookupError if not found."""
+        with self.condition:
+            if not self._cancel(job_id):
+                raise JobLookupError(job_id)
+            if self.cancelled > len(self.jobs):
+                self.heap = [
+                    entry for entry in self.heap if not entry.cancelled
+                ]
+                heapq.heapify(self.heap)
+                self.cancelled = 0
+
+    def remove_all_jobs(self):
+        """Remove every job."""
+        with self.condition:
+            self.heap = []
+            self.jobs = {}
+            self.cancelled = 0
+
+    def start(self):
+        """Start the timer thread."""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = Thread(
+            target=self._run,
+            name='maintenance-timer',
+            daemon=True,
+        )
+        self.thread.start()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the timer thread."""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if wait and self.thread is not None:
+            self.thread.join()
+        self.thread = None
+
+    def _cancel(self, job_id: str) -> bool:
+        entry = self.jobs.pop(job_id, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+        self.cancelled += 1
+        return True
+
+    def _pop_due(self) -> Optional[list[_Entry]]:
+        """Wait until some jobs are due and pop them.
+        Returns None once the queue is shut down.
+        """
+        with self.condition:
+            while self.running:
+                while self.heap and self.heap[0].cancelled:
+                    heapq.heappop(self.heap)
+                    self.cancelled -= 1
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                now = time()
+                if self.heap[0].run_at > now:
+                    self.condition.wait(self.heap[0].run_at - now)
+                    continue
+                due = []
+                while self.heap and self.heap[0].run_at <= now:
+                    entry = heapq.heappop(self.heap)
+                    if entry.cancelled:
+                        self.cancelled -= 1
+                        continue
+                    del self.jobs[entry.job_id]
+                    due.append(entry)
+                return due
+        return None
+
+    def _run(self):
+        while (due := self._pop_due()) is not None:
+            self.run_due(due)
+
+    @staticmethod
+    def run_due(due: list[_Entry]):
+        """Run the given jobs, batching them when possible."""
+        for (_, func_type), entries in groupby(
+            sorted(due, key=_type_order),
+            key=lambda entry: (entry.run_at, type(entry.func)),
+        ):
+            funcs = [entry.func for entry in entries]
+            run_batch = getattr(func_type, 'run_batch', None)
+            if run_batch is not None:
+                _run_job(run_batch, funcs)
+            else:
+                for func in funcs:
+                    _run_job(func)
+
+
+def _type_order(entry: _Entry) -> tuple[float, str]:
+    """Sort key placing the jobs of a class due at the same instant
+    together, as classes cannot be compared."""
+    func_type = type(entry.func)
+    return entry.run_at, f'{func_type.__module__}.{func_type.__qualname__}'
+
+
+def _run_job(func: Callable, *args):
+    """Run a job, logging any error so that the timer keeps running."""
+    try:
+        func(*args)
+    except Exception as err:  # pylint: disable=broad-except
+        log.error(f'Error running scheduled job {func}: {err}')
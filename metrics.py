@@ -0,0 +1,450 @@
+"""Metrics of kytos/maintenance in the Prometheus text format.
+
+Only the counters, histograms and summaries used by the NApp are
+implemented, so exposing them does not depend on prometheus_client.
+Every metric is registered in REGISTRY and rendered by GET /v1/metrics.
+"""
+
+import inspect
+import itertools
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, Optional
+
+import pytz
+from napps.kytos.maintenance import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def format_metric(
+    name: str,
+    kind: str,
+    documentation: str,
+    samples: Iterable[Sample],
+) -> str:
+    """Format the samples of a metric in the Prometheus text format."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for sample_name, labels, value in samples:
+        if labels:
+            label_text = ",".join(
+                f'{label}="{_escape(str(label_value))}"'
+                for label, label_value in labels.items()
+            )
+            sample_name = f"{sample_name}{{{label_text}}}"
+        lines.append(f"{sample_name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _Metric:
+    """Metric with a value for each set of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, object] = {}
+        self.lock = Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects the labels {self.labelnames}")
+        return tuple(str(labels[label]) for label in self.labelnames)
+
+    def samples(self) -> Iterator[Sample]:
+        """Get the samples of every set of label values."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Reset every value."""
+        with self.lock:
+            self.values = {}
+
+
+class Counter(_Metric):
+    """Monotonic counter, with a value for each set of label values."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase the counter of the given labels."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        """Get the value of the counter of the given labels."""
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        """Get the samples of every set of label values."""
+        with self.lock:
+            values = sorted(self.values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+def _count_value(counter: itertools.count) -> int:
+    """Get the value an itertools.count would return next, without
+    advancing it."""
+    return int(repr(counter).removeprefix("count(").removesuffix(")"))
+
+
+class CallCounter(_Metric):
+    """Counter of calls for a fixed set of values of a single label.
+
+    Made for the hottest paths: calls are counted without locking nor
+    checking labels, by advancing the itertools.count of the label value,
+    which is atomic in CPython. Callers keep the incrementer of their
+    label value instead of going through inc.
+    """
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelname: str,
+        label_values: Iterable[str],
+    ):
+        super().__init__(name, documentation, (labelname,))
+        self.labelname = labelname
+        self.counts = {label_value: itertools.count() for label_value in label_values}
+        # Values of the counts when last cleared, as incrementers already
+        # handed out keep advancing the same counts.
+        self.offsets = dict.fromkeys(self.counts, 0)
+
+    def incrementer(self, label_value: str) -> Callable[[], int]:
+        """Get the function counting a call with the given label value."""
+        return self.counts[label_value].__next__
+
+    def inc(self, **labels):
+        """Count a call with the given labels."""
+        (label_value,) = self._key(labels)
+        next(self.counts[label_value])
+
+    def get(self, **labels) -> float:
+        """Get the number of calls with the given labels."""
+        (label_value,) = self._key(labels)
+        return _count_value(self.counts[label_value]) - self.offsets[label_value]
+
+    def samples(self) -> Iterator[Sample]:
+        """Get the samples of the label values called at least once."""
+        for label_value in sorted(self.counts):
+            value = self.get(**{self.labelname: label_value})
+            if value:
+                yield self.name, {self.labelname: label_value}, float(value)
+
+    def clear(self):
+        """Reset every value."""
+        with self.lock:
+            for label_value, counter in self.counts.items():
+                self.offsets[label_value] = _count_value(counter)
+
+
+class Histogram(_Metric):
+    """Histogram of observations in cumulative buckets, for each set
+    of label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """Record an observation of the given labels."""
+        key = self._key(labels)
+        position = bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # One count per bucket, the +Inf bucket included, then the sum
+                counts = self.values[key] = [0] * (len(self.buckets) + 2)
+            counts[position] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds taken by the block of a with statement."""
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started_at, **labels)
+
+    def get(self, **labels) -> float:
+        """Get the number of observations of the given labels."""
+        counts = self.values.get(self._key(labels))
+        return sum(counts[:-1]) if counts else 0
+
+    def get_sum(self, **labels) -> float:
+        """Get the sum of the observations of the given labels."""
+        counts = self.values.get(self._key(labels))
+        return counts[-1] if counts else 0
+
+    def samples(self) -> Iterator[Sample]:
+        with self.lock:
+            values = sorted((key, list(counts)) for key, counts in self.values.items())
+        for key, counts in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _format_value(bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, counts[-1]
+
+
+class Summary(_Metric):
+    """Quantiles of the last size observations, for each set of label
+    values, so the summary follows recent behavior instead of the whole
+    uptime."""
+
+    kind = "summary"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        size: int = 1000,
+        quantiles: Iterable[float] = (0.5, 0.9, 0.99),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.size = size
+        self.quantiles = tuple(quantiles)
+
+    def observe(self, value: float, **labels):
+        """Record an observation of the given labels, dropping the oldest
+        one once there are size of them."""
+        key = self._key(labels)
+        with self.lock:
+            observations = self.values.get(key)
+            if observations is None:
+                observations = self.values[key] = deque(maxlen=self.size)
+            observations.append(value)
+
+    def get(self, **labels) -> list[float]:
+        """Get the recent observations of the given labels."""
+        return list(self.values.get(self._key(labels), ()))
+
+    def samples(self) -> Iterator[Sample]:
+        with self.lock:
+            values = sorted(
+                (key, sorted(observations)) for key, observations in self.values.items()
+            )
+        for key, observations in values:
+            labels = dict(zip(self.labelnames, key))
+            for quantile in self.quantiles:
+                position = min(int(quantile * len(observations)), len(observations) - 1)
+                quantile_labels = {**labels, "quantile": _format_value(quantile)}
+                yield self.name, quantile_labels, observations[position]
+            yield f"{self.name}_count", labels, len(observations)
+            yield f"{self.name}_sum", labels, sum(observations)
+
+
+REGISTRY: list[_Metric] = []
+
+
+def _register(metric: _Metric) -> _Metric:
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    return "".join(
+        format_metric(metric.name, metric.kind, metric.documentation, metric.samples())
+        for metric in REGISTRY
+    )
+
+
+def clear():
+    """Reset every registered metric."""
+    for metric in REGISTRY:
+        metric.clear()
+
+
+REST_LATENCY = _register(
+    Histogram(
+        "maintenance_rest_request_seconds",
+        "Seconds taken by the REST handlers.",
+        ("handler",),
+    )
+)
+DB_LATENCY = _register(
+    Histogram(
+        "maintenance_db_call_seconds",
+        "Seconds taken by the MaintenanceController methods, retries included.",
+        ("method",),
+    )
+)
+DB_RETRIES = _register(
+    Counter(
+        "maintenance_db_retries_total",
+        "Retries of the MaintenanceController methods after a DB failure.",
+        ("method",),
+    )
+)
+JOB_LAG = _register(
+    Histogram(
+        "maintenance_job_lag_seconds",
+        "Seconds between the scheduled and the actual run of the jobs "
+        "starting and ending maintenance windows.",
+        ("job",),
+        LAG_BUCKETS,
+    )
+)
+JOB_RECENT_LAG = _register(
+    Summary(
+        "maintenance_job_recent_lag_seconds",
+        "Lag of the last LAG_HISTORY_SIZE jobs starting and ending "
+        "maintenance windows.",
+        ("job",),
+        settings.LAG_HISTORY_SIZE,
+    )
+)
+JOB_MISFIRES = _register(
+    Counter(
+        "maintenance_job_misfires_total",
+        "Jobs running later than MISFIRE_GRACE_TIME, by the action taken.",
+        ("job", "action"),
+    )
+)
+EXPANSION_SIZE = _register(
+    Histogram(
+        "maintenance_expansion_devices",
+        "Number of devices a maintenance window expands to.",
+        buckets=SIZE_BUCKETS,
+    )
+)
+EXPANSION_LATENCY = _register(
+    Histogram(
+        "maintenance_expansion_seconds",
+        "Seconds taken to expand a maintenance window to its devices.",
+    )
+)
+STATUS_FUNC_CALLS = _register(
+    CallCounter(
+        "maintenance_status_func_calls_total",
+        "Calls to the status functions registered in kytos.",
+        "kind",
+        (
+            "switch",
+            "switch_reason",
+            "interface",
+            "interface_reason",
+            "link",
+            "link_reason",
+        ),
+    )
+)
+
+
+def observe_lag(job: str, run_at: Optional[datetime]) -> Optional[float]:
+    """Observe the lag of a job scheduled to run at run_at, returning it
+    in seconds."""
+    if run_at is None:
+        return None
+    lag = max((datetime.now(pytz.utc) - run_at).total_seconds(), 0.0)
+    JOB_LAG.observe(lag, job=job)
+    JOB_RECENT_LAG.observe(lag, job=job)
+    return lag
+
+
+def timed(histogram: Histogram, label: str, name: str):
+    """Decorator observing the seconds taken by a function, sync or async,
+    in the histogram with the given label set to name."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(**{label: name}):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**{label: name}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def time_methods(histogram: Histogram, label: str, predicate):
+    """Class decorator timing the methods for which predicate(name, func)
+    is true, labeled by their names. Generators are left out, since only
+    their creation would be timed."""
+
+    def decorate(cls):
+        for name, func in list(vars(cls).items()):
+            if (
+                inspect.isfunction(func)
+                and not inspect.isgeneratorfunction(inspect.unwrap(func))
+                and predicate(name, func)
+            ):
+                setattr(cls, name, timed(histogram, label, name)(func))
+        return cls
+
+    return decorate
+
+
+def is_handler(_name: str, func) -> bool:
+    """Whether a method is a REST handler, taking a request."""
+    return "request" in inspect.signature(func).parameters
+
+
+def is_public(name: str, _func) -> bool:
+    """Whether a method is public."""
+    return not name.startswith("_")
@@ -4,18 +4,22 @@ This module define models for the maintenance window itself and the
 scheduler.
 """
 
-from datetime import datetime, timezone
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import NewType, Optional
+from functools import lru_cache
+from math import gcd
+from typing import NamedTuple, NewType, Optional
 from uuid import uuid4
 
-import pytz
-
 # pylint: disable=no-name-in-module
 from pydantic import (
+    AwareDatetime,
     BaseModel,
     Field,
     RootModel,
+    TypeAdapter,
+    ValidationError,
     ValidationInfo,
     field_validator,
     model_validator,
@@ -24,6 +28,13 @@ from pydantic import (
 # pylint: enable=no-name-in-module
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
+RRULE_UNTIL_FMT = "%Y%m%dT%H%M%SZ"
+RRULE_FREQUENCIES = {
+    "HOURLY": timedelta(hours=1),
+    "DAILY": timedelta(days=1),
+    "WEEKLY": timedelta(weeks=1),
+}
+MAX_TIME = datetime.max.replace(tzinfo=timezone.utc)
 
 
 class Status(str, Enum):
@@ -37,6 +48,110 @@ class Status(str, Enum):
 MaintenanceID = NewType("MaintenanceID", str)
 
 
+class Recurrence(NamedTuple):
+    """Recurrence rule of a maintenance window, as parsed by parse_rrule."""
+
+    period: timedelta
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+
+def parse_time(time: str) -> datetime:
+    """Parse a time in ISO 8601 with an UTC offset, as TIME_FMT does.
+
+    datetime.fromisoformat is much faster than strptime, and also takes
+    fractions of seconds. Times without an offset are still rejected.
+    """
+    try:
+        parsed = datetime.fromisoformat(time)
+    except ValueError:
+        parsed = None
+    if parsed is None or parsed.tzinfo is None:
+        raise ValueError(f"time data {time!r} does not match format {TIME_FMT!r}")
+    return parsed
+
+
+def _parse_positive(value: str, name: str) -> int:
+    try:
+        number = int(value)
+    except ValueError as err:
+        raise ValueError(f"Invalid RRULE {name}: {value}") from err
+    if number < 1:
+        raise ValueError(f"RRULE {name} must be positive")
+    return number
+
+
+@lru_cache(maxsize=1024)
+def parse_rrule(rule: str) -> Recurrence:
+    """Parse a recurrence rule in the subset of RFC 5545 supported.
+
+    Rules have a FREQ of HOURLY, DAILY or WEEKLY, so occurrences repeat
+    with a fixed period, and optionally an INTERVAL and either a COUNT or
+    an UNTIL time in UTC, as in "FREQ=WEEKLY;INTERVAL=2;COUNT=10" or
+    "FREQ=DAILY;UNTIL=20250131T000000Z".
+    """
+    parts = {}
+    for part in rule.upper().removeprefix("RRULE:").split(";"):
+        name, _, value = part.partition("=")
+        if not value:
+            raise ValueError(f"Invalid RRULE part: {part}")
+        if name in parts:
+            raise ValueError(f"Repeated RRULE part: {name}")
+        parts[name] = value
+    unsupported = parts.keys() - {"FREQ", "INTERVAL", "COUNT", "UNTIL"}
+    if unsupported:
+        raise ValueError(f"Unsupported RRULE parts: {sorted(unsupported)}")
+    if parts.get("FREQ") not in RRULE_FREQUENCIES:
+        raise ValueError(f"RRULE FREQ must be one of {list(RRULE_FREQUENCIES)}")
+    if "COUNT" in parts and "UNTIL" in parts:
+        raise ValueError("RRULE COUNT and UNTIL are mutually exclusive")
+    interval = _parse_positive(parts.get("INTERVAL", "1"), "INTERVAL")
+    count = None
+    if "COUNT" in parts:
+        count = _parse_positive(parts["COUNT"], "COUNT")
+    until = None
+    if "UNTIL" in parts:
+        try:
+            until = datetime.strptime(parts["UNTIL"], RRULE_UNTIL_FMT)
+        except ValueError as err:
+            raise ValueError(f"Invalid RRULE UNTIL: {parts['UNTIL']}") from err
+        until = until.replace(tzinfo=timezone.utc)
+    return Recurrence(RRULE_FREQUENCIES[parts["FREQ"]] * interval, count, until)
+
+
+class _Series(NamedTuple):
+    """Occurrences of a window, as offsets from a reference time."""
+
+    start: timedelta
+    duration: timedelta
+    period: timedelta
+    count: Optional[int]
+
+
+def _overlaps_series(start: timedelta, end: timedelta, series: _Series) -> bool:
+    """Whether [start, end) overlaps with any occurrence of series.
+    Occurrence k overlaps when it starts before end and ends after start.
+    """
+    first = max((start - series.start - series.duration) // series.period + 1, 0)
+    last = -((series.start - end) // series.period) - 1
+    if series.count is not None:
+        last = min(last, series.count - 1)
+    return first <= last
+
+
+def _window_series(window: "MaintenanceWindow", reference: datetime) -> _Series:
+    """Get the occurrences of a window, as offsets from reference."""
+    duration = window.end - window.start
+    if window.recurrence is None:
+        return _Series(window.start - reference, duration, duration, 1)
+    return _Series(
+        window.start - reference,
+        duration,
+        parse_rrule(window.recurrence).period,
+        window.remaining_occurrences(),
+    )
+
+
 class MaintenanceWindow(BaseModel):
     """Class for structure of maintenance windows."""
 
@@ -48,6 +163,8 @@ class MaintenanceWindow(BaseModel):
     id: MaintenanceID = Field(default_factory=lambda: MaintenanceID(uuid4().hex))
     description: str = Field(default="")
     status: Status = Field(default=Status.PENDING)
+    recurrence: Optional[str] = Field(default=None)
+    occurrence: int = Field(default=0, ge=0)
     inserted_at: Optional[datetime] = Field(default=None)
     updated_at: Optional[datetime] = Field(default=None)
 
@@ -56,16 +173,24 @@ class MaintenanceWindow(BaseModel):
     @field_validator("start", "end", mode="before")
     @classmethod
     def convert_time(cls, time):
-        """Convert time strings using TIME_FMT"""
+        """Convert time strings as TIME_FMT, with parse_time"""
         if isinstance(time, str):
-            time = datetime.strptime(time, TIME_FMT)
+            time = parse_time(time)
         return time
 
     @field_validator("start")
     @classmethod
-    def check_start_in_past(cls, start_time):
-        """Check if the start is set to occur before now."""
-        if start_time < datetime.now(pytz.utc):
+    def check_start_in_past(cls, start_time, info: ValidationInfo):
+        """Check if the start is set to occur before now.
+        Skipped if the validation context sets allow_past_start,
+        as done when importing windows, or if the start did not change.
+        """
+        context = info.context or {}
+        if context.get("allow_past_start"):
+            return start_time
+        if "start" not in context.get("changed", ("start",)):
+            return start_time
+        if start_time < datetime.now(timezone.utc):
             raise ValueError("Start in the past not allowed")
         return start_time
 
@@ -82,19 +207,153 @@ class MaintenanceWindow(BaseModel):
     @model_validator(mode="after")
     def check_items_empty(self):
         """Check if no items are in the maintenance window."""
-        no_items = all(
-            map(
-                lambda key: key not in self.model_dump()
-                or len(self.model_dump()[key]) == 0,
-                ["switches", "links", "interfaces"],
-            )
-        )
-        if no_items:
+        if not (self.switches or self.links or self.interfaces):
             raise ValueError("At least one item must be provided")
         return self
 
+    @field_validator("recurrence")
+    @classmethod
+    def check_recurrence(cls, rule):
+        """Check if the recurrence rule is supported."""
+        if rule is not None:
+            parse_rrule(rule)
+        return rule
+
+    @model_validator(mode="after")
+    def check_recurrence_period(self):
+        """Check if occurrences are left and do not overlap each other."""
+        if self.recurrence is None:
+            return self
+        if self.end - self.start > parse_rrule(self.recurrence).period:
+            raise ValueError("Recurring windows must not last longer than their period")
+        if self.remaining_occurrences() == 0:
+            raise ValueError("No occurrences left for the recurrence")
+        return self
+
     # pylint: enable=no-self-argument
 
+    def validate_changes(
+        self,
+        changes: dict,
+        context: Optional[dict] = None,
+    ) -> "MaintenanceWindow":
+        """Get a copy of the window with changes, validated.
+
+        The window is validated from its attributes, already of the field
+        types, instead of from a model_dump, and its start is only checked
+        against the current time if changed. Keys which are not fields are
+        ignored, as model_validate does.
+        """
+        return self.model_validate(
+            {**self.__dict__, **changes},
+            context={**(context or {}), "changed": changes.keys()},
+        )
+
+    def remaining_occurrences(self) -> Optional[int]:
+        """Get the number of occurrences from the current one on,
+        or None if the window recurs endlessly."""
+        if self.recurrence is None:
+            return 1
+        recurrence = parse_rrule(self.recurrence)
+        if recurrence.count is not None:
+            return max(recurrence.count - self.occurrence, 0)
+        if recurrence.until is not None:
+            return max((recurrence.until - self.start) // recurrence.period + 1, 0)
+        return None
+
+    def last_end(self) -> datetime:
+        """Get the end of the last occurrence of the window."""
+        if self.recurrence is None:
+            return self.end
+        remaining = self.remaining_occurrences()
+        if remaining is None:
+            return MAX_TIME
+        try:
+            return self.end + parse_rrule(self.recurrence).period * (remaining - 1)
+        except OverflowError:
+            return MAX_TIME
+
+    def _occurrence(self, skipped: int, status: Status) -> "MaintenanceWindow":
+        shift = parse_rrule(self.recurrence).period * skipped
+        return self.model_copy(
+            update={
+                "start": self.start + shift,
+                "end": self.end + shift,
+                "occurrence": self.occurrence + skipped,
+                "status": status,
+            }
+        )
+
+    def next_occurrence(self) -> Optional["MaintenanceWindow"]:
+        """Get the next occurrence of a recurring window, pending,
+        or None if the window has no more occurrences."""
+        if self.recurrence is None:
+            return None
+        remaining = self.remaining_occurrences()
+        if remaining is not None and remaining <= 1:
+            return None
+        return self._occurrence(1, Status.PENDING)
+
+    def catch_up(self, now: datetime) -> "MaintenanceWindow":
+        """Get the first occurrence of a recurring window not ended by now,
+        with the status it has now. Once every occurrence has ended, the
+        last one is returned finished."""
+        if self.recurrence is None:
+            return self
+        skipped = 0
+        if self.end <= now:
+            skipped = (now - self.end) // parse_rrule(self.recurrence).period + 1
+        remaining = self.remaining_occurrences()
+        if remaining is not None and skipped >= remaining:
+            return self._occurrence(remaining - 1, Status.FINISHED)
+        window = self._occurrence(skipped, Status.PENDING)
+        if window.start <= now:
+            window.status = Status.RUNNING
+        return window
+
+    def overlaps(self, other: "MaintenanceWindow") -> bool:
+        """Check if any occurrence of the window overlaps with any
+        occurrence of the other one.
+
+        Occurrences of the series with the longest period are checked
+        against the other series in O(1) each. When the other series is
+        endless, its overlaps with them repeat every period / gcd of the
+        periods occurrences, so only that many are checked.
+        """
+        if self.recurrence is None and other.recurrence is None:
+            return self.start < other.end and other.start < self.end
+        series = _window_series(self, self.start)
+        other_series = _window_series(other, self.start)
+        if series.period < other_series.period:
+            series, other_series = other_series, series
+        first = max(
+            (other_series.start - series.start - series.duration) // series.period + 1,
+            0,
+        )
+        if other_series.count is not None:
+            other_end = (
+                other_series.start
+                + other_series.period * (other_series.count - 1)
+                + other_series.duration
+            )
+            stop = -((series.start - other_end) // series.period)
+        else:
+            settled = -(
+                (series.start - other_series.start - other_series.duration)
+                // series.period
+            )
+            micro = timedelta(microseconds=1)
+            stop = max(settled, first) + (other_series.period // micro) // gcd(
+                series.period // micro, other_series.period // micro
+            )
+        if series.count is not None:
+            stop = min(stop, series.count)
+        for number in range(first, stop):
+            start = series.start + series.period * number
+            if _overlaps_series(start, start + series.duration, other_series):
+                return True
+        return False
+
     def __str__(self) -> str:
         return f"'{self.id}'<{self.start} to {self.end}>"
 
@@ -106,6 +365,29 @@ class MaintenanceWindow(BaseModel):
         }
 
 
+_WINDOW_LIST = TypeAdapter(list[MaintenanceWindow])
+
+
+def validate_windows(
+    items: list,
+    context: Optional[dict] = None,
+) -> tuple[list[MaintenanceWindow], dict[int, list[dict]]]:
+    """Validate many windows at once, with a single call to pydantic-core.
+
+    Returns the valid windows, in the order of items, and the errors of
+    the invalid items by position, located as model_validate locates them.
+    """
+    try:
+        return _WINDOW_LIST.validate_python(items, context=context), {}
+    except ValidationError as err:
+        errors = defaultdict(list)
+        for error in err.errors():
+            position, *loc = error["loc"]
+            errors[position].append({**error, "loc": tuple(loc)})
+    valid = [item for position, item in enumerate(items) if position not in errors]
+    return _WINDOW_LIST.validate_python(valid, context=context), dict(errors)
+
+
 class MaintenanceWindows(RootModel):
     """List of Maintenance Windows for json conversion."""
 
@@ -128,6 +410,23 @@ class MaintenanceWindows(RootModel):
         }
 
 
+class MaintenanceFilter(BaseModel):
+    """Criteria for selecting maintenance windows.
+
+    Windows match when they have any of the given ids and statuses, are
+    active at some point between since and until, and contain any of the
+    given switches, interfaces and links. Empty criteria match every window.
+    """
+
+    ids: list[MaintenanceID] = Field(default_factory=list)
+    status: list[Status] = Field(default_factory=list)
+    since: Optional[AwareDatetime] = None
+    until: Optional[AwareDatetime] = None
+    switches: list[str] = Field(default_factory=list)
+    interfaces: list[str] = Field(default_factory=list)
+    links: list[str] = Field(default_factory=list)
+
+
 class OverlapError(Exception):
     """
     Exception for when a Maintenance Windows execution
@@ -0,0 +1,110 @@
+"""Fast JSON serialization of maintenance windows.
+
+Windows are serialized straight from their DB documents, producing the
+same JSON as MaintenanceWindows.json() without building the models.
+orjson, a requirement of the NApp, is used when installed, falling
+back to the json module otherwise.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Mapping, Optional
+
+from napps.kytos.maintenance.models import TIME_FMT
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+WINDOW_FIELDS = tuple(MW.model_fields)
+
+# Values of the fields missing from a document, except for the id
+_DEFAULTS = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in MW.model_fields.items()
+}
+_DEFAULTS["id"] = None
+
+# Formatted UTC offsets, by offset
+_OFFSETS: dict[Optional[timedelta], str] = {}
+
+
+def format_datetime(value: datetime) -> str:
+    """Format a datetime like value.strftime(TIME_FMT) does, but faster."""
+    if value.year < 1000:
+        return value.strftime(TIME_FMT)
+    offset = value.utcoffset()
+    suffix = _OFFSETS.get(offset)
+    if suffix is None:
+        suffix = _OFFSETS[offset] = value.strftime("%z")
+    # pylint: disable=consider-using-f-string
+    return "%04d-%02d-%02dT%02d:%02d:%02d%s" % (
+        value.year,
+        value.month,
+        value.day,
+        value.hour,
+        value.minute,
+        value.second,
+        suffix,
+    )
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            value,
+            default=_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(
+        value,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def _get_names(fields: Optional[Iterable[str]]) -> tuple[str, ...]:
+    if not fields:
+        return WINDOW_FIELDS
+    fields = set(fields)
+    return tuple(name for name in WINDOW_FIELDS if name in fields)
+
+
+def dump_windows(
+    documents: Iterable[Mapping[str, Any]],
+    fields: Optional[Iterable[str]] = None,
+) -> bytes:
+    """Serialize windows as a JSON array.
+    If fields are given, only those fields are included.
+    """
+    names = _get_names(fields)
+    return _dumps(
+        [
+            {name: document.get(name, _DEFAULTS[name]) for name in names}
+            for document in documents
+        ]
+    )
+
+
+def dump_windows_ndjson(documents: Iterable[Mapping[str, Any]]) -> bytes:
+    """Serialize windows as newline delimited JSON objects."""
+    return b"".join(
+        _dumps({name: document.get(name, _DEFAULTS[name]) for name in WINDOW_FIELDS})
+        + b"\n"
+        for document in documents
+    )
+
+
+def dump_window(window: MW) -> bytes:
+    """Serialize a single window as a JSON object."""
+    document = window.__dict__
+    return _dumps({name: document.get(name, _DEFAULTS[name]) for name in WINDOW_FIELDS})
@@ -1 +1,68 @@
 """Module with the Constants used in the kytos/maintenance."""
+
+# Maximum number of maintenance windows accepted by a bulk request
+BULK_MAX_WINDOWS = 1000
+
+# Seconds to wait for other maintenance windows starting or ending at the
+# same time before emitting topology.interruption events, merging them
+# into a single start event and a single end event. 0 disables merging,
+# emitting an event for each window as soon as it starts or ends.
+EVENT_COALESCE_DELAY = 0
+
+# Engine running the start and end of maintenance windows. 'apscheduler'
+# adds an APScheduler job per transition, while 'timer' keeps them in a
+# heap served by a single thread, running the transitions due at the same
+# instant as a single batch.
+SCHEDULER_ENGINE = "apscheduler"
+
+# Executor running the jobs of the apscheduler engine. 'threadpool' runs
+# them in a pool of SCHEDULER_MAX_WORKERS threads, while 'debug' runs them
+# one at a time in the scheduler thread.
+SCHEDULER_EXECUTOR = "threadpool"
+SCHEDULER_MAX_WORKERS = 10
+
+# With the apscheduler engine, add a single job for all the starts, and a
+# single one for all the ends, due at the same instant. Each job starts or
+# ends its windows with a single DB write and a single deployer call,
+# instead of a job per window contending for the deployer lock.
+SCHEDULER_BATCH_JOBS = False
+
+# Seconds the start or end of a maintenance window may run late before
+# counting as misfired
+MISFIRE_GRACE_TIME = 1
+
+# What to do with misfired starts. 'run' starts the windows late,
+# 'coalesce' finishes the windows that should have already ended without
+# starting them, and 'skip' finishes every window whose start misfired
+# without starting it. Skipped starts are logged as errors. Misfired ends
+# always run, since skipping them would leave devices in maintenance.
+MISFIRE_POLICY = "run"
+
+# Number of recent starts and ends whose lag GET /v1/metrics summarizes
+LAG_HISTORY_SIZE = 1000
+
+# Maximum number of finished maintenance windows kept in memory
+CACHE_FINISHED_SIZE = 1000
+
+# Number of maintenance windows read from the DB at a time when exporting
+EXPORT_BATCH_SIZE = 1000
+
+# Number of maintenance windows validated and written at a time when
+# importing
+IMPORT_BATCH_SIZE = 1000
+
+# Days after which finished maintenance windows are moved from the windows
+# collection to the maintenance.windows_archive collection. 0 disables
+# archival.
+ARCHIVE_FINISHED_AFTER_DAYS = 0
+
+# Seconds between archival passes
+ARCHIVE_INTERVAL = 3600
+
+# Number of maintenance windows moved at a time when archiving
+ARCHIVE_BATCH_SIZE = 1000
+
+# Days archived maintenance windows are kept before the DB expires them.
+# 0 keeps them forever. The TTL index is only created if missing, so
+# changing it afterwards requires dropping the archived_at index.
+ARCHIVE_TTL_DAYS = 0
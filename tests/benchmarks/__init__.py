@@ -0,0 +1 @@
+"""kytos/maintenance benchmarks."""
@@ -0,0 +1,139 @@
+"""Timing of benchmark cases and their JSON baselines.
+
+Each benchmark times its cases with measure and hands the results to
+report, which prints them and, when asked to, saves them as the baseline
+of the benchmark or compares them with the saved one. Baselines are kept
+in the baselines directory next to this module, one JSON file per
+benchmark, so they can be committed and regressions show up in diffs.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Optional
+
+import pytz
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments to save or compare baselines to a parser."""
+    parser.add_argument(
+        "--save", action="store_true", help="save the results as the baseline"
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="compare the results with the baseline, failing on regressions",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="slowdown over the baseline tolerated by --compare",
+    )
+    parser.add_argument("--baselines", type=Path, default=BASELINES_DIR)
+
+
+def measure(
+    func: Callable[[], object],
+    repeat: int = 5,
+    operations: int = 1,
+    setup: Optional[Callable[[], object]] = None,
+) -> dict:
+    """Time repeat runs of func, each one doing the given operations.
+    If setup is given, it is called before each run, untimed.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started_at = perf_counter()
+        func()
+        times.append(perf_counter() - started_at)
+    best = min(times)
+    return {
+        "best_ms": best * 1000,
+        "median_ms": statistics.median(times) * 1000,
+        "ops_per_s": operations / best if best else None,
+        "operations": operations,
+    }
+
+
+def load(path: Path) -> Optional[dict]:
+    """Load a baseline, if there is one."""
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save(path: Path, benchmark: str, results: dict[str, dict]):
+    """Save results as the baseline of a benchmark."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "benchmark": benchmark,
+        "created_at": datetime.now(pytz.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with path.open("w", encoding="utf-8") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def compare(
+    results: dict[str, dict], baseline: dict, tolerance: float
+) -> list[str]:
+    """Get the cases slower than in the baseline by more than tolerance.
+    Cases missing from either side are not compared.
+    """
+    regressions = []
+    for case, result in results.items():
+        previous = baseline["results"].get(case)
+        if previous is None:
+            continue
+        ratio = result["best_ms"] / previous["best_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{case}: {result['best_ms']:.3f} ms,"
+                f" {ratio:.2f}x the baseline {previous['best_ms']:.3f} ms"
+            )
+    return regressions
+
+
+def format_result(case: str, result: dict) -> str:
+    """Format the result of a case as a line of the report."""
+    line = f"{case:>48}: {result['best_ms']:10.2f} ms"
+    if result["operations"] > 1:
+        line += f" {result['ops_per_s']:12.0f} ops/s"
+    return line
+
+
+def report(benchmark: str, results: dict[str, dict], args: argparse.Namespace):
+    """Print results, then save or compare them as args ask to.
+    Exits with status 1 when --compare finds regressions.
+    """
+    for case, result in results.items():
+        print(format_result(case, result))
+    path = args.baselines / f"{benchmark}.json"
+    if args.compare:
+        baseline = load(path)
+        if baseline is None:
+            print(f"No baseline at {path}")
+        else:
+            regressions = compare(results, baseline, args.tolerance)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if regressions:
+                sys.exit(1)
+            print(f"No regressions over {path}")
+    if args.save:
+        save(path, benchmark, results)
+        print(f"Saved baseline {path}")
@@ -0,0 +1,149 @@
+"""Benchmark of the DB queries of MaintenanceController.
+
+Times check_overlap and get_windows over a collection holding the given
+numbers of windows, either in mongomock or, given --mongo-uri, in a
+MongoDB server. The benchmark database is dropped before and after each
+run. mongomock scans every document on each query, so sizes up to 1M
+windows are only meaningful against a server, where the indexes created
+by bootstrap_indexes are used.
+
+Run with the NApp and kytos in the python path:
+
+    python -m tests.benchmarks.bench_controller [--windows 1000 10000]
+        [--mongo-uri mongodb://localhost:27017] [--save | --compare]
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+import pytz
+
+from napps.kytos.maintenance.controllers import MaintenanceController
+from napps.kytos.maintenance.models import MaintenanceFilter
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from tests.benchmarks import baseline
+
+DB_NAME = "maintenance_benchmark"
+SWITCHES = 1000
+BATCH_SIZE = 10000
+
+
+class BenchMongo:
+    """Stand-in of kytos.core.db.Mongo over a given client."""
+
+    def __init__(self, client):
+        self.client = client
+        self.db_name = DB_NAME
+
+    def bootstrap_index(self, collection: str, keys: list, **kwargs) -> bool:
+        """Create an index, as kytos does when bootstrapping one."""
+        self.client[self.db_name][collection].create_index(keys, **kwargs)
+        return True
+
+
+def new_client(uri: str):
+    """Create a client of the server at uri, or of mongomock if not given."""
+    if uri:
+        # pylint: disable=import-outside-toplevel
+        from pymongo import MongoClient
+
+        return MongoClient(uri, tz_aware=True)
+    # pylint: disable=import-outside-toplevel
+    import mongomock
+
+    return mongomock.MongoClient(tz_aware=True)
+
+
+def make_documents(count: int, first: int, now: datetime) -> list[dict]:
+    """Create the DB documents of windows first to first + count, starting
+    a minute apart and lasting two hours, each one with a few devices."""
+    return [
+        {
+            "id": f"{number:032x}",
+            "description": "",
+            "start": now + timedelta(minutes=number),
+            "end": now + timedelta(minutes=number, hours=2),
+            "switches": [f"{number % SWITCHES:016x}"],
+            "interfaces": [f"{(number + 1) % SWITCHES:016x}:1"],
+            "links": [],
+            "status": "pending",
+            "recurrence": None,
+            "occurrence": 0,
+            "inserted_at": now,
+            "updated_at": now,
+        }
+        for number in range(first, first + count)
+    ]
+
+
+def fill(controller: MaintenanceController, count: int, now: datetime):
+    """Insert count windows in batches."""
+    for first in range(0, count, BATCH_SIZE):
+        controller.windows.insert_many(
+            make_documents(min(BATCH_SIZE, count - first), first, now)
+        )
+
+
+def run(client, count: int, repeat: int) -> dict[str, dict]:
+    """Time the cases over a collection of count windows."""
+    client.drop_database(DB_NAME)
+    controller = MaintenanceController(lambda: BenchMongo(client))
+    controller.bootstrap_indexes()
+    now = datetime.now(pytz.utc) + timedelta(days=1)
+    fill(controller, count, now)
+
+    middle = now + timedelta(minutes=count // 2)
+    window = MW.model_construct(
+        id="f" * 32,
+        start=middle,
+        end=middle + timedelta(hours=1),
+        switches=[f"{7:016x}"],
+        interfaces=[],
+        links=[],
+        recurrence=None,
+    )
+    switch_filter = MaintenanceFilter(switches=[f"{7:016x}"])
+    results = {
+        f"check_overlap {count} windows": baseline.measure(
+            lambda: controller.check_overlap(window, False), repeat
+        ),
+        f"check_overlap force {count} windows": baseline.measure(
+            lambda: controller.check_overlap(window, True), repeat
+        ),
+        f"get_windows {count} windows": baseline.measure(
+            controller.get_windows, repeat, operations=count
+        ),
+        f"get_windows page of 100 {count} windows": baseline.measure(
+            lambda: controller.get_windows(limit=100, after=(middle, "")),
+            repeat,
+        ),
+        f"get_windows by switch {count} windows": baseline.measure(
+            lambda: controller.get_windows(switch_filter), repeat
+        ),
+    }
+    client.drop_database(DB_NAME)
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--windows", type=int, nargs="+", default=[1000, 10000]
+    )
+    parser.add_argument("--mongo-uri", default="")
+    parser.add_argument("--repeat", type=int, default=5)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("kytos").setLevel(logging.WARNING)
+
+    client = new_client(args.mongo_uri)
+    results = {}
+    for count in args.windows:
+        results.update(run(client, count, args.repeat))
+    engine = "mongod" if args.mongo_uri else "mongomock"
+    baseline.report(f"controller_{engine}", results, args)
+
+
+if __name__ == "__main__":
+    main()
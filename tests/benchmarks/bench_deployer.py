@@ -0,0 +1,154 @@
+"""Benchmark of starting and ending windows and of the status functions.
+
+Times MaintenanceDeployer.start_mw and end_mw with a window covering a
+share of the switches of a synthetic topology, and the status and
+status reason functions of every switch, interface and link of the
+topology while that window is running, next to the same checks without
+counting the calls, as done before the status functions had metrics.
+
+Run with the NApp and kytos in the python path:
+
+    python -m tests.benchmarks.bench_deployer [--switches 100 1000 10000]
+        [--save | --compare]
+"""
+
+import argparse
+import logging
+from collections import Counter
+from threading import Lock
+from types import SimpleNamespace
+
+from kytos.core.common import EntityStatus
+from napps.kytos.maintenance.managers import MaintenanceDeployer as Deployer
+from napps.kytos.maintenance.managers.deployer import DEVICE_KINDS
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from tests import workload
+from tests.benchmarks import baseline
+
+
+def new_deployer(controller: SimpleNamespace) -> Deployer:
+    """Create a deployer with no window running."""
+    return Deployer(controller, Counter(), Counter(), Counter(), Lock())
+
+
+def make_window(controller: SimpleNamespace, share: float) -> MW:
+    """Create a window with a share of the switches, one interface of
+    another switch and one link, as windows usually mix them."""
+    switch_ids = list(controller.switches)
+    count = max(1, int(len(switch_ids) * share))
+    other = controller.switches[switch_ids[-1]]
+    return MW.model_construct(
+        id="0" * 32,
+        switches=switch_ids[:count],
+        interfaces=[other.interfaces[len(other.interfaces)].id],
+        links=[next(iter(controller.links))],
+    )
+
+
+def status_calls(deployer: Deployer, controller: SimpleNamespace) -> list:
+    """Get the status function calls done for every device of a topology,
+    as pairs of the function and the device."""
+    calls = []
+    for switch in controller.switches.values():
+        calls.append((deployer.switch_status_func, switch))
+        calls.append((deployer.switch_status_reason_func, switch))
+        for interface in switch.interfaces.values():
+            calls.append((deployer.interface_status_func, interface))
+            calls.append((deployer.interface_status_reason_func, interface))
+    for link in controller.links.values():
+        calls.append((deployer.link_status_func, link))
+        calls.append((deployer.link_status_reason_func, link))
+    return calls
+
+
+def uncounted_status_calls(deployer: Deployer, controller: SimpleNamespace) -> list:
+    """Get the same calls as status_calls, to functions checking the
+    snapshot of the deployer without counting the calls."""
+
+    def status_func(kind: str):
+        def func(dev):
+            if dev.id in getattr(deployer.snapshot, kind):
+                return EntityStatus.DOWN
+            return EntityStatus.UP
+
+        return func
+
+    def status_reason_func(kind: str):
+        def func(dev):
+            if dev.id in getattr(deployer.snapshot, kind):
+                return frozenset({"maintenance"})
+            return frozenset()
+
+        return func
+
+    funcs = {}
+    for kind, devices in zip(("switch", "interface", "link"), DEVICE_KINDS):
+        funcs[getattr(deployer, f"{kind}_status_func")] = status_func(devices)
+        funcs[getattr(deployer, f"{kind}_status_reason_func")] = status_reason_func(
+            devices
+        )
+    return [(funcs[func], dev) for func, dev in status_calls(deployer, controller)]
+
+
+def run(count: int, degree: float, share: float, repeat: int) -> dict[str, dict]:
+    """Time the cases over a topology of count switches."""
+    controller = workload.make_topology(count, degree).controller()
+    window = make_window(controller, share)
+    state = SimpleNamespace(deployer=None)
+
+    def fresh():
+        state.deployer = new_deployer(controller)
+
+    def started():
+        fresh()
+        state.deployer.start_mw(window)
+
+    results = {
+        f"start_mw {count} switches": baseline.measure(
+            lambda: state.deployer.start_mw(window), repeat, setup=fresh
+        ),
+        f"end_mw {count} switches": baseline.measure(
+            lambda: state.deployer.end_mw(window), repeat, setup=started
+        ),
+    }
+    started()
+    calls = status_calls(state.deployer, controller)
+    uncounted_calls = uncounted_status_calls(state.deployer, controller)
+
+    def call_all(calls):
+        for func, dev in calls:
+            func(dev)
+
+    results[f"status funcs {count} switches"] = baseline.measure(
+        lambda: call_all(calls), repeat, operations=len(calls)
+    )
+    results[f"uncounted status funcs {count} switches"] = baseline.measure(
+        lambda: call_all(uncounted_calls), repeat, operations=len(calls)
+    )
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--degree", type=float, default=2.0, help="links per switch")
+    parser.add_argument(
+        "--share",
+        type=float,
+        default=0.1,
+        help="share of the switches in the window",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("kytos").setLevel(logging.WARNING)
+
+    results = {}
+    for count in args.switches:
+        results.update(run(count, args.degree, args.share, args.repeat))
+    baseline.report("deployer", results, args)
+
+
+if __name__ == "__main__":
+    main()
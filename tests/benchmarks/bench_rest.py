@@ -0,0 +1,142 @@
+"""Benchmark of the throughput of the REST handlers.
+
+Sends requests to the NApp through the kytos test client, with the DB
+controller over mongomock and a synthetic topology, so the whole path of a
+request is timed except the network and the real DB. Requests are sent
+one after the other, then --concurrency at a time.
+
+Run with the NApp and kytos in the python path:
+
+    python -m tests.benchmarks.bench_rest [--requests 200] [--windows 1000]
+        [--save | --compare]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from itertools import count, islice
+from typing import Callable
+from unittest.mock import patch
+
+import mongomock
+import pytz
+
+from kytos.lib.helpers import get_controller_mock, get_test_client
+from napps.kytos.maintenance.controllers import MaintenanceController
+from napps.kytos.maintenance.main import Main
+from tests import workload
+from tests.benchmarks import baseline
+from tests.benchmarks.bench_controller import BenchMongo, fill
+
+BASE_ENDPOINT = "kytos/maintenance/v1"
+TIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
+SWITCHES = 1000
+
+
+def new_napp(windows: int) -> Main:
+    """Create the NApp over a mongomock DB holding the given windows."""
+    client = mongomock.MongoClient(tz_aware=True)
+    db_controller = MaintenanceController(lambda: BenchMongo(client))
+    fill(db_controller, windows, datetime.now(pytz.utc) + timedelta(days=1))
+    controller = workload.make_topology(SWITCHES).install(get_controller_mock())
+    # mongomock has no asyncio client, so handlers reach it from threads
+    with patch(
+        "napps.kytos.maintenance.managers.scheduler.MaintenanceController",
+        return_value=db_controller,
+    ), patch("napps.kytos.maintenance.managers.scheduler.AsyncMongoClient", None):
+        return Main(controller)
+
+
+def create_payload(number: int, start: datetime) -> dict:
+    """Payload creating a window with a switch and an interface of its own,
+    forced, so it only overlaps windows sharing its devices."""
+    switch_id = f"{number % SWITCHES:016x}"
+    return {
+        "start": start.strftime(TIME_FMT),
+        "end": (start + timedelta(hours=1)).strftime(TIME_FMT),
+        "switches": [switch_id],
+        "interfaces": [f"{(number + 1) % SWITCHES:016x}:1"],
+        "force": True,
+    }
+
+
+async def send(api, requests: list, concurrency: int):
+    """Send the given (method, url, json) requests, concurrency at a time,
+    checking they all succeed."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_one(method, url, payload):
+        async with semaphore:
+            response = await api.request(method, url, json=payload)
+        assert response.status_code < 300, response.text
+
+    await asyncio.gather(*(send_one(*request) for request in requests))
+
+
+def time_requests(
+    api, name: str, make_requests: Callable[[], list], args
+) -> dict[str, dict]:
+    """Time the requests sent one by one, then concurrently. The requests
+    are made again before each run, so they may create windows."""
+    loop = asyncio.get_event_loop()
+    results = {}
+    for concurrency in (1, args.concurrency):
+        requests = []
+
+        def setup():
+            requests[:] = make_requests()
+
+        results[f"{name} x{concurrency}"] = baseline.measure(
+            lambda: loop.run_until_complete(send(api, requests, concurrency)),
+            args.repeat,
+            operations=args.requests,
+            setup=setup,
+        )
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--windows", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("kytos").setLevel(logging.WARNING)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    napp = new_napp(args.windows)
+    napp.controller.loop = loop
+    api = get_test_client(napp.controller, napp)
+    window_id = f"{args.windows // 2:032x}"
+    start = datetime.now(pytz.utc) + timedelta(days=365)
+    numbers = count()
+    cases = {
+        f"GET /v1/{{mw_id}} {args.windows} windows": lambda: [
+            ("GET", f"{BASE_ENDPOINT}/{window_id}", None)
+        ] * args.requests,
+        f"GET /v1?limit=50 {args.windows} windows": lambda: [
+            ("GET", f"{BASE_ENDPOINT}?limit=50", None)
+        ] * args.requests,
+        "POST /v1": lambda: [
+            (
+                "POST",
+                BASE_ENDPOINT,
+                create_payload(number, start + timedelta(minutes=number)),
+            )
+            for number in islice(numbers, args.requests)
+        ],
+    }
+    results = {}
+    for name, make_requests in cases.items():
+        results.update(time_requests(api, name, make_requests, args))
+    napp.shutdown()
+    loop.close()
+    baseline.report("rest", results, args)
+
+
+if __name__ == "__main__":
+    main()
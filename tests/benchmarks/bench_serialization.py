@@ -0,0 +1,91 @@
+"""Benchmark of the serialization of window listings.
+
+Compares building MaintenanceWindow objects from DB documents and
+serializing them with pydantic, as GET /v1 used to do, with serializing
+the documents straight away with the serializers module, with orjson
+and with the json module it falls back to when orjson is missing.
+
+Run with the NApp in the python path:
+
+    python -m tests.benchmarks.bench_serialization [--windows 10000]
+        [--save | --compare]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytz
+
+from napps.kytos.maintenance import serializers
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.models import MaintenanceWindows
+from napps.kytos.maintenance.serializers import dump_windows
+from tests.benchmarks import baseline
+
+
+def make_documents(count: int) -> list[dict]:
+    """Create DB documents of windows with a few devices each."""
+    now = datetime.now(pytz.utc)
+    return [
+        {
+            "id": f"{number:032x}",
+            "start": now + timedelta(minutes=number),
+            "end": now + timedelta(minutes=number, hours=2),
+            "switches": [f"00:00:00:00:00:00:00:{number % 256:02x}"],
+            "interfaces": [f"00:00:00:00:00:00:01:{number % 256:02x}:1"],
+            "links": [f"{number:064x}"],
+            "description": f"Maintenance window {number}",
+            "status": "pending",
+            "inserted_at": now,
+            "updated_at": now,
+        }
+        for number in range(count)
+    ]
+
+
+def pydantic_path(documents: list[dict]) -> bytes:
+    """Serialize the documents as GET /v1 used to do."""
+    windows = MaintenanceWindows.model_construct(
+        root=[MW.model_construct(**document) for document in documents]
+    )
+    return windows.json().encode()
+
+
+def run(count: int, repeat: int) -> dict[str, dict]:
+    """Time the cases over count windows."""
+    documents = make_documents(count)
+    assert pydantic_path(documents) == dump_windows(documents)
+    results = {
+        f"pydantic {count} windows": baseline.measure(
+            lambda: pydantic_path(documents), repeat, operations=count
+        ),
+    }
+    if serializers.orjson is not None:
+        results[f"serializers orjson {count} windows"] = baseline.measure(
+            lambda: dump_windows(documents), repeat, operations=count
+        )
+    with patch.object(serializers, "orjson", None):
+        assert pydantic_path(documents) == dump_windows(documents)
+        results[f"serializers json {count} windows"] = baseline.measure(
+            lambda: dump_windows(documents), repeat, operations=count
+        )
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", type=int, nargs="+", default=[10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = {}
+    for count in args.windows:
+        results.update(run(count, args.repeat))
+    baseline.report("serialization", results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark of the recovery of unfinished windows on startup.
+
+Compares starting each running window and scheduling each window one by
+one, as MaintenanceScheduler.start used to do, with the batch recovery
+of MaintenanceScheduler.start. The DB is replaced by the windows it would
+return, so only the in-memory work is measured.
+
+Run with the NApp and kytos in the python path:
+
+    python -m tests.benchmarks.bench_startup [--windows 1000 10000 100000]
+        [--save | --compare]
+"""
+import argparse
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from threading import Lock
+from types import SimpleNamespace
+
+import pytz
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from napps.kytos.maintenance.managers import MaintenanceDeployer as Deployer
+from napps.kytos.maintenance.managers import MaintenanceScheduler as Scheduler
+from napps.kytos.maintenance.managers.timer import TimerQueue
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.models import Status
+from tests.benchmarks import baseline
+
+SWITCHES = 256
+PORTS = 4
+
+
+def make_controller() -> SimpleNamespace:
+    """Create a controller with a topology of SWITCHES switches."""
+    switches = {}
+    interfaces = {}
+    for number in range(SWITCHES):
+        switch = SimpleNamespace(id=f"00:00:00:00:00:00:00:{number:02x}")
+        switch.interfaces = {
+            port: SimpleNamespace(id=f"{switch.id}:{port}", switch=switch, link=None)
+            for port in range(1, PORTS + 1)
+        }
+        switches[switch.id] = switch
+        interfaces.update(
+            (interface.id, interface) for interface in switch.interfaces.values()
+        )
+    return SimpleNamespace(
+        switches=switches,
+        links={},
+        get_interface_by_id=interfaces.get,
+        buffers=SimpleNamespace(app=SimpleNamespace(put=lambda event: None)),
+    )
+
+
+def make_windows(count: int) -> list[MW]:
+    """Create unfinished windows, half of them running."""
+    now = datetime.now(pytz.utc)
+    return [
+        MW.model_construct(
+            id=f"{number:032x}",
+            start=now + timedelta(minutes=number - count // 2, hours=1),
+            end=now + timedelta(minutes=number, hours=2),
+            switches=[f"00:00:00:00:00:00:00:{number % SWITCHES:02x}"],
+            interfaces=[f"00:00:00:00:00:00:00:{(number + 1) % SWITCHES:02x}:1"],
+            links=[],
+            status=Status.RUNNING if number < count // 2 else Status.PENDING,
+        )
+        for number in range(count)
+    ]
+
+
+def new_scheduler(windows: list[MW], engine: str) -> Scheduler:
+    """Create a scheduler over a DB holding the given windows."""
+    deployer = Deployer(make_controller(), Counter(), Counter(), Counter(), Lock())
+    db_controller = SimpleNamespace(
+        prepare_start=lambda: None,
+        get_unfinished_windows=lambda: windows,
+    )
+    if engine == "timer":
+        task_scheduler = TimerQueue()
+    else:
+        task_scheduler = BackgroundScheduler(timezone=pytz.utc)
+    return Scheduler(deployer, db_controller, task_scheduler)
+
+
+def one_by_one(scheduler: Scheduler):
+    """Recover the windows as MaintenanceScheduler.start used to do."""
+    scheduler.db_controller.prepare_start()
+    for window in scheduler.db_controller.get_unfinished_windows():
+        scheduler.window_cache.put(window)
+        if window.status != Status.FINISHED:
+            scheduler.overlap_index.add(window)
+        if window.status == Status.RUNNING:
+            scheduler.deployer.start_mw(window)
+        scheduler._schedule(window)  # pylint: disable=protected-access
+    scheduler.scheduler.start()
+
+
+def batch(scheduler: Scheduler):
+    """Recover the windows with MaintenanceScheduler.start."""
+    scheduler.start()
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--windows", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument(
+        "--engine", choices=["apscheduler", "timer"], default="timer"
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("kytos").setLevel(logging.WARNING)
+
+    print(f"Startup recovery with the {args.engine} engine")
+    results = {}
+    for count in args.windows:
+        windows = make_windows(count)
+        for name, func in [("one by one", one_by_one), ("batch", batch)]:
+            schedulers = []
+
+            def setup():
+                schedulers.append(new_scheduler(windows, args.engine))
+
+            results[f"{name} {count} windows"] = baseline.measure(
+                lambda: func(schedulers[-1]),
+                args.repeat,
+                operations=count,
+                setup=setup,
+            )
+            for scheduler in schedulers:
+                scheduler.scheduler.shutdown(wait=False)
+    baseline.report(f"startup_{args.engine}", results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Microbenchmarks of the validation of maintenance windows.
+
+Times parsing the times of REST payloads with parse_time against
+strptime, validating the payloads of a bulk creation one at a time and
+as a single list with validate_windows, and validating a PATCH by
+merging it into a full model_dump, as update_mw used to do, against
+validate_changes.
+
+Run with the NApp and kytos in the python path:
+
+    python -m tests.benchmarks.bench_validation [--windows 1000]
+        [--save | --compare]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import pytz
+
+from napps.kytos.maintenance.models import TIME_FMT
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.models import parse_time, validate_windows
+from tests.benchmarks import baseline
+
+
+def make_payloads(count: int) -> list[dict]:
+    """Create the payloads of a bulk creation of count windows."""
+    start = datetime.now(pytz.utc) + timedelta(days=1)
+    return [
+        {
+            "start": (start + timedelta(minutes=number)).strftime(TIME_FMT),
+            "end": (start + timedelta(minutes=number, hours=2)).strftime(TIME_FMT),
+            "switches": [f"00:00:00:00:00:00:00:{number % 256:02x}"],
+            "interfaces": [f"00:00:00:00:00:00:01:{number % 256:02x}:1"],
+            "description": f"Maintenance window {number}",
+        }
+        for number in range(count)
+    ]
+
+
+def run(count: int, repeat: int) -> dict[str, dict]:
+    """Time the cases over count windows."""
+    payloads = make_payloads(count)
+    times = [payload["start"] for payload in payloads]
+    windows = [MW.model_validate(payload) for payload in payloads]
+    changes = [{"end": payload["end"], "description": "x"} for payload in payloads]
+    assert [parse_time(time) for time in times] == [
+        datetime.strptime(time, TIME_FMT) for time in times
+    ]
+    assert [
+        window.model_dump(exclude={"id"}) for window in validate_windows(payloads)[0]
+    ] == [window.model_dump(exclude={"id"}) for window in windows]
+
+    def one_by_one():
+        for payload in payloads:
+            MW.model_validate(payload)
+
+    def merged():
+        for window, change in zip(windows, changes):
+            MW.model_validate({**window.model_dump(), **change})
+
+    def changed():
+        for window, change in zip(windows, changes):
+            window.validate_changes(change)
+
+    cases = {
+        "strptime": lambda: [datetime.strptime(time, TIME_FMT) for time in times],
+        "parse_time": lambda: [parse_time(time) for time in times],
+        "model_validate one by one": one_by_one,
+        "validate_windows": lambda: validate_windows(payloads),
+        "update merged into model_dump": merged,
+        "update validate_changes": changed,
+    }
+    return {
+        f"{name} {count} windows": baseline.measure(func, repeat, operations=count)
+        for name, func in cases.items()
+    }
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    baseline.report("validation", run(args.windows, args.repeat), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Offline replay of a maintenance window workload.
+
+Generates a topology and a workload with tests.workload, or reads the
+workload from an NDJSON file, and replays it in simulated time through
+MaintenanceScheduler and MaintenanceDeployer over mongomock, or a
+MongoDB server given --mongo-uri. Each window is added --lead before it
+starts, then started and ended when due, so the time of each operation
+can be measured without waiting for the windows. Windows rejected as
+overlapping are neither started nor ended.
+
+Run with the NApp and kytos in the python path:
+
+    python -m tests.benchmarks.replay [--switches 1000] [--windows 10000]
+        [--concurrency 4] [--mix switches=1,interfaces=2,links=1]
+        [--input windows.ndjson | --output windows.ndjson]
+        [--save | --compare]
+"""
+
+import argparse
+import logging
+import statistics
+from collections import Counter, defaultdict
+from datetime import timedelta
+from threading import Lock
+from time import perf_counter
+
+from napps.kytos.maintenance.controllers import MaintenanceController
+from napps.kytos.maintenance.importer import parse_ndjson
+from napps.kytos.maintenance.managers import MaintenanceDeployer as Deployer
+from napps.kytos.maintenance.managers import MaintenanceScheduler as Scheduler
+from napps.kytos.maintenance.managers.timer import TimerQueue
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.models import OverlapError
+from napps.kytos.maintenance.serializers import dump_windows_ndjson
+from tests import workload
+from tests.benchmarks import baseline
+from tests.benchmarks.bench_controller import DB_NAME, BenchMongo, new_client
+
+# Order of the operations due at the same instant
+OPERATIONS = ("end", "add", "start")
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Parse a mix of device kinds given as kind=weight pairs."""
+    mix = {}
+    for pair in value.split(","):
+        kind, _, weight = pair.partition("=")
+        if kind not in workload.DEVICE_KINDS:
+            raise argparse.ArgumentTypeError(f"Unknown device kind: {kind}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def read_windows(path: str) -> list[MW]:
+    """Read the windows of a workload from an NDJSON file."""
+    with open(path, encoding="utf-8") as file:
+        return [
+            MW.model_validate(record, context={"allow_past_start": True})
+            for _, record in parse_ndjson(file)
+        ]
+
+
+def timeline(windows: list[MW], lead: timedelta) -> list[tuple[str, MW]]:
+    """Get the operations of a workload in the order they are due."""
+    operations = []
+    for window in windows:
+        operations.append((window.start - lead, "add", window))
+        operations.append((window.start, "start", window))
+        operations.append((window.end, "end", window))
+    operations.sort(key=lambda item: (item[0], OPERATIONS.index(item[1])))
+    return [(operation, window) for _, operation, window in operations]
+
+
+class Replay:
+    """Replay of a workload over a fresh scheduler, deployer and DB."""
+
+    def __init__(self, topology: workload.Topology, client, force: bool):
+        client.drop_database(DB_NAME)
+        db_controller = MaintenanceController(lambda: BenchMongo(client))
+        db_controller.bootstrap_indexes()
+        self.controller = topology.controller()
+        deployer = Deployer(self.controller, Counter(), Counter(), Counter(), Lock())
+        self.scheduler = Scheduler(deployer, db_controller, TimerQueue())
+        self.force = force
+        self.rejected = set()
+        self.latencies = defaultdict(list)
+        self.running = 0
+        self.max_running = 0
+        self.max_devices = 0
+
+    def run(self, operations: list[tuple[str, MW]]):
+        """Run the operations, timing each one."""
+        deployer = self.scheduler.deployer
+        for operation, window in operations:
+            if operation != "add" and window.id in self.rejected:
+                continue
+            started_at = perf_counter()
+            if operation == "add":
+                try:
+                    self.scheduler.add(window, force=self.force)
+                except OverlapError:
+                    self.rejected.add(window.id)
+            elif operation == "start":
+                self.scheduler.start_maintenance(window.id)
+                self.running += 1
+            else:
+                self.scheduler.end_maintenance(window.id)
+                self.running -= 1
+            self.latencies[operation].append(perf_counter() - started_at)
+            if operation == "start":
+                self.max_running = max(self.max_running, self.running)
+                snapshot = deployer.snapshot
+                self.max_devices = max(
+                    self.max_devices,
+                    len(snapshot.switches)
+                    + len(snapshot.interfaces)
+                    + len(snapshot.links),
+                )
+
+    def print_stats(self, windows: int):
+        """Print the outcome of the replay and the latency of operations."""
+        print(
+            f"{windows - len(self.rejected)} windows replayed,"
+            f" {len(self.rejected)} rejected as overlapping,"
+            f" up to {self.max_running} running at once"
+            f" over {self.max_devices} devices,"
+            f" {len(self.controller.events)} events"
+        )
+        for operation in OPERATIONS[1:] + OPERATIONS[:1]:
+            times = sorted(self.latencies[operation])
+            if not times:
+                continue
+            p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+            print(
+                f"{operation:>6}: {len(times):8} operations,"
+                f" p50 {statistics.median(times) * 1000:8.3f} ms,"
+                f" p99 {p99 * 1000:8.3f} ms,"
+                f" max {times[-1] * 1000:8.3f} ms"
+            )
+
+
+def main():
+    """Replay the workload and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=1000)
+    parser.add_argument("--degree", type=float, default=3.0)
+    parser.add_argument("--windows", type=int, default=10000)
+    parser.add_argument(
+        "--concurrency",
+        type=float,
+        default=4.0,
+        help="windows running at the same time on average",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=2.0, help="mean duration in hours"
+    )
+    parser.add_argument(
+        "--durations", choices=sorted(workload.DURATIONS), default="exponential"
+    )
+    parser.add_argument("--mix", type=parse_mix, default={"switches": 1})
+    parser.add_argument(
+        "--devices", type=int, default=3, help="most devices of a window"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--lead", type=float, default=24.0, help="hours a window is added ahead"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="only reject windows overlapping on devices",
+    )
+    parser.add_argument("--input", help="NDJSON file with the windows to replay")
+    parser.add_argument("--output", help="NDJSON file to write the windows to")
+    parser.add_argument("--mongo-uri", default="")
+    parser.add_argument("--repeat", type=int, default=1)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("kytos").setLevel(logging.WARNING)
+
+    topology = workload.make_topology(args.switches, args.degree, seed=args.seed)
+    if args.input:
+        windows = read_windows(args.input)
+    else:
+        spec = workload.WindowSpec(
+            concurrency=args.concurrency,
+            mean_duration=timedelta(hours=args.duration),
+            durations=args.durations,
+            mix=args.mix,
+            devices=args.devices,
+            seed=args.seed,
+        )
+        windows = workload.make_windows(topology, args.windows, spec)
+    if args.output:
+        with open(args.output, "wb") as file:
+            file.write(dump_windows_ndjson(window.__dict__ for window in windows))
+    operations = timeline(windows, timedelta(hours=args.lead))
+    client = new_client(args.mongo_uri)
+    replays = []
+
+    def setup():
+        replays.append(Replay(topology, client, args.force))
+
+    results = {
+        f"replay {len(windows)} windows {args.switches} switches": (
+            baseline.measure(
+                lambda: replays[-1].run(operations),
+                args.repeat,
+                operations=len(operations),
+                setup=setup,
+            )
+        )
+    }
+    replays[-1].print_stats(len(windows))
+    client.drop_database(DB_NAME)
+    baseline.report("replay", results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Tests for the batch module."""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from apscheduler.jobstores.base import JobLookupError
+import pytest
+import pytz
+
+from napps.kytos.maintenance.managers.batch import BatchScheduler
+
+
+@dataclass
+class BatchJob:
+    """Job recording the batches it is run in."""
+    batches: list
+    name: str
+
+    def __call__(self):
+        raise AssertionError('Batch jobs must run in batches')
+
+    @classmethod
+    def run_batch(cls, jobs):
+        jobs[0].batches.append([job.name for job in jobs])
+
+
+class TestBatchScheduler:
+    """Test of the BatchScheduler class."""
+
+    def setup_method(self):
+        self.now = datetime.now(pytz.utc)
+        self.task_scheduler = MagicMock()
+        self.scheduler = BatchScheduler(self.task_scheduler)
+
+    def run_jobs(self):
+        """Run the jobs added to the wrapped scheduler."""
+        for job_call in self.task_scheduler.add_job.call_args_list:
+            job_call.args[0](*job_call.kwargs['args'])
+
+    def test_add_and_remove(self):
+        """Test jobs due at the same instant share an APScheduler job."""
+        later = self.now + timedelta(minutes=1)
+        self.scheduler.add_job(BatchJob([], 'a'), 'date', id='a', run_date=self.now)
+        self.scheduler.add_job(BatchJob([], 'b'), 'date', id='b', run_date=self.now)
+        self.scheduler.add_job(BatchJob([], 'c'), 'date', id='c', run_date=later)
+        self.scheduler.add_job(MagicMock(), 'date', id='d', run_date=self.now)
+        assert len(self.scheduler) == 4
+        assert self.task_scheduler.add_job.call_count == 3
+
+        self.scheduler.add_job(BatchJob([], 'a'), 'date', id='a', run_date=later)
+        assert self.task_scheduler.add_job.call_count == 3
+        self.scheduler.remove_job('a')
+        self.scheduler.remove_job('b')
+        self.task_scheduler.remove_job.assert_called_once_with('batch-0')
+        with pytest.raises(JobLookupError):
+            self.scheduler.remove_job('a')
+        with pytest.raises(ValueError):
+            self.scheduler.add_job(
+                MagicMock(), 'interval', id='e', run_date=self.now
+            )
+
+        self.scheduler.remove_all_jobs()
+        assert len(self.scheduler) == 0
+        self.task_scheduler.remove_all_jobs.assert_called_once()
+
+    def test_run(self):
+        """Test the jobs of a batch run together."""
+        batches = []
+        single = MagicMock()
+        later = self.now + timedelta(minutes=1)
+        self.scheduler.add_job(BatchJob(batches, 'a'), id='a', run_date=self.now)
+        self.scheduler.add_job(BatchJob(batches, 'b'), id='b', run_date=self.now)
+        self.scheduler.add_job(BatchJob(batches, 'c'), id='c', run_date=later)
+        self.scheduler.add_job(single, id='d', run_date=self.now)
+        self.scheduler.add_job(BatchJob(batches, 'e'), id='e', run_date=later)
+        self.scheduler.remove_job('e')
+        self.run_jobs()
+        assert batches == [['a', 'b'], ['c']]
+        single.assert_called_once()
+        assert len(self.scheduler) == 0
+        with pytest.raises(JobLookupError):
+            self.scheduler.remove_job('a')
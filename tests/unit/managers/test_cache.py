@@ -0,0 +1,77 @@
+"""Tests for the cache module."""
+
+from datetime import datetime, timedelta
+
+import pytz
+
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.managers.cache import WindowCache
+
+
+class TestWindowCache:
+    """Test of the WindowCache class."""
+
+    def setup_method(self):
+        start = datetime.now(pytz.utc) + timedelta(days=1)
+        self.cache = WindowCache(finished_size=2)
+        self.window = MW.model_construct(
+            id='window',
+            start=start,
+            end=start + timedelta(hours=1),
+            status='pending',
+            switches=[],
+            interfaces=[],
+            links=[],
+        )
+
+    def finished(self, mw_id):
+        return self.window.copy(update={'id': mw_id, 'status': 'finished'})
+
+    def test_get_and_put(self):
+        """Test hits and misses are counted."""
+        assert self.cache.get('window') is None
+        self.cache.put(self.window)
+        assert self.cache.get('window') is self.window
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+        running = self.window.copy(update={'status': 'running'})
+        self.cache.put(running)
+        assert self.cache.get('window') is running
+        assert len(self.cache) == 1
+
+    def test_put_if_absent(self):
+        """Test windows read from the DB do not replace cached ones."""
+        assert self.cache.put_if_absent(self.window) is self.window
+        running = self.window.copy(update={'status': 'running'})
+        self.cache.put(running)
+        assert self.cache.put_if_absent(self.window) is running
+        assert self.cache.get('window') is running
+
+        finished = self.finished('window 1')
+        self.cache.put(finished)
+        assert self.cache.put_if_absent(self.window.copy(
+            update={'id': 'window 1'}
+        )) is finished
+
+    def test_finished_lru(self):
+        """Test only the most recently used finished windows are kept."""
+        self.cache.put(self.window)
+        self.cache.put(self.finished('window 1'))
+        self.cache.put(self.finished('window 2'))
+        assert self.cache.get('window 1') is not None
+        self.cache.put(self.finished('window 3'))
+        assert list(self.cache.finished) == ['window 1', 'window 3']
+
+        self.cache.put(self.finished('window'))
+        assert 'window' not in self.cache.active
+        assert list(self.cache.finished) == ['window 3', 'window']
+
+    def test_discard_and_clear(self):
+        """Test removing windows from the cache."""
+        self.cache.put(self.window)
+        self.cache.put(self.finished('window 1'))
+        self.cache.discard(['window', 'unknown'])
+        assert list(self.cache.finished) == ['window 1']
+        assert not self.cache.active
+        self.cache.clear()
+        assert len(self.cache) == 0
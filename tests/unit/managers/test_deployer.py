@@ -5,14 +5,17 @@ from unittest.mock import MagicMock
 from collections import Counter
 
 from datetime import datetime, timedelta
-from threading import Lock
+import random
+from threading import Event, Lock, Thread
 import pytz
 from kytos.core.common import EntityStatus
 from kytos.lib.helpers import get_controller_mock
+from napps.kytos.maintenance import metrics
 from napps.kytos.maintenance.models import MaintenanceWindow as MW
 
 from napps.kytos.maintenance.managers.deployer import (
     MaintenanceDeployer,
+    MaintenanceSnapshot,
 )
 
 class TestDeployer:
@@ -382,31 +385,13 @@ class TestDeployer:
         assert     self.deployer.link_not_in_maintenance(self.link_3)
 
     def test_dev_status(self):
-        switch_1 = MagicMock(
-            id = 'test-switch-1',
-            interfaces = {},
-        )
-        switch_2 = MagicMock(
-            id = 'test-switch-2',
-            interfaces = {},
-        )
-        interface_1 = MagicMock(
-            id = 'test-interface-1',
-            switch = switch_1,
-            link = None,
-        )
-        switch_1.interfaces[0] = interface_1
-        interface_2 = MagicMock(
-            id = 'test-interface-2',
-            switch = switch_2,
-            link = None,
-        )
-        switch_2.interfaces[0] = interface_2
-        link = MagicMock(
-            id = 'test-link',
-            endpoint_a = interface_1,
-            endpoint_b = interface_2,
-        )
+        """Test status functions while maintenances start and end."""
+        self.controller.buffers.app.put = MagicMock()
+        switch_1 = self.controller.switches['01:23:45:67:89:ab:cd:ef']
+        switch_2 = self.controller.switches['01:23:45:67:65:ab:cd:ef']
+        interface_1 = switch_1.interfaces[0]
+        interface_2 = switch_2.interfaces[0]
+        link = self.link_1
 
         # No active maintenances
         assert self.deployer.link_status_func(link) != EntityStatus.DOWN
@@ -422,7 +407,14 @@ class TestDeployer:
         assert self.deployer.switch_status_reason_func(switch_2) == set()
 
         # Active switch maintenance
-        self.deployer.maintenance_switches['test-switch-1'] = 1
+        switch_mw = self.maintenance.copy(
+            update = {
+                'switches': [switch_1.id],
+                'interfaces': [],
+                'links': [],
+            }
+        )
+        self.deployer.start_mw(switch_mw)
 
         assert self.deployer.link_status_func(link) == EntityStatus.DOWN
         assert self.deployer.interface_status_func(interface_1) == EntityStatus.DOWN
@@ -437,8 +429,15 @@ class TestDeployer:
         assert self.deployer.switch_status_reason_func(switch_2) == set()
 
         # Active interface maintenance
-        self.deployer.maintenance_switches['test-switch-1'] = 0
-        self.deployer.maintenance_interfaces['test-interface-1'] = 1
+        interface_mw = self.maintenance.copy(
+            update = {
+                'switches': [],
+                'interfaces': [interface_1.id],
+                'links': [],
+            }
+        )
+        self.deployer.start_mw(interface_mw)
+        self.deployer.end_mw(switch_mw)
 
         assert self.deployer.link_status_func(link) == EntityStatus.DOWN
         assert self.deployer.interface_status_func(interface_1) == EntityStatus.DOWN
@@ -453,9 +452,15 @@ class TestDeployer:
         assert self.deployer.switch_status_reason_func(switch_2) == set()
 
         # Active link maintenance
-        self.deployer.maintenance_switches['test-switch-1'] = 0
-        self.deployer.maintenance_interfaces['test-interface-1'] = 0
-        self.deployer.maintenance_links['test-link'] = 1
+        link_mw = self.maintenance.copy(
+            update = {
+                'switches': [],
+                'interfaces': [],
+                'links': [link.id],
+            }
+        )
+        self.deployer.start_mw(link_mw)
+        self.deployer.end_mw(interface_mw)
 
         assert self.deployer.link_status_func(link) == EntityStatus.DOWN
         assert self.deployer.interface_status_func(interface_1) != EntityStatus.DOWN
@@ -468,3 +473,340 @@ class TestDeployer:
         assert self.deployer.interface_status_reason_func(interface_2) == set()
         assert self.deployer.switch_status_reason_func(switch_1) == set()
         assert self.deployer.switch_status_reason_func(switch_2) == set()
+
+        # No active maintenances again
+        self.deployer.end_mw(link_mw)
+
+        assert self.deployer.effective_switches == set()
+        assert self.deployer.effective_interfaces == set()
+        assert self.deployer.effective_links == set()
+        assert self.deployer.link_status_func(link) != EntityStatus.DOWN
+
+    def test_simulate_mw(self):
+        """Test simulating a maintenance window leaves counters untouched."""
+        buffer_put_mock = MagicMock()
+        self.controller.buffers.app.put = buffer_put_mock
+        running = self.maintenance.copy(
+            update = {
+                'switches': ['01:23:45:67:89:ab:cd:ef'],
+                'interfaces': [],
+                'links': [],
+            }
+        )
+        self.deployer.start_mw(running)
+        buffer_put_mock.reset_mock()
+
+        simulated = self.maintenance.copy(
+            update = {
+                'switches': ['01:23:45:67:89:ab:cd:ef'],
+                'interfaces': ['01:23:45:67:66:ab:cd:ef:1'],
+                'links': [],
+            }
+        )
+        report = self.deployer.simulate_mw(simulated)
+        assert report == {
+            'switches': ['01:23:45:67:89:ab:cd:ef'],
+            'interfaces': [
+                '01:23:45:67:66:ab:cd:ef:1',
+                '01:23:45:67:89:ab:cd:ef:0',
+                '01:23:45:67:89:ab:cd:ef:1',
+                '01:23:45:67:89:ab:cd:ef:2',
+            ],
+            'links': ['link_1', 'link_2', 'link_3'],
+        }
+        buffer_put_mock.assert_not_called()
+        assert self.deployer.maintenance_switches == Counter(
+            {'01:23:45:67:89:ab:cd:ef': 1}
+        )
+        assert self.deployer.maintenance_interfaces == Counter()
+        assert self.deployer.link_status_func(self.link_3) != EntityStatus.DOWN
+
+    def test_switch_closure_cache(self):
+        """Test the switch closure is cached until invalidated."""
+        switch = self.controller.switches['01:23:45:67:66:ab:cd:ef']
+        interfaces, links = self.deployer._get_switch_closure(switch)
+        assert len(interfaces) == 3
+        assert sorted(links) == ['link_2', 'link_3']
+        assert links['link_3'] == (
+            '01:23:45:67:66:ab:cd:ef:1',
+            '01:23:45:67:66:ab:cd:ef',
+            '01:23:45:67:66:ab:cd:ef:2',
+            '01:23:45:67:66:ab:cd:ef',
+        )
+
+        new_interface = MagicMock(
+            id = '01:23:45:67:66:ab:cd:ef:3',
+            switch = switch,
+            link = None,
+        )
+        switch.interfaces[3] = new_interface
+        interfaces, _ = self.deployer._get_switch_closure(switch)
+        assert new_interface.id not in interfaces
+
+        self.deployer.invalidate_closures([switch.id])
+        interfaces, _ = self.deployer._get_switch_closure(switch)
+        assert new_interface.id in interfaces
+
+        self.deployer.invalidate_closures()
+        assert not self.deployer.switch_closures
+
+    def test_link_removed_during_window(self):
+        """Test a link removed while its switch is under maintenance is
+        not left under maintenance once it comes back."""
+        self.controller.buffers.app.put = MagicMock()
+        switch_1 = self.controller.switches['01:23:45:67:89:ab:cd:ef']
+        switch_2 = self.controller.switches['01:23:45:67:65:ab:cd:ef']
+        self.deployer.start_mw(self.maintenance)
+        assert self.deployer.link_status_func(self.link_1) == EntityStatus.DOWN
+
+        del self.controller.links['link_1']
+        switch_1.interfaces[0].link = None
+        switch_2.interfaces[0].link = None
+        self.deployer.refresh_topology([switch_1.id, switch_2.id])
+        assert 'link_1' not in self.deployer.effective_links
+
+        self.deployer.end_mw(self.maintenance)
+        self.controller.links['link_1'] = self.link_1
+        switch_1.interfaces[0].link = self.link_1
+        switch_2.interfaces[0].link = self.link_1
+        self.deployer.refresh_topology([switch_1.id, switch_2.id])
+        assert self.deployer.link_status_func(self.link_1) == EntityStatus.UP
+        assert self.deployer.link_status_reason_func(self.link_1) == frozenset()
+        assert self.deployer.snapshot == MaintenanceSnapshot()
+
+    def test_link_back_during_window(self):
+        """Test a maintained link removed and added back while its window
+        runs is under maintenance again."""
+        self.controller.buffers.app.put = MagicMock()
+        maintenance = self.maintenance.model_copy(
+            update={'switches': [], 'links': ['link_3']}
+        )
+        self.deployer.start_mw(maintenance)
+        del self.controller.links['link_3']
+        self.deployer.refresh_topology()
+        assert self.deployer.snapshot == MaintenanceSnapshot()
+
+        self.controller.links['link_3'] = self.link_3
+        self.deployer.refresh_topology()
+        assert self.deployer.link_status_func(self.link_3) == EntityStatus.DOWN
+        self.deployer.end_mw(maintenance)
+        assert self.deployer.link_status_func(self.link_3) == EntityStatus.UP
+
+    def test_devices_added_during_window(self):
+        """Test interfaces and links added to a switch under maintenance
+        are under maintenance until the window ends."""
+        self.controller.buffers.app.put = MagicMock()
+        switch = self.controller.switches['01:23:45:67:66:ab:cd:ef']
+        other_switch = self.controller.switches['01:23:45:67:89:ab:cd:ef']
+        maintenance = self.maintenance.model_copy(
+            update={'switches': [switch.id]}
+        )
+        self.deployer.start_mw(maintenance)
+
+        new_interface = MagicMock(
+            id = '01:23:45:67:66:ab:cd:ef:3',
+            switch = switch,
+        )
+        new_link = MagicMock(
+            id = 'link_4',
+            endpoint_a = new_interface,
+            endpoint_b = other_switch.interfaces[2],
+        )
+        new_interface.link = new_link
+        other_switch.interfaces[2].link = new_link
+        switch.interfaces[3] = new_interface
+        self.controller.links['link_4'] = new_link
+        assert self.deployer.interface_status_func(new_interface) == EntityStatus.UP
+
+        self.deployer.refresh_topology([switch.id, other_switch.id])
+        assert self.deployer.interface_status_func(new_interface) == EntityStatus.DOWN
+        assert self.deployer.link_status_func(new_link) == EntityStatus.DOWN
+        assert self.deployer.interface_status_func(
+            other_switch.interfaces[2]
+        ) == EntityStatus.UP
+
+        self.deployer.end_mw(maintenance)
+        assert self.deployer.interface_status_func(new_interface) == EntityStatus.UP
+        assert self.deployer.link_status_func(new_link) == EntityStatus.UP
+        assert self.deployer.snapshot == MaintenanceSnapshot()
+
+    def test_end_mws(self):
+        """Test ending many maintenance windows emits a single event."""
+        buffer_put_mock = MagicMock()
+        self.controller.buffers.app.put = buffer_put_mock
+        window_1 = self.maintenance.copy(
+            update = {
+                'id': 'window 1',
+                'switches': [],
+                'interfaces': ['01:23:45:67:65:ab:cd:ef:1'],
+                'links': [],
+            }
+        )
+        window_2 = self.maintenance.copy(
+            update = {
+                'id': 'window 2',
+                'switches': [],
+                'interfaces': [],
+                'links': ['link_3'],
+            }
+        )
+        self.deployer.start_mws([window_1, window_2])
+        assert buffer_put_mock.call_count == 1
+        event = buffer_put_mock.call_args[0][0]
+        assert event.name == 'topology.interruption.start'
+        assert sorted(event.content['interfaces']) == ['01:23:45:67:65:ab:cd:ef:1']
+        assert sorted(event.content['links']) == ['link_3']
+        buffer_put_mock.reset_mock()
+
+        self.deployer.end_mws([window_1, window_2])
+        assert buffer_put_mock.call_count == 1
+        event = buffer_put_mock.call_args[0][0]
+        assert event.name == 'topology.interruption.end'
+        assert sorted(event.content['interfaces']) == ['01:23:45:67:65:ab:cd:ef:1']
+        assert sorted(event.content['links']) == ['link_3']
+        assert not self.deployer.effective_interfaces
+        assert not self.deployer.effective_links
+        assert not list(self.deployer.maintenance_interfaces)
+        assert not list(self.deployer.maintenance_links)
+
+        self.deployer.end_mws([])
+        assert buffer_put_mock.call_count == 1
+
+    def test_coalesced_events(self):
+        """Test events created within the delay are merged."""
+        buffer_put_mock = MagicMock()
+        self.controller.buffers.app.put = buffer_put_mock
+        self.deployer.event_delay = 60
+        window_1 = self.maintenance.copy(
+            update = {
+                'id': 'window 1',
+                'switches': [],
+                'interfaces': ['01:23:45:67:65:ab:cd:ef:1'],
+                'links': [],
+            }
+        )
+        window_2 = self.maintenance.copy(
+            update = {
+                'id': 'window 2',
+                'switches': [],
+                'interfaces': ['01:23:45:67:65:ab:cd:ef:2'],
+                'links': [],
+            }
+        )
+        window_3 = self.maintenance.copy(
+            update = {
+                'id': 'window 3',
+                'switches': [],
+                'interfaces': [],
+                'links': ['link_3'],
+            }
+        )
+        self.deployer.start_mw(window_1)
+        self.deployer.start_mw(window_2)
+        self.deployer.start_mw(window_3)
+        self.deployer.end_mw(window_3)
+        buffer_put_mock.assert_not_called()
+        assert self.deployer.event_timer is not None
+
+        self.deployer.flush_events()
+        assert self.deployer.event_timer is None
+        assert buffer_put_mock.call_count == 1
+        event = buffer_put_mock.call_args[0][0]
+        assert event.name == 'topology.interruption.start'
+        assert event.content == {
+            'type': 'maintenance',
+            'switches': [],
+            'interfaces': [
+                '01:23:45:67:65:ab:cd:ef:1',
+                '01:23:45:67:65:ab:cd:ef:2',
+            ],
+            'links': [],
+        }
+        assert self.deployer.merged_events == Counter({'start': 2, 'end': 1})
+        assert self.deployer.effective_interfaces == {
+            '01:23:45:67:65:ab:cd:ef:1',
+            '01:23:45:67:65:ab:cd:ef:2',
+        }
+
+        self.deployer.flush_events()
+        assert buffer_put_mock.call_count == 1
+
+    def test_snapshot(self):
+        """Test snapshots are replaced instead of modified."""
+        snapshot = self.deployer.snapshot
+        self.controller.buffers.app.put = MagicMock()
+        self.deployer.start_mw(self.maintenance)
+        assert snapshot == MaintenanceSnapshot()
+        assert self.deployer.snapshot.switches == {'01:23:45:67:89:ab:cd:ef'}
+        assert self.deployer.effective_switches is self.deployer.snapshot.switches
+
+    def test_metrics(self):
+        """Test expansions and status function calls are measured."""
+        metrics.clear()
+        self.controller.buffers.app.put = MagicMock()
+        switch = MagicMock(id='01:23:45:67:89:ab:cd:ef', interfaces={})
+        self.controller.switches = {switch.id: switch}
+        self.deployer.start_mw(self.maintenance)
+        assert metrics.EXPANSION_LATENCY.get() == 1
+        assert metrics.EXPANSION_SIZE.get_sum() == 1
+        self.deployer.switch_status_func(switch)
+        self.deployer.switch_status_reason_func(switch)
+        assert metrics.STATUS_FUNC_CALLS.get(kind='switch') == 1
+        assert metrics.STATUS_FUNC_CALLS.get(kind='switch_reason') == 1
+
+    def test_concurrent_start_and_end(self):
+        """Test readers always see consistent snapshots while windows start
+        and end concurrently."""
+        self.controller.buffers.app.put = MagicMock()
+        closures = {
+            switch_id: (
+                {interface.id for interface in switch.interfaces.values()},
+                {
+                    interface.link.id
+                    for interface in switch.interfaces.values()
+                    if interface.link is not None
+                },
+            )
+            for switch_id, switch in self.controller.switches.items()
+        }
+        done = Event()
+        errors = []
+
+        def write(seed):
+            rng = random.Random(seed)
+            try:
+                for number in range(300):
+                    window = self.maintenance.model_copy(
+                        update={
+                            'id': f'{seed} {number}',
+                            'switches': [rng.choice(list(closures))],
+                        }
+                    )
+                    self.deployer.start_mw(window)
+                    self.deployer.end_mw(window)
+            except Exception as err:  # pylint: disable=broad-except
+                errors.append(err)
+
+        def read():
+            while not done.is_set():
+                snapshot = self.deployer.snapshot
+                for switch_id in snapshot.switches:
+                    interface_ids, link_ids = closures[switch_id]
+                    if not interface_ids <= snapshot.interfaces:
+                        errors.append(f'Torn interfaces of {switch_id}')
+                    if not link_ids <= snapshot.links:
+                        errors.append(f'Torn links of {switch_id}')
+
+        writers = [Thread(target=write, args=(seed,)) for seed in range(4)]
+        readers = [Thread(target=read) for _ in range(2)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        assert not errors
+        assert self.deployer.snapshot == MaintenanceSnapshot()
+        assert not list(self.deployer.maintenance_switches)
@@ -0,0 +1,216 @@
+"""Tests for the overlap module."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytz
+
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.managers.overlap import IntervalTree, OverlapIndex
+
+
+class TestIntervalTree:
+    """Test of the IntervalTree class."""
+
+    def setup_method(self):
+        self.base = datetime(2030, 1, 1, tzinfo=pytz.utc)
+        self.tree = IntervalTree()
+
+    def minutes(self, value):
+        return self.base + timedelta(minutes=value)
+
+    def test_overlapping(self):
+        """Test intervals overlap only when they share some time."""
+        self.tree.insert('a', self.minutes(0), self.minutes(10), 'a')
+        self.tree.insert('b', self.minutes(10), self.minutes(20), 'b')
+        self.tree.insert('c', self.minutes(5), self.minutes(30), 'c')
+
+        assert sorted(self.tree.overlapping(self.minutes(0), self.minutes(5))) == ['a']
+        assert sorted(
+            self.tree.overlapping(self.minutes(9), self.minutes(10))
+        ) == ['a', 'c']
+        assert sorted(
+            self.tree.overlapping(self.minutes(10), self.minutes(11))
+        ) == ['b', 'c']
+        assert self.tree.overlapping(self.minutes(30), self.minutes(40)) == []
+
+    def test_insert_replaces(self):
+        """Test inserting an existing id replaces its interval."""
+        self.tree.insert('a', self.minutes(0), self.minutes(10), 'a')
+        self.tree.insert('a', self.minutes(20), self.minutes(30), 'a')
+        assert len(self.tree) == 1
+        assert self.tree.overlapping(self.minutes(0), self.minutes(10)) == []
+        assert self.tree.overlapping(self.minutes(25), self.minutes(26)) == ['a']
+
+    def test_random_operations(self):
+        """Test the tree against a brute force reference."""
+        rng = random.Random(0)
+        reference = {}
+        for _ in range(5000):
+            item_id = rng.randrange(200)
+            start = rng.randrange(1000)
+            end = start + rng.randrange(1, 100)
+            operation = rng.random()
+            if operation < 0.5:
+                self.tree.insert(
+                    item_id, self.minutes(start), self.minutes(end), item_id
+                )
+                reference[item_id] = (start, end)
+            elif operation < 0.7:
+                assert self.tree.remove(item_id) == (item_id in reference)
+                reference.pop(item_id, None)
+            else:
+                result = self.tree.overlapping(
+                    self.minutes(start), self.minutes(end)
+                )
+                expected = [
+                    other_id
+                    for other_id, (other_start, other_end) in reference.items()
+                    if other_start < end and other_end > start
+                ]
+                assert sorted(result) == sorted(expected)
+        assert len(self.tree) == len(reference)
+
+    def test_insert_many(self):
+        """Test building a tree at once matches inserting one by one."""
+        rng = random.Random(0)
+        items = []
+        for item_id in range(500):
+            start = rng.randrange(1000)
+            end = start + rng.randrange(1, 100)
+            items.append(
+                (item_id, self.minutes(start), self.minutes(end), item_id)
+            )
+        self.tree.insert_many(items)
+        reference = IntervalTree()
+        for item in items:
+            reference.insert(*item)
+        assert len(self.tree) == 500
+        for start in range(0, 1100, 10):
+            assert sorted(
+                self.tree.overlapping(self.minutes(start), self.minutes(start + 5))
+            ) == sorted(
+                reference.overlapping(self.minutes(start), self.minutes(start + 5))
+            )
+
+        self.tree.insert_many([(0, self.minutes(2000), self.minutes(2001), 0)])
+        assert len(self.tree) == 500
+        assert self.tree.overlapping(self.minutes(2000), self.minutes(2001)) == [0]
+        assert self.tree.remove(1)
+        assert len(self.tree) == 499
+
+
+class TestOverlapIndex:
+    """Test of the OverlapIndex class."""
+
+    def setup_method(self):
+        self.start = datetime.now(pytz.utc) + timedelta(days=1)
+        self.index = OverlapIndex()
+        self.window_1 = MW.model_construct(
+            id='window 1',
+            start=self.start,
+            end=self.start + timedelta(hours=2),
+            switches=['00:00:00:00:00:00:00:01'],
+            interfaces=[],
+            links=[],
+        )
+        self.window_2 = MW.model_construct(
+            id='window 2',
+            start=self.start + timedelta(hours=1),
+            end=self.start + timedelta(hours=3),
+            switches=[],
+            interfaces=['00:00:00:00:00:00:00:02:1'],
+            links=['link 1'],
+        )
+        self.index.add(self.window_1)
+        self.index.add(self.window_2)
+
+    def test_overlapping(self):
+        """Test getting overlapping windows with and without force."""
+        window = MW.model_construct(
+            id='new window',
+            start=self.start + timedelta(minutes=30),
+            end=self.start + timedelta(hours=4),
+            switches=[],
+            interfaces=[],
+            links=['link 1'],
+        )
+        assert self.index.overlapping(window) == [self.window_1, self.window_2]
+        assert self.index.overlapping(window, force=True) == [self.window_2]
+
+        later_window = window.copy(
+            update={
+                'start': self.start + timedelta(hours=3),
+                'end': self.start + timedelta(hours=4),
+            }
+        )
+        assert self.index.overlapping(later_window) == []
+
+    def test_overlapping_recurring(self):
+        """Test recurring windows overlap when any occurrences do."""
+        weekly = self.window_1.copy(
+            update={
+                'id': 'weekly',
+                'start': self.start + timedelta(days=1),
+                'end': self.start + timedelta(days=1, hours=2),
+                'recurrence': 'FREQ=WEEKLY',
+            }
+        )
+        assert self.index.overlapping(weekly) == []
+        self.index.add(weekly)
+        later = self.window_1.copy(
+            update={
+                'id': 'later',
+                'start': self.start + timedelta(weeks=50, days=1, hours=1),
+                'end': self.start + timedelta(weeks=50, days=1, hours=3),
+            }
+        )
+        assert self.index.overlapping(later) == [weekly]
+        assert self.index.overlapping(
+            later.copy(update={'end': self.start + timedelta(weeks=50, days=2)})
+        ) == [weekly]
+        assert self.index.overlapping(
+            later.copy(
+                update={'start': self.start + timedelta(weeks=50, days=1, hours=2)}
+            )
+        ) == []
+
+    def test_add_and_remove(self):
+        """Test updating and removing windows from the index."""
+        moved_window = self.window_2.copy(
+            update={
+                'start': self.start + timedelta(days=1),
+                'end': self.start + timedelta(days=1, hours=1),
+                'links': [],
+            }
+        )
+        self.index.add(moved_window)
+        assert len(self.index) == 2
+        assert ('links', 'link 1') not in self.index.assets
+        assert self.index.overlapping(self.window_1) == [self.window_1]
+
+        self.index.remove('window 1')
+        self.index.remove('unknown window')
+        assert self.index.overlapping(self.window_1) == []
+        assert ('switches', '00:00:00:00:00:00:00:01') not in self.index.assets
+
+        self.index.clear()
+        assert len(self.index) == 0
+
+    def test_add_many(self):
+        """Test adding many windows at once."""
+        index = OverlapIndex()
+        index.add_many([self.window_1, self.window_2, self.window_1])
+        assert len(index) == 2
+        assert index.overlapping(self.window_2) == [self.window_1, self.window_2]
+        assert index.overlapping(self.window_2, force=True) == [self.window_2]
+
+        moved_window = self.window_2.copy(
+            update={
+                'start': self.start + timedelta(days=1),
+                'end': self.start + timedelta(days=1, hours=1),
+            }
+        )
+        index.add_many([moved_window])
+        assert len(index) == 2
+        assert index.overlapping(self.window_1) == [self.window_1]
@@ -1,14 +1,21 @@
 """Tests for the scheduler module."""
 
-from unittest.mock import  MagicMock, call
+from unittest.mock import  AsyncMock, MagicMock, call
 
 from apscheduler.jobstores.base import JobLookupError
 from apscheduler.triggers.date import DateTrigger
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timedelta
+import threading
+import pytest
 import pytz
 
 
-from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance import metrics, settings
+from napps.kytos.maintenance.controllers import AsyncMaintenanceController
+from napps.kytos.maintenance.models import MaintenanceWindow as MW, OverlapError
+from napps.kytos.maintenance.managers.batch import BatchScheduler
+from napps.kytos.maintenance.managers.timer import TimerQueue
 from napps.kytos.maintenance.managers.scheduler import (
     MaintenanceScheduler as Scheduler,
     MaintenanceStart,
@@ -71,7 +78,33 @@ class TestScheduler:
         resultant_schedule_calls = self.task_scheduler.add_job.call_args_list
         assert resultant_schedule_calls == expected_schedule_calls
 
-        self.maintenance_deployer.start_mw.assert_called_once_with(running_window)
+        self.maintenance_deployer.start_mws.assert_called_once_with(
+            [running_window]
+        )
+        self.maintenance_deployer.start_mw.assert_not_called()
+        self.db_controller.prepare_start.assert_called_once_with()
+
+    def test_start_recurring(self):
+        """Test recurring windows are moved to their current occurrence."""
+        missed_window = self.window.copy(
+            update={
+                'id': 'missed window',
+                'status': 'pending',
+                'start': self.now - timedelta(days=2, minutes=30),
+                'end': self.now - timedelta(days=2) + timedelta(minutes=30),
+                'recurrence': 'FREQ=DAILY',
+            }
+        )
+        self.db_controller.get_unfinished_windows.return_value = [
+            missed_window,
+            self.window.copy(update={'recurrence': 'FREQ=DAILY'}),
+        ]
+        self.scheduler.start()
+        (moved,), _ = self.db_controller.update_windows.call_args
+        assert [window.id for window in moved] == ['missed window']
+        assert moved[0].occurrence == 2
+        assert moved[0].status == 'running'
+        self.maintenance_deployer.start_mws.assert_called_once_with(moved)
 
     def test_shutdown(self):
         pending_window = self.window.copy(
@@ -112,6 +145,19 @@ class TestScheduler:
 
         self.maintenance_deployer.end_mw.assert_called_once_with(running_window)
 
+    def test_shutdown_async_client(self):
+        """Test shutting down closes the asyncio DB client."""
+        self.db_controller.get_windows.return_value = []
+        async_db_controller = MagicMock(spec=AsyncMaintenanceController)
+        scheduler = Scheduler(
+            self.maintenance_deployer,
+            self.db_controller,
+            self.task_scheduler,
+            async_db_controller=async_db_controller,
+        )
+        scheduler.shutdown()
+        async_db_controller.close.assert_called_once_with()
+
     def test_update(self):
         pending_window = self.window.copy(
             update={'id': 'pending window', 'status': 'pending'}
@@ -146,6 +192,35 @@ class TestScheduler:
         self.scheduler.update(running_window)
         self.scheduler.update(finished_window)
 
+    def test_update_finished(self):
+        """Test updating a finished window leaves it out of the overlap
+        index, so it does not interfere with new windows."""
+        finished_window = self.window.copy(
+            update={
+                'id': 'finished window',
+                'status': 'finished',
+                'switches': ['00:00:00:00:00:00:00:01'],
+            }
+        )
+        self.scheduler.overlap_index.add(
+            finished_window.copy(update={'status': 'running'})
+        )
+        self.db_controller.update_window.return_value = finished_window
+        self.scheduler.update(finished_window)
+        assert len(self.scheduler.overlap_index) == 0
+
+        self.scheduler.update_many([finished_window])
+        assert len(self.scheduler.overlap_index) == 0
+
+        new_window = self.window.copy(
+            update={
+                'id': 'new window',
+                'switches': ['00:00:00:00:00:00:00:02'],
+            }
+        )
+        self.scheduler.add(new_window)
+        self.db_controller.insert_window.assert_called_once_with(new_window)
+
     def test_maintenance_start(self):
 
         pending_window = self.window.copy(
@@ -180,3 +255,586 @@ class TestScheduler:
         end = MaintenanceEnd(self.scheduler, running_window.id)
         end()
         self.maintenance_deployer.end_mw.assert_called_once_with(next_window)
+
+    def test_maintenance_end_recurring(self):
+        """Test ending a recurring window schedules its next occurrence."""
+        finished_window = self.window.copy(
+            update={'status': 'finished', 'recurrence': 'FREQ=WEEKLY;COUNT=2'}
+        )
+        next_window = finished_window.next_occurrence()
+        self.db_controller.end_window.return_value = finished_window
+        MaintenanceEnd(self.scheduler, finished_window.id)()
+        self.maintenance_deployer.end_mw.assert_called_once_with(finished_window)
+        self.db_controller.update_windows.assert_called_once_with([next_window])
+        self.task_scheduler.add_job.assert_called_once_with(
+            MaintenanceStart(self.scheduler, next_window.id),
+            'date',
+            id=f'{next_window.id}-start',
+            run_date=next_window.start,
+        )
+        assert self.scheduler.overlap_index.windows == {
+            next_window.id: next_window
+        }
+
+        self.db_controller.end_window.return_value = next_window
+        MaintenanceEnd(self.scheduler, next_window.id)()
+        self.db_controller.update_windows.assert_called_once()
+        assert len(self.scheduler.overlap_index) == 0
+
+    def test_add_overlapping(self):
+        overlapping_window = self.window.copy(
+            update={
+                'id': 'overlapping window',
+                'status': 'pending',
+                'switches': ['00:00:00:00:00:00:00:01'],
+            }
+        )
+        other_window = self.window.copy(
+            update={
+                'id': 'other window',
+                'status': 'pending',
+                'switches': ['00:00:00:00:00:00:00:02'],
+            }
+        )
+        self.scheduler.overlap_index.add(overlapping_window)
+        self.scheduler.overlap_index.add(other_window)
+        new_window = self.window.copy(
+            update={
+                'id': 'new window',
+                'start': self.window.start + timedelta(minutes=30),
+                'end': self.window.end + timedelta(minutes=30),
+                'switches': ['00:00:00:00:00:00:00:01'],
+            }
+        )
+
+        with pytest.raises(OverlapError) as exc_info:
+            self.scheduler.add(new_window, force=True)
+        assert list(exc_info.value.interfering) == [overlapping_window]
+
+        with pytest.raises(OverlapError) as exc_info:
+            self.scheduler.add(new_window)
+        assert list(exc_info.value.interfering) == [
+            other_window,
+            overlapping_window,
+        ]
+
+        self.db_controller.check_overlap.assert_not_called()
+        self.db_controller.insert_window.assert_not_called()
+        self.task_scheduler.add_job.assert_not_called()
+
+    def test_overlap_index(self):
+        pending_window = self.window.copy(
+            update={'id': 'pending window', 'status': 'pending'}
+        )
+        running_window = self.window.copy(
+            update={'id': 'running window', 'status': 'running'}
+        )
+        finished_window = self.window.copy(
+            update={'id': 'finished window', 'status': 'finished'}
+        )
+        self.db_controller.get_unfinished_windows.return_value = [
+            pending_window,
+            running_window,
+            finished_window,
+        ]
+        self.scheduler.start()
+        assert set(self.scheduler.overlap_index.windows) == {
+            'pending window', 'running window',
+        }
+
+        new_window = self.window.copy(update={'id': 'new window'})
+        self.scheduler.add(new_window, force=True)
+        assert 'new window' in self.scheduler.overlap_index.windows
+        self.db_controller.insert_window.assert_called_once_with(new_window)
+
+        self.db_controller.get_window.return_value = new_window
+        self.scheduler.remove('new window')
+        assert 'new window' not in self.scheduler.overlap_index.windows
+
+        self.db_controller.end_window.return_value = running_window.copy(
+            update={'status': 'finished'}
+        )
+        self.scheduler.end_maintenance('running window')
+        assert set(self.scheduler.overlap_index.windows) == {'pending window'}
+
+    def test_add_many(self):
+        existing_window = self.window.copy(
+            update={'id': 'existing window', 'switches': ['00:00:00:00:00:00:00:01']}
+        )
+        self.scheduler.overlap_index.add(existing_window)
+        later = timedelta(hours=5)
+        windows = [
+            self.window.copy(
+                update={'id': 'window 1', 'switches': ['00:00:00:00:00:00:00:02']}
+            ),
+            self.window.copy(
+                update={'id': 'window 2', 'switches': ['00:00:00:00:00:00:00:01']}
+            ),
+            self.window.copy(
+                update={'id': 'window 3', 'switches': ['00:00:00:00:00:00:00:02']}
+            ),
+            self.window.copy(
+                update={
+                    'id': 'window 1',
+                    'start': self.window.start + later,
+                    'end': self.window.end + later,
+                }
+            ),
+            self.window.copy(
+                update={
+                    'id': 'window 4',
+                    'start': self.window.start + later,
+                    'end': self.window.end + later,
+                }
+            ),
+        ]
+        self.db_controller.insert_windows.return_value = ['window 4']
+
+        errors = self.scheduler.add_many(windows, force=True)
+
+        assert set(errors) == {1, 2, 3, 4}
+        assert isinstance(errors[1], OverlapError)
+        assert list(errors[1].interfering) == [existing_window]
+        assert isinstance(errors[2], OverlapError)
+        assert list(errors[2].interfering) == [windows[0]]
+        assert isinstance(errors[3], DuplicateKeyError)
+        assert isinstance(errors[4], DuplicateKeyError)
+        self.db_controller.insert_windows.assert_called_once_with(
+            [windows[0], windows[4]]
+        )
+        self.db_controller.remove_windows.assert_not_called()
+        assert 'window 1' in self.scheduler.overlap_index.windows
+        assert 'window 4' not in self.scheduler.overlap_index.windows
+        self.task_scheduler.add_job.assert_called_once_with(
+            MaintenanceStart(self.scheduler, 'window 1'),
+            'date',
+            id='window 1-start',
+            run_date=windows[0].start,
+        )
+
+    def test_add_many_atomic(self):
+        windows = [
+            self.window.copy(update={'id': 'window 1'}),
+            self.window.copy(
+                update={
+                    'id': 'window 2',
+                    'start': self.window.start + timedelta(hours=5),
+                    'end': self.window.end + timedelta(hours=5),
+                }
+            ),
+        ]
+        self.db_controller.insert_windows.return_value = ['window 2']
+
+        errors = self.scheduler.add_many(windows, atomic=True)
+
+        assert list(errors) == [1]
+        self.db_controller.remove_windows.assert_called_once_with(['window 1'])
+        assert len(self.scheduler.overlap_index) == 0
+        self.task_scheduler.add_job.assert_not_called()
+
+        self.db_controller.insert_windows.reset_mock()
+        errors = self.scheduler.add_many([windows[0], windows[0]], atomic=True)
+        assert list(errors) == [1]
+        self.db_controller.insert_windows.assert_not_called()
+
+    def test_end_maintenances_early(self):
+        running_window = self.window.copy(
+            update={'id': 'running window', 'status': 'running'}
+        )
+        other_window = self.window.copy(
+            update={'id': 'other window', 'status': 'running'}
+        )
+        self.scheduler.overlap_index.add(running_window)
+        self.scheduler.overlap_index.add(other_window)
+        self.task_scheduler.remove_job.side_effect = [
+            JobLookupError('running window-start'),
+            None,
+            JobLookupError('other window-start'),
+            None,
+        ]
+
+        self.scheduler.end_maintenances_early([running_window, other_window])
+
+        self.db_controller.end_windows.assert_called_once_with(
+            ['running window', 'other window']
+        )
+        assert len(self.scheduler.overlap_index) == 0
+        self.maintenance_deployer.end_mws.assert_called_once_with(
+            [running_window, other_window]
+        )
+        self.maintenance_deployer.end_mw.assert_not_called()
+
+    def test_remove_many(self):
+        pending_window = self.window.copy(
+            update={'id': 'pending window', 'status': 'pending'}
+        )
+        running_window = self.window.copy(
+            update={'id': 'running window', 'status': 'running'}
+        )
+
+        def side_effect(job_id):
+            if job_id in {'pending window-end', 'running window-start'}:
+                raise JobLookupError(job_id)
+
+        self.task_scheduler.remove_job.side_effect = side_effect
+
+        self.scheduler.remove_many([pending_window, running_window])
+
+        self.maintenance_deployer.end_mws.assert_called_once_with(
+            [running_window]
+        )
+        self.db_controller.remove_windows.assert_called_once_with(
+            ['pending window', 'running window']
+        )
+
+    def test_update_many(self):
+        windows = [
+            self.window.copy(update={'id': 'window 1'}),
+            self.window.copy(update={'id': 'window 2'}),
+        ]
+        self.scheduler.update_many(windows)
+        self.db_controller.update_windows.assert_called_once_with(windows)
+        assert set(self.scheduler.overlap_index.windows) == {'window 1', 'window 2'}
+        assert self.task_scheduler.add_job.call_count == 4
+        self.db_controller.update_window.assert_not_called()
+
+    def test_maintenance_batches(self):
+        pending_window = self.window.copy(
+            update={'id': 'pending window', 'status': 'pending'}
+        )
+        running_window = self.window.copy(
+            update={'id': 'pending window', 'status': 'running'}
+        )
+        self.db_controller.get_windows.return_value = [running_window]
+
+        MaintenanceStart.run_batch([
+            MaintenanceStart(self.scheduler, 'pending window'),
+        ])
+        self.db_controller.start_windows.assert_called_once_with(
+            ['pending window']
+        )
+        self.maintenance_deployer.start_mws.assert_called_once_with(
+            [running_window]
+        )
+        self.task_scheduler.add_job.assert_called_once_with(
+            MaintenanceEnd(self.scheduler, 'pending window'),
+            'date',
+            id='pending window-end',
+            run_date=pending_window.end,
+        )
+        assert 'pending window' in self.scheduler.overlap_index.windows
+
+        MaintenanceEnd.run_batch([
+            MaintenanceEnd(self.scheduler, 'pending window'),
+        ])
+        self.db_controller.end_windows.assert_called_once_with(
+            ['pending window']
+        )
+        self.maintenance_deployer.end_mws.assert_called_once_with(
+            [running_window]
+        )
+        assert len(self.scheduler.overlap_index) == 0
+
+    def test_job_lag(self):
+        """Test the lag of the jobs is observed."""
+        metrics.JOB_LAG.clear()
+        self.db_controller.get_windows.return_value = []
+        run_at = self.now - timedelta(seconds=5)
+        MaintenanceStart(self.scheduler, 'window', run_at)()
+        MaintenanceEnd.run_batch([
+            MaintenanceEnd(self.scheduler, 'window 1', run_at),
+            MaintenanceEnd(self.scheduler, 'window 2', run_at),
+        ])
+        assert metrics.JOB_LAG.get(job='start') == 1
+        assert metrics.JOB_LAG.get(job='end') == 2
+        assert metrics.JOB_LAG.get_sum(job='start') >= 5
+        assert MaintenanceStart(self.scheduler, 'window', run_at) == (
+            MaintenanceStart(self.scheduler, 'window')
+        )
+
+    @pytest.mark.parametrize(
+        'policy,expected',
+        [
+            ('run', ['on time', 'late', 'ended']),
+            ('coalesce', ['on time', 'late']),
+            ('skip', ['on time']),
+        ],
+    )
+    def test_misfire_policy(self, policy, expected, monkeypatch):
+        """Test misfired starts are run or skipped as configured."""
+        monkeypatch.setattr(settings, 'MISFIRE_POLICY', policy)
+        monkeypatch.setattr(settings, 'MISFIRE_GRACE_TIME', 1)
+        metrics.JOB_MISFIRES.clear()
+        ended_window = self.window.copy(
+            update={'id': 'ended', 'end': self.now - timedelta(minutes=1)}
+        )
+        self.scheduler.window_cache.put(self.window.copy(update={'id': 'late'}))
+        self.scheduler.window_cache.put(ended_window)
+        self.scheduler.overlap_index.add(ended_window)
+        self.db_controller.get_windows.return_value = []
+        late = self.now - timedelta(minutes=5)
+        MaintenanceStart.run_batch([
+            MaintenanceStart(self.scheduler, 'on time', self.now),
+            MaintenanceStart(self.scheduler, 'late', late),
+            MaintenanceStart(self.scheduler, 'ended', late),
+        ])
+        self.db_controller.start_windows.assert_called_once_with(expected)
+        skipped = 3 - len(expected)
+        assert metrics.JOB_MISFIRES.get(job='start', action='skip') == skipped
+        if skipped:
+            self.db_controller.end_windows.assert_called_once()
+            assert 'ended' not in self.scheduler.overlap_index.windows
+            assert self.scheduler.window_cache.get('ended') is None
+
+        self.db_controller.end_windows.reset_mock()
+        self.db_controller.end_window.return_value = self.window
+        MaintenanceEnd(self.scheduler, 'late', late)()
+        self.db_controller.end_window.assert_called_once_with('late')
+        assert metrics.JOB_MISFIRES.get(job='end', action='run') == 1
+
+    def test_misfire_recurring(self, monkeypatch):
+        """Test a skipped recurring window moves to its next occurrence."""
+        monkeypatch.setattr(settings, 'MISFIRE_POLICY', 'skip')
+        monkeypatch.setattr(settings, 'MISFIRE_GRACE_TIME', 1)
+        late_window = self.window.copy(
+            update={'id': 'late', 'recurrence': 'FREQ=DAILY;COUNT=3'}
+        )
+        next_window = late_window.next_occurrence()
+        self.scheduler.overlap_index.add(late_window)
+        self.db_controller.get_windows.return_value = [late_window]
+        late = self.now - timedelta(minutes=5)
+        MaintenanceStart.run_batch([
+            MaintenanceStart(self.scheduler, 'late', late),
+        ])
+        self.db_controller.start_windows.assert_not_called()
+        self.db_controller.end_windows.assert_called_once_with(['late'])
+        self.db_controller.update_windows.assert_called_once_with([next_window])
+        self.task_scheduler.add_job.assert_called_once_with(
+            MaintenanceStart(self.scheduler, next_window.id),
+            'date',
+            id=f'{next_window.id}-start',
+            run_date=next_window.start,
+        )
+        assert self.scheduler.overlap_index.windows == {
+            next_window.id: next_window
+        }
+
+    @pytest.mark.parametrize(
+        'engine,executor,batch,expected',
+        [
+            ('apscheduler', 'threadpool', False, 'ThreadPoolExecutor'),
+            ('apscheduler', 'debug', True, 'DebugExecutor'),
+            ('timer', 'threadpool', False, None),
+        ],
+    )
+    def test_new_scheduler(self, engine, executor, batch, expected, monkeypatch):
+        """Test the engine and executor are picked from the settings."""
+        monkeypatch.setattr(settings, 'SCHEDULER_ENGINE', engine)
+        monkeypatch.setattr(settings, 'SCHEDULER_EXECUTOR', executor)
+        monkeypatch.setattr(settings, 'SCHEDULER_MAX_WORKERS', 4)
+        monkeypatch.setattr(settings, 'SCHEDULER_BATCH_JOBS', batch)
+        monkeypatch.setattr(
+            'napps.kytos.maintenance.managers.scheduler.MaintenanceController',
+            MagicMock(),
+        )
+        async_controller = MagicMock()
+        monkeypatch.setattr(
+            'napps.kytos.maintenance.managers.scheduler.'
+            'AsyncMaintenanceController',
+            async_controller,
+        )
+        scheduler = Scheduler.new_scheduler(self.maintenance_deployer)
+        assert scheduler.async_db_controller is async_controller.return_value
+        if expected is None:
+            assert isinstance(scheduler.scheduler, TimerQueue)
+            return
+        task_scheduler = scheduler.scheduler
+        assert isinstance(task_scheduler, BatchScheduler) == batch
+        if batch:
+            task_scheduler = task_scheduler.scheduler
+        executor = task_scheduler._executors['default']
+        assert type(executor).__name__ == expected
+        if expected == 'ThreadPoolExecutor':
+            assert executor._pool._max_workers == 4
+
+    def test_window_cache(self):
+        stored_window = self.window.copy(update={'inserted_at': self.now})
+        self.db_controller.get_window.return_value = self.window
+        assert self.scheduler.get_maintenance('Test Window') == self.window
+        assert self.scheduler.get_maintenance('Test Window') == self.window
+        self.db_controller.get_window.assert_called_once_with('Test Window')
+        assert self.scheduler.window_cache.hits == 1
+        assert self.scheduler.window_cache.misses == 1
+
+        self.db_controller.update_window.return_value = stored_window
+        self.scheduler.update(self.window)
+        assert self.scheduler.get_maintenance('Test Window') is stored_window
+
+        self.scheduler.remove('Test Window')
+        assert self.db_controller.get_window.call_count == 1
+        assert len(self.scheduler.window_cache) == 0
+
+        self.db_controller.get_window.return_value = None
+        assert self.scheduler.get_maintenance('Test Window') is None
+        assert len(self.scheduler.window_cache) == 0
+
+    async def test_get_maintenance_race(self):
+        """Test a window read from the DB does not replace the window put
+        in the cache by a scheduler thread meanwhile."""
+        running_window = self.window.copy(update={'status': 'running'})
+
+        def start_meanwhile(mw_id):
+            self.scheduler.window_cache.put(running_window)
+            return self.window
+
+        self.db_controller.get_window.side_effect = start_meanwhile
+        assert self.scheduler.get_maintenance('Test Window') is running_window
+        assert self.scheduler.window_cache.get('Test Window') is running_window
+
+        self.scheduler.window_cache.clear()
+        self.scheduler.async_db_controller = MagicMock()
+        self.scheduler.async_db_controller.get_window = AsyncMock(
+            side_effect=start_meanwhile
+        )
+        window = await self.scheduler.aget_maintenance('Test Window')
+        assert window is running_window
+        assert self.scheduler.window_cache.get('Test Window') is running_window
+
+    def test_archive_maintenances(self):
+        finished_window = self.window.copy(update={'status': 'finished'})
+        self.scheduler.window_cache.put(finished_window)
+        self.db_controller.archive_windows.side_effect = [
+            ['Test Window', 'other window'],
+            ['last window'],
+        ]
+
+        archived = self.scheduler.archive_maintenances(self.now, batch_size=2)
+
+        assert archived == 3
+        assert self.db_controller.archive_windows.call_args_list == [
+            call(self.now, 2),
+            call(self.now, 2),
+        ]
+        assert len(self.scheduler.window_cache) == 0
+
+    def test_import_windows(self):
+        finished_window = self.window.copy(
+            update={'id': 'finished window', 'status': 'finished'}
+        )
+        running_window = self.window.copy(
+            update={'id': 'running window', 'status': 'running'}
+        )
+        pending_window = self.window.copy(
+            update={'id': 'pending window', 'status': 'pending'}
+        )
+        windows = [finished_window, running_window, pending_window]
+        self.db_controller.insert_windows.return_value = ['pending window']
+
+        skipped = self.scheduler.import_windows(windows)
+
+        assert skipped == ['pending window']
+        self.db_controller.insert_windows.assert_called_once_with(windows)
+        assert set(self.scheduler.overlap_index.windows) == {'running window'}
+        started, = self.maintenance_deployer.start_mws.call_args[0]
+        assert list(started) == [running_window]
+        self.task_scheduler.add_job.assert_called_once_with(
+            MaintenanceEnd(self.scheduler, 'running window'),
+            'date',
+            id='running window-end',
+            run_date=running_window.end,
+        )
+
+    def test_import_windows_upsert(self):
+        old_window = self.window.copy(
+            update={'id': 'running window', 'status': 'running'}
+        )
+        new_window = self.window.copy(
+            update={'id': 'running window', 'status': 'pending'}
+        )
+        self.scheduler.overlap_index.add(old_window)
+        self.db_controller.get_windows.return_value = [old_window]
+
+        def side_effect(job_id):
+            if job_id == 'running window-start':
+                raise JobLookupError(job_id)
+
+        self.task_scheduler.remove_job.side_effect = side_effect
+
+        skipped = self.scheduler.import_windows([new_window], upsert=True)
+
+        assert skipped == []
+        self.maintenance_deployer.end_mws.assert_called_once_with([old_window])
+        self.db_controller.upsert_windows.assert_called_once_with([new_window])
+        self.db_controller.insert_windows.assert_not_called()
+        assert self.scheduler.overlap_index.windows == {
+            'running window': new_window
+        }
+        self.task_scheduler.add_job.assert_called_once_with(
+            MaintenanceStart(self.scheduler, 'running window'),
+            'date',
+            id='running window-start',
+            run_date=new_window.start,
+        )
+
+    async def test_async_methods(self):
+        async_db_controller = AsyncMock()
+        self.scheduler.async_db_controller = async_db_controller
+        stored_window = self.window.copy(update={'inserted_at': self.now})
+        async_db_controller.insert_window.return_value = stored_window
+
+        await self.scheduler.aadd(self.window)
+        async_db_controller.insert_window.assert_awaited_once_with(self.window)
+        assert 'Test Window' in self.scheduler.overlap_index.windows
+        assert await self.scheduler.aget_maintenance('Test Window') is stored_window
+        async_db_controller.get_window.assert_not_called()
+        assert self.task_scheduler.add_job.call_count == 1
+
+        with pytest.raises(OverlapError):
+            await self.scheduler.aadd(self.window.copy(update={'id': 'other'}))
+
+        await self.scheduler.aremove('Test Window')
+        async_db_controller.remove_window.assert_awaited_once_with('Test Window')
+        assert len(self.scheduler.overlap_index) == 0
+        assert len(self.scheduler.window_cache) == 0
+        self.db_controller.assert_not_called()
+
+    async def test_async_deployer_calls(self):
+        """Test the async methods call the deployer out of the event loop."""
+        async_db_controller = AsyncMock()
+        self.scheduler.async_db_controller = async_db_controller
+        running_window = self.window.copy(update={'status': 'running'})
+        async_db_controller.end_window.return_value = running_window
+        async_db_controller.upsert_windows.return_value = None
+        self.task_scheduler.remove_job.side_effect = [
+            JobLookupError('Test Window-start'),
+            None,
+        ]
+        threads = []
+        self.maintenance_deployer.end_mw.side_effect = (
+            lambda _window: threads.append(threading.current_thread())
+        )
+        self.maintenance_deployer.start_mws.side_effect = (
+            lambda _windows: threads.append(threading.current_thread())
+        )
+
+        await self.scheduler.aend_maintenance_early('Test Window')
+        await self.scheduler.aimport_windows([running_window], upsert=True)
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+    async def test_aexport_maintenances(self):
+        self.db_controller.get_window_documents.side_effect = [
+            [{'id': '1', 'start': self.now}, {'id': '2', 'start': self.now}],
+            [{'id': '3', 'start': self.now}],
+        ]
+        batches = [
+            batch
+            async for batch in self.scheduler.aexport_maintenances(
+                batch_size=2, archived=True
+            )
+        ]
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert self.db_controller.get_window_documents.call_args_list == [
+            call(None, limit=2, after=None, archived=True),
+            call(None, limit=2, after=(self.now, '2'), archived=True),
+        ]
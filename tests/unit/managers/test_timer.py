@@ -0,0 +1,120 @@
+"""Tests for the timer module."""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from threading import Event
+from unittest.mock import MagicMock, call
+
+from apscheduler.jobstores.base import JobLookupError
+import pytest
+import pytz
+
+from napps.kytos.maintenance.managers.timer import TimerQueue
+
+
+@dataclass
+class BatchJob:
+    """Job recording the batches it is run in."""
+    batches: list
+    name: str
+
+    def __call__(self):
+        raise AssertionError('Batch jobs must run in batches')
+
+    @classmethod
+    def run_batch(cls, jobs):
+        jobs[0].batches.append([job.name for job in jobs])
+
+
+class TestTimerQueue:
+    """Test of the TimerQueue class."""
+
+    def setup_method(self):
+        self.now = datetime.now(pytz.utc)
+        self.queue = TimerQueue()
+
+    def teardown_method(self):
+        self.queue.shutdown()
+
+    def test_add_and_remove(self):
+        """Test adding, replacing and removing jobs."""
+        self.queue.add_job(MagicMock(), 'date', id='a', run_date=self.now)
+        self.queue.add_job(MagicMock(), 'date', id='b', run_date=self.now)
+        self.queue.add_job(MagicMock(), 'date', id='a', run_date=self.now)
+        assert len(self.queue) == 2
+
+        self.queue.remove_job('a')
+        assert len(self.queue) == 1
+        with pytest.raises(JobLookupError):
+            self.queue.remove_job('a')
+        with pytest.raises(ValueError):
+            self.queue.add_job(MagicMock(), 'interval', id='c', run_date=self.now)
+
+        self.queue.remove_all_jobs()
+        assert len(self.queue) == 0
+        assert not self.queue.heap
+
+    def test_compaction(self):
+        """Test cancelled jobs are dropped once they are the majority."""
+        for number in range(10):
+            self.queue.add_job(
+                MagicMock(),
+                'date',
+                id=str(number),
+                run_date=self.now + timedelta(minutes=number),
+            )
+        for number in range(6):
+            self.queue.remove_job(str(number))
+        assert len(self.queue.heap) == 4
+        assert self.queue.cancelled == 0
+
+    def test_run_due(self):
+        """Test jobs due at the same instant run as batches."""
+        batches = []
+        single = MagicMock()
+        later = self.now + timedelta(seconds=1)
+        self.queue.add_job(BatchJob(batches, 'a'), id='a', run_date=self.now)
+        self.queue.add_job(BatchJob(batches, 'b'), id='b', run_date=self.now)
+        self.queue.add_job(single, id='c', run_date=self.now)
+        self.queue.add_job(BatchJob(batches, 'd'), id='d', run_date=later)
+        self.queue.add_job(BatchJob(batches, 'e'), id='e', run_date=later)
+
+        due = sorted(self.queue.heap)
+        self.queue.run_due(due)
+
+        assert batches == [['a', 'b'], ['d', 'e']]
+        single.assert_called_once_with()
+
+    def test_run_due_interleaved(self):
+        """Test jobs of a class due at the same instant run as a single
+        batch when other jobs were added between them."""
+        batches = []
+        single = MagicMock()
+        self.queue.add_job(BatchJob(batches, 'a'), id='a', run_date=self.now)
+        self.queue.add_job(single, id='b', run_date=self.now)
+        self.queue.add_job(BatchJob(batches, 'c'), id='c', run_date=self.now)
+
+        self.queue.run_due(sorted(self.queue.heap))
+
+        assert batches == [['a', 'c']]
+        single.assert_called_once_with()
+
+    def test_timer_thread(self):
+        """Test due jobs are run by the timer thread."""
+        done = Event()
+        failing = MagicMock(side_effect=ValueError('failure'))
+        self.queue.add_job(failing, id='failing', run_date=self.now)
+        self.queue.add_job(
+            done.set,
+            id='done',
+            run_date=self.now + timedelta(milliseconds=50),
+        )
+        self.queue.add_job(
+            MagicMock(),
+            id='later',
+            run_date=self.now + timedelta(days=1),
+        )
+        self.queue.start()
+        assert done.wait(5)
+        assert failing.call_args_list == [call()]
+        assert len(self.queue) == 1
@@ -1,12 +1,28 @@
 """Module to test MaintenanceController"""
 
-from unittest.mock import MagicMock, patch, call
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch, call
 
 from datetime import datetime, timedelta
+import pymongo
+from pymongo.errors import AutoReconnect, BulkWriteError
+import pytest
 import pytz
 
-from napps.kytos.maintenance.controllers import MaintenanceController
-from napps.kytos.maintenance.models import MaintenanceWindow, MaintenanceWindows
+from napps.kytos.maintenance import metrics
+from napps.kytos.maintenance.controllers import (
+    AsyncMaintenanceController,
+    MaintenanceController,
+    ThreadedMaintenanceController,
+    _before_sleep,
+)
+from napps.kytos.maintenance.models import (
+    MaintenanceFilter,
+    MaintenanceWindow,
+    MaintenanceWindows,
+    Status,
+)
 
 class TestMaintenanceController:
     """Test the MaintenanceController Class"""
@@ -20,6 +36,8 @@ class TestMaintenanceController:
             'start': self.now + timedelta(hours=1),
             'end': self.now + timedelta(hours=2),
             'status': 'pending',
+            'recurrence': None,
+            'occurrence': 0,
             'switches': [],
             'interfaces': [],
             'links': [],
@@ -45,17 +63,37 @@ class TestMaintenanceController:
         windows = self.controller.windows
         expected_indexes = [
             call("maintenance.windows", [("id", 1)], unique=True),
+            call("maintenance.windows", [("status", 1), ("start", 1)]),
+            call("maintenance.windows", [("status", 1), ("end", 1)]),
+            call("maintenance.windows", [("status", 1), ("last_modified", 1)]),
+            call("maintenance.windows", [("start", 1), ("id", 1)]),
+            call("maintenance.windows", [("switches", 1)]),
+            call("maintenance.windows", [("interfaces", 1)]),
+            call("maintenance.windows", [("links", 1)]),
         ]
         mock = self.controller.mongo.bootstrap_index
         indexes = mock.call_args_list
-        assert indexes == expected_indexes
+        assert indexes == [
+            *expected_indexes[:1],
+            call("maintenance.windows_archive", [("id", 1)], unique=True),
+            *expected_indexes[1:],
+            call("maintenance.windows_archive", [("start", 1), ("id", 1)]),
+        ]
+
+        mock.reset_mock()
+        self.controller.bootstrap_indexes(archive_ttl=86400)
+        assert mock.call_args_list[-1] == call(
+            "maintenance.windows_archive",
+            [("archived_at", 1)],
+            expireAfterSeconds=86400,
+        )
 
     @patch('napps.kytos.maintenance.controllers.datetime')
     def test_insert_window(self, dt_class):
         """Test inserting a window."""
         now_func = dt_class.now
         now_func.return_value = self.now
-        self.controller.insert_window(self.window)
+        stored = self.controller.insert_window(self.window)
         self.controller.windows.insert_one.assert_called_once_with(
             {
                 **self.window_dict,
@@ -63,14 +101,20 @@ class TestMaintenanceController:
                 'updated_at': self.now,
             }
         )
+        assert stored == self.window.copy(
+            update={'inserted_at': self.now, 'updated_at': self.now}
+        )
 
     def test_update_window(self):
         """Test updating a window."""
-        self.controller.update_window(self.window)
+        self.controller.windows.find_one_and_update.return_value = (
+            self.window_dict
+        )
+        stored = self.controller.update_window(self.window)
         dict_copy = self.window_dict.copy()
         del dict_copy['inserted_at']
         del dict_copy['updated_at']
-        self.controller.windows.update_one.assert_called_once_with(
+        self.controller.windows.find_one_and_update.assert_called_once_with(
             {'id': self.window.id},
             [{
                 '$set': {
@@ -78,7 +122,10 @@ class TestMaintenanceController:
                     'updated_at': '$$NOW',
                 },
             }],
+            {'_id': False},
+            return_document=pymongo.ReturnDocument.AFTER,
         )
+        assert stored == self.window
 
     def test_get_window_1(self):
         """Test getting a window that exists."""
@@ -118,3 +165,496 @@ class TestMaintenanceController:
         self.controller.check_overlap(obj_mw, False)
         query = self.controller.windows.find.call_args[0][0]
         assert len(query["$and"]) == 2
+
+    def test_get_windows_filtered(self):
+        """Test getting a filtered page of windows."""
+        find = self.controller.windows.find
+        find.return_value.sort.return_value.limit.return_value = [
+            {'id': 'Test Window', 'start': self.window_dict['start']}
+        ]
+        window_filter = MaintenanceFilter(
+            status=['pending', 'running'],
+            since=self.now,
+            switches=['00:00:00:00:00:00:00:01'],
+        )
+        after = (self.now, 'Other Window')
+        result = self.controller.get_windows(
+            window_filter, fields=['start'], limit=10, after=after
+        )
+        assert len(result) == 1
+        assert result[0].id == 'Test Window'
+
+        query = find.call_args[0][0]
+        assert query == {'$and': [
+            {'status': {'$in': [Status.PENDING, Status.RUNNING]}},
+            {'end': {'$gt': self.now}},
+            {'switches': {'$in': ['00:00:00:00:00:00:00:01']}},
+            {'$or': [
+                {'start': {'$gt': self.now}},
+                {'start': self.now, 'id': {'$gt': 'Other Window'}},
+            ]},
+        ]}
+        assert find.call_args[1]['projection'] == {
+            '_id': False, 'id': True, 'start': True,
+        }
+        find.return_value.sort.assert_called_once_with(
+            [('start', 1), ('id', 1)]
+        )
+        find.return_value.sort.return_value.limit.assert_called_once_with(10)
+
+    def test_iter_window_documents(self):
+        """Test windows are read in batches after the previous one."""
+        window_filter = MaintenanceFilter(status=['finished'])
+        batches = [
+            [{'id': 'a', 'start': self.now}, {'id': 'b', 'start': self.now}],
+            [{'id': 'c', 'start': self.now}],
+        ]
+        with patch.object(
+            self.controller, 'get_window_documents', side_effect=batches
+        ) as get_window_documents:
+            result = list(
+                self.controller.iter_window_documents(window_filter, batch_size=2)
+            )
+        assert result == batches
+        assert get_window_documents.call_args_list == [
+            call(window_filter, limit=2, after=None, archived=False),
+            call(window_filter, limit=2, after=(self.now, 'b'), archived=False),
+        ]
+
+        with patch.object(
+            self.controller, 'get_window_documents', side_effect=[batches[0], []]
+        ):
+            result = list(
+                self.controller.iter_window_documents(window_filter, batch_size=2)
+            )
+        assert result == batches[:1]
+
+    @patch('napps.kytos.maintenance.controllers.datetime')
+    def test_insert_windows(self, dt_class):
+        """Test inserting many windows, skipping duplicates."""
+        dt_class.now.return_value = self.now
+        other_window = self.window.copy(update={'id': 'Other Window'})
+        self.controller.windows.insert_many.side_effect = BulkWriteError({
+            'writeErrors': [{'index': 1, 'code': 11000, 'errmsg': 'duplicate'}],
+        })
+        duplicates = self.controller.insert_windows([self.window, other_window])
+        assert duplicates == ['Other Window']
+        documents = self.controller.windows.insert_many.call_args[0][0]
+        assert documents[0] == {
+            **self.window_dict,
+            'inserted_at': self.now,
+            'updated_at': self.now,
+        }
+        assert documents[1]['id'] == 'Other Window'
+        assert self.controller.windows.insert_many.call_args[1] == {
+            'ordered': False
+        }
+
+        self.controller.windows.insert_many.side_effect = BulkWriteError({
+            'writeErrors': [{'index': 0, 'code': 2, 'errmsg': 'bad value'}],
+        })
+        with pytest.raises(BulkWriteError):
+            self.controller.insert_windows([self.window])
+
+    def test_remove_windows(self):
+        """Test removing many windows."""
+        self.controller.remove_windows(['Test Window', 'Other Window'])
+        self.controller.windows.delete_many.assert_called_once_with(
+            {'id': {'$in': ['Test Window', 'Other Window']}}
+        )
+
+    def test_update_windows(self):
+        """Test updating many windows with a single bulk write."""
+        other_window = self.window.copy(update={'id': 'Other Window'})
+        self.controller.update_windows([self.window, other_window])
+        requests, = self.controller.windows.bulk_write.call_args[0]
+        assert self.controller.windows.bulk_write.call_args[1] == {
+            'ordered': False
+        }
+        assert [request._filter for request in requests] == [
+            {'id': 'Test Window'},
+            {'id': 'Other Window'},
+        ]
+        update = requests[0]._doc[0]['$set']
+        assert update['updated_at'] == '$$NOW'
+        assert 'inserted_at' not in update
+
+        self.controller.windows.bulk_write.reset_mock()
+        self.controller.update_windows([])
+        self.controller.windows.bulk_write.assert_not_called()
+
+    @patch('napps.kytos.maintenance.controllers.datetime')
+    def test_upsert_windows(self, dt_class):
+        """Test replacing many windows with a single bulk write."""
+        dt_class.now.return_value = self.now
+        self.controller.upsert_windows([self.window])
+        requests, = self.controller.windows.bulk_write.call_args[0]
+        assert self.controller.windows.bulk_write.call_args[1] == {
+            'ordered': False
+        }
+        assert requests[0]._filter == {'id': 'Test Window'}
+        assert requests[0]._doc == {
+            **self.window_dict,
+            'inserted_at': self.now,
+            'updated_at': self.now,
+        }
+        assert requests[0]._upsert
+
+        self.controller.windows.bulk_write.reset_mock()
+        self.controller.upsert_windows([])
+        self.controller.windows.bulk_write.assert_not_called()
+
+    @patch('napps.kytos.maintenance.controllers.datetime')
+    def test_prepare_start(self, dt_class):
+        """Test bringing window statuses up to date with a single write."""
+        dt_class.now.return_value = self.now
+        self.controller.prepare_start()
+        self.controller.windows.update_many.assert_called_once_with(
+            {'recurrence': None, '$or': [
+                {'status': Status.PENDING, 'start': {'$lte': self.now}},
+                {'status': Status.RUNNING, 'end': {'$lte': self.now}},
+            ]},
+            [{
+                '$set': {
+                    'status': {
+                        '$cond': [
+                            {'$lte': ['$end', self.now]},
+                            Status.FINISHED,
+                            Status.RUNNING,
+                        ],
+                    },
+                    'last_modified': self.now,
+                },
+            }],
+        )
+
+    @patch('napps.kytos.maintenance.controllers.datetime')
+    def test_archive_windows(self, dt_class):
+        """Test moving finished windows to the archive."""
+        dt_class.now.return_value = self.now
+        finished = {**self.window_dict, 'status': 'finished'}
+        find = self.controller.windows.find
+        find.return_value = [finished]
+
+        mw_ids = self.controller.archive_windows(self.now, batch_size=10)
+
+        assert mw_ids == ['Test Window']
+        find.assert_called_once_with(
+            {
+                'status': Status.FINISHED,
+                '$or': [
+                    {'last_modified': {'$lt': self.now}},
+                    {
+                        'last_modified': {'$exists': False},
+                        'end': {'$lt': self.now},
+                    },
+                ],
+            },
+            projection={'_id': False},
+            limit=10,
+        )
+        requests = self.controller.archive.bulk_write.call_args[0][0]
+        assert requests[0]._filter == {'id': 'Test Window'}
+        assert requests[0]._doc == {**finished, 'archived_at': self.now}
+        assert requests[0]._upsert
+        self.controller.windows.delete_many.assert_called_once_with(
+            {'id': {'$in': ['Test Window']}}
+        )
+
+        find.return_value = []
+        self.controller.windows.delete_many.reset_mock()
+        assert not self.controller.archive_windows(self.now)
+        self.controller.windows.delete_many.assert_not_called()
+
+    def test_get_window_documents_archived(self):
+        """Test getting windows including the archived ones."""
+        aggregate = self.controller.windows.aggregate
+        aggregate.return_value = [self.window_dict]
+        self.controller.archive.name = 'maintenance.windows_archive'
+        window_filter = MaintenanceFilter(status=['finished'])
+        query = {'$and': [{'status': {'$in': [Status.FINISHED]}}]}
+
+        result = self.controller.get_window_documents(
+            window_filter, limit=10, archived=True
+        )
+
+        assert result == [self.window_dict]
+        aggregate.assert_called_once_with([
+            {'$match': query},
+            {'$unionWith': {
+                'coll': 'maintenance.windows_archive',
+                'pipeline': [{'$match': query}],
+            }},
+            {'$project': {'_id': False, 'archived_at': False}},
+            {'$sort': {'start': 1, 'id': 1}},
+            {'$limit': 10},
+        ])
+        self.controller.windows.find.assert_not_called()
+
+        aggregate.reset_mock()
+        self.controller.get_window_documents(fields=['status'], archived=True)
+        pipeline = aggregate.call_args[0][0]
+        assert pipeline[2] == {'$project': {
+            '_id': False, 'id': True, 'start': True, 'status': True,
+        }}
+        assert len(pipeline) == 3
+
+    @patch('napps.kytos.maintenance.controllers.before_sleep')
+    def test_db_metrics(self, before_sleep):
+        """Test DB calls are timed and their retries counted."""
+        metrics.clear()
+        self.controller.windows.find_one.return_value = None
+        self.controller.get_window('Test Window')
+        assert metrics.DB_LATENCY.get(method='get_window') == 1
+        retry_state = MagicMock()
+        retry_state.fn.__name__ = 'get_window'
+        _before_sleep(retry_state)
+        assert metrics.DB_RETRIES.get(method='get_window') == 1
+        before_sleep.assert_called_once_with(retry_state)
+
+    def test_start_windows(self):
+        """Test starting many windows with a single write."""
+        self.controller.start_windows(['Test Window', 'Other Window'])
+        self.controller.windows.update_many.assert_called_once_with(
+            {'id': {'$in': ['Test Window', 'Other Window']}},
+            [{
+                '$set': {
+                    'status': Status.RUNNING,
+                    'last_modified': '$$NOW',
+                },
+            }],
+        )
+
+    def test_end_windows(self):
+        """Test finishing many windows with a single write."""
+        self.controller.end_windows(['Test Window', 'Other Window'])
+        self.controller.windows.update_many.assert_called_once_with(
+            {'id': {'$in': ['Test Window', 'Other Window']}},
+            [{
+                '$set': {
+                    'status': Status.FINISHED,
+                    'last_modified': '$$NOW',
+                },
+            }],
+        )
+
+
+class TestAsyncMaintenanceController:
+    """Test the AsyncMaintenanceController Class"""
+
+    def setup_method(self) -> None:
+        self.controller = AsyncMaintenanceController(
+            MagicMock, MagicMock
+        )
+        self.windows = self.controller.windows = MagicMock()
+        self.now = datetime.now(pytz.utc)
+        self.window = MaintenanceWindow.model_construct(
+            id = 'Test Window',
+            description = '',
+            start = self.now + timedelta(hours=1),
+            end = self.now + timedelta(hours=2),
+            status = 'pending',
+            recurrence = None,
+            occurrence = 0,
+            switches = [],
+            interfaces = [],
+            links = [],
+            updated_at = self.now - timedelta(days=1),
+            inserted_at = self.now - timedelta(days=1),
+        )
+
+    @patch.dict(os.environ, {
+        'MONGO_HOST_SEEDS': 'mongo1:27017,mongo2:27018',
+        'MONGO_USERNAME': 'user',
+        'MONGO_DBNAME': 'db',
+    })
+    @patch('napps.kytos.maintenance.controllers.AsyncMongoClient')
+    def test_new_client(self, client_class):
+        """Test the client is created from the kytos DB settings."""
+        AsyncMaintenanceController(MagicMock)
+        args, kwargs = client_class.call_args
+        assert args == (['mongo1:27017', 'mongo2:27018'],)
+        assert kwargs['username'] == 'user'
+        assert kwargs['authsource'] == 'db'
+        assert kwargs['connect'] is False
+
+    def test_close(self):
+        """Test closing the client out of the event loop."""
+        self.controller.db_client = MagicMock(close=AsyncMock())
+        self.controller.close()
+        self.controller.db_client.close.assert_awaited_once()
+
+    async def test_close_on_loop(self):
+        """Test closing the client on the event loop."""
+        self.controller.db_client = MagicMock(close=AsyncMock())
+        self.controller.close()
+        await asyncio.sleep(0)
+        self.controller.db_client.close.assert_awaited_once()
+
+    @patch('napps.kytos.maintenance.controllers.datetime')
+    async def test_insert_window(self, dt_class):
+        """Test inserting a window."""
+        dt_class.now.return_value = self.now
+        self.windows.insert_one = AsyncMock()
+        stored = await self.controller.insert_window(self.window)
+        document = self.windows.insert_one.call_args[0][0]
+        assert document['inserted_at'] == document['updated_at'] == self.now
+        assert stored == self.window.copy(
+            update={'inserted_at': self.now, 'updated_at': self.now}
+        )
+
+    async def test_get_window(self):
+        """Test getting a window, if it exists."""
+        self.windows.find_one = AsyncMock(return_value=dict(self.window))
+        assert await self.controller.get_window('Test Window') == self.window
+        self.windows.find_one.assert_called_once_with(
+            {'id': 'Test Window'}, {'_id': False}
+        )
+        self.windows.find_one.return_value = None
+        assert await self.controller.get_window('Test Window') is None
+
+    async def test_get_windows_page(self):
+        """Test getting a page of windows sorted by start and id."""
+        cursor = self.windows.find.return_value
+        cursor.sort.return_value = cursor
+        cursor.limit.return_value = cursor
+        cursor.to_list = AsyncMock(return_value=[dict(self.window)])
+        windows = await self.controller.get_windows(
+            MaintenanceFilter(status=['pending']), limit=10
+        )
+        assert windows.root == [self.window]
+        cursor.limit.assert_called_once_with(10)
+        cursor.to_list.assert_called_once_with(None)
+
+    @patch('asyncio.sleep')
+    async def test_retries(self, sleep):
+        """Test connection failures are retried without blocking."""
+        self.windows.delete_one = AsyncMock(
+            side_effect=[AutoReconnect('down'), None]
+        )
+        await self.controller.remove_window('Test Window')
+        assert self.windows.delete_one.call_count == 2
+        sleep.assert_called_once()
+
+
+async def test_threaded_controller():
+    """Test the threaded controller runs the sync methods in threads."""
+    db_controller = MagicMock()
+    db_controller.get_window.return_value = 'window'
+    controller = ThreadedMaintenanceController(db_controller)
+    assert await controller.get_window('Test Window') == 'window'
+    db_controller.get_window.assert_called_once_with('Test Window')
+
+
+class RecordingCollection:
+    """Collection proxy recording the filters of the issued queries."""
+
+    def __init__(self, collection) -> None:
+        self.collection = collection
+        self.filters = []
+
+    def find(self, filter=None, *args, **kwargs):
+        self.filters.append(filter or {})
+        return self.collection.find(filter, *args, **kwargs)
+
+    def update_many(self, filter, *args, **kwargs):
+        self.filters.append(filter)
+        return self.collection.update_many(filter, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+class LocalMongo:
+    """Minimal kytos.core.db.Mongo replacement for a local mongod."""
+
+    db_name = "maintenance_index_test"
+
+    def __init__(self, client) -> None:
+        self.client = client
+
+    def bootstrap_index(self, collection, keys, **kwargs):
+        self.client[self.db_name][collection].create_index(keys, **kwargs)
+        return True
+
+
+class TestMaintenanceControllerIndexes:
+    """Check that the scheduler queries are served by indexes.
+
+    Needs a local mongod, set MAINTENANCE_TEST_MONGO_URI to use another one.
+    """
+
+    def setup_method(self) -> None:
+        uri = os.environ.get(
+            "MAINTENANCE_TEST_MONGO_URI", "mongodb://localhost:27017"
+        )
+        client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=500)
+        try:
+            client.admin.command("ping")
+        except pymongo.errors.PyMongoError:
+            pytest.skip(f"No mongod available at {uri}")
+        client.drop_database(LocalMongo.db_name)
+        self.client = client
+        self.controller = MaintenanceController(lambda: LocalMongo(client))
+        self.controller.bootstrap_indexes()
+
+        now = datetime.now(pytz.utc)
+        statuses = ['pending', 'running', 'finished']
+        self.controller.windows.insert_many([
+            {
+                'id': f'window {i}',
+                'description': '',
+                'start': now + timedelta(hours=i),
+                'end': now + timedelta(hours=i + 2),
+                'status': statuses[i % 3],
+                'switches': [f'00:00:00:00:00:00:00:{i % 256:02x}'],
+                'interfaces': [f'00:00:00:00:00:00:00:{i % 256:02x}:1'],
+                'links': [f'link {i}'],
+            }
+            for i in range(1000)
+        ])
+        self.windows = RecordingCollection(self.controller.windows)
+        self.controller.windows = self.windows
+
+    def teardown_method(self) -> None:
+        self.client.drop_database(LocalMongo.db_name)
+
+    def assert_no_collscan(self):
+        """Assert that none of the recorded queries scans the collection."""
+        assert self.windows.filters
+        for query in self.windows.filters:
+            explanation = self.windows.collection.find(query).explain()
+            winning_plan = explanation['queryPlanner']['winningPlan']
+            assert 'COLLSCAN' not in str(winning_plan), query
+
+    def test_check_overlap(self):
+        """Test overlap queries use indexes."""
+        now = datetime.now(pytz.utc)
+        window = MaintenanceWindow.model_construct(
+            start=now + timedelta(hours=10),
+            end=now + timedelta(hours=12),
+            switches=['00:00:00:00:00:00:00:0a'],
+            interfaces=['00:00:00:00:00:00:00:0b:1'],
+            links=['link 12'],
+        )
+        self.controller.check_overlap(window, False)
+        self.controller.check_overlap(window, True)
+        self.assert_no_collscan()
+
+    def test_get_unfinished_windows(self):
+        """Test loading the unfinished windows uses indexes."""
+        self.controller.get_unfinished_windows()
+        self.assert_no_collscan()
+
+    def test_prepare_start(self):
+        """Test updating the window statuses on start uses indexes."""
+        self.controller.prepare_start()
+        self.assert_no_collscan()
+
+    def test_get_windows_page(self):
+        """Test paginated listings use indexes."""
+        self.controller.get_windows(
+            MaintenanceFilter(status=['pending']),
+            limit=10,
+        )
+        self.assert_no_collscan()
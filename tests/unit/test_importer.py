@@ -0,0 +1,164 @@
+"""Tests for the importer module."""
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytz
+
+from napps.kytos.maintenance.importer import (
+    aread_lines,
+    avalidate_chunks,
+    import_file,
+    parse_csv,
+    parse_ndjson,
+    validate_chunks,
+    validate_records,
+)
+from napps.kytos.maintenance.models import Status
+
+TIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
+
+
+async def stream(*chunks: bytes):
+    """Stream the given chunks of a body."""
+    for chunk in chunks:
+        yield chunk
+
+
+class TestImporter:
+    """Test the import of maintenance windows."""
+
+    def setup_method(self):
+        """Initialize before tests are executed."""
+        self.now = datetime.now(pytz.utc)
+
+    def record(self, mw_id, start, end, **kwargs):
+        return {
+            "id": mw_id,
+            "start": (self.now + start).strftime(TIME_FMT),
+            "end": (self.now + end).strftime(TIME_FMT),
+            "switches": ["00:00:00:00:00:00:00:01"],
+            **kwargs,
+        }
+
+    def test_parse_ndjson(self):
+        """Test parsing NDJSON lines."""
+        lines = ['{"id": "1"}', "", "  ", "{invalid", "[]"]
+        records = list(parse_ndjson(lines))
+        assert records[0] == (1, {"id": "1"})
+        assert records[1][0] == 4
+        assert isinstance(records[1][1], ValueError)
+        assert records[2] == (5, [])
+
+    def test_parse_csv(self):
+        """Test parsing CSV lines with a header."""
+        lines = [
+            "id,start,switches,interfaces,links,description",
+            '1,2030-01-01T00:00:00+0000,00:01 00:02,"[""00:01:1""]",,a',
+            '2,2030-01-01T00:00:00+0000,"[invalid",,,',
+        ]
+        records = list(parse_csv(lines))
+        assert records[0] == (
+            2,
+            {
+                "id": "1",
+                "start": "2030-01-01T00:00:00+0000",
+                "switches": ["00:01", "00:02"],
+                "interfaces": ["00:01:1"],
+                "description": "a",
+            },
+        )
+        assert records[1][0] == 3
+        assert isinstance(records[1][1], ValueError)
+
+    def test_validate_records(self):
+        """Test windows in the past are accepted with the current status."""
+        records = [
+            (1, self.record("finished", timedelta(days=-2), timedelta(days=-1))),
+            (2, self.record("running", timedelta(hours=-1), timedelta(hours=1))),
+            (3, self.record("pending", timedelta(hours=1), timedelta(hours=2))),
+            (4, self.record("invalid", timedelta(hours=2), timedelta(hours=1))),
+            (5, ValueError("Invalid JSON")),
+            (6, ["not", "a", "window"]),
+        ]
+        windows, errors = validate_records(records)
+        assert [(window.id, window.status) for window in windows] == [
+            ("finished", Status.FINISHED),
+            ("running", Status.RUNNING),
+            ("pending", Status.PENDING),
+        ]
+        assert [error["line"] for error in errors] == [4, 5, 6]
+        assert "End before start not allowed" in errors[0]["description"]
+
+    def test_validate_chunks(self):
+        """Test records are validated in chunks."""
+        lines = [
+            json.dumps(self.record(f"{number}", timedelta(hours=1), timedelta(hours=2)))
+            for number in range(5)
+        ]
+        chunks = list(validate_chunks(lines, "ndjson", chunk_size=2))
+        assert [len(windows) for windows, _ in chunks] == [2, 2, 1]
+
+    async def test_aread_lines(self):
+        """Test lines are decoded as the chunks of a body arrive."""
+        chunks = stream(b'{"a": "\xc3', b'\xa9"}\r', b"\n\n", b"last")
+        assert [line async for line in aread_lines(chunks)] == [
+            '{"a": "\u00e9"}',
+            "",
+            "last",
+        ]
+        with pytest.raises(UnicodeDecodeError):
+            async for _ in aread_lines(stream(b"valid\n", b"\xff\n")):
+                pass
+
+    async def test_avalidate_chunks(self):
+        """Test a streamed body is validated in chunks, numbering the lines
+        of every chunk and keeping quoted CSV cells in a single chunk."""
+        body = "\n".join(
+            json.dumps(self.record(f"{number}", timedelta(hours=1), timedelta(hours=2)))
+            for number in range(5)
+        ).encode()
+        chunks = [
+            chunk
+            async for chunk in avalidate_chunks(
+                stream(body[:50], body[50:]), "ndjson", chunk_size=2
+            )
+        ]
+        assert [len(windows) for windows, _ in chunks] == [2, 2, 1]
+
+        record = self.record("1", timedelta(hours=1), timedelta(hours=2))
+        body = (
+            "id,start,end,switches,description\n"
+            f'1,{record["start"]},{record["end"]},00:01,"first\nsecond"\n'
+            f'2,{record["end"]},{record["start"]},00:01,\n'
+            f'3,{record["start"]},{record["end"]},00:01,\n'
+        ).encode()
+        chunks = [
+            chunk async for chunk in avalidate_chunks(stream(body), "csv", chunk_size=1)
+        ]
+        assert [[window.id for window in windows] for windows, _ in chunks] == [
+            ["1"],
+            [],
+            ["3"],
+        ]
+        assert [error["line"] for error in chunks[1][1]] == [4]
+
+    @patch("napps.kytos.maintenance.controllers.MaintenanceController")
+    def test_import_file(self, controller_class):
+        """Test importing a file straight into the DB."""
+        db_controller = controller_class.return_value
+        db_controller.insert_windows.return_value = ["1"]
+        lines = [
+            json.dumps(self.record(f"{number}", timedelta(hours=1), timedelta(hours=2)))
+            for number in range(3)
+        ] + ["{invalid"]
+        result = import_file(lines, "ndjson", chunk_size=2)
+        assert result["imported"] == 1
+        assert result["skipped"] == ["1", "1"]
+        assert [error["line"] for error in result["errors"]] == [4]
+        assert db_controller.insert_windows.call_count == 2
+
+        result = import_file(lines[:1], "ndjson", upsert=True)
+        assert result["imported"] == 1
+        db_controller.upsert_windows.assert_called_once()
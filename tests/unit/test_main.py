@@ -1,10 +1,12 @@
 """Tests for the main madule."""
 import asyncio
-from unittest.mock import patch, call, MagicMock
-from datetime import datetime, timedelta
+import json
+from unittest.mock import patch, call, AsyncMock, MagicMock
+from datetime import datetime, timedelta, timezone
 
 import pytz
 import pytest
+from pymongo.errors import DuplicateKeyError
 
 from kytos.lib.helpers import get_controller_mock, get_test_client
 from napps.kytos.maintenance.main import Main
@@ -13,6 +15,28 @@ from napps.kytos.maintenance.models import MaintenanceWindows
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
 
+# Coroutine methods of the scheduler called by the REST handlers
+ASYNC_METHODS = (
+    "aadd",
+    "aadd_many",
+    "aend_maintenance_early",
+    "aend_maintenances_early",
+    "aget_maintenance",
+    "aimport_windows",
+    "alist_maintenance_documents",
+    "alist_maintenances",
+    "aremove",
+    "aremove_many",
+    "aupdate",
+    "aupdate_many",
+)
+
+
+async def aiter_batches(batches):
+    """Async iterator over batches, as aexport_maintenances returns."""
+    for batch in batches:
+        yield batch
+
 
 class TestMain:
     """Test the Main class of this NApp."""
@@ -24,6 +48,8 @@ class TestMain:
         self.controller = get_controller_mock()
         self.controller.switches = MagicMock()
         self.scheduler = MagicMock()
+        for name in ASYNC_METHODS:
+            setattr(self.scheduler, name, AsyncMock(return_value=MagicMock()))
         new_sched = (
             "napps.kytos.maintenance.managers.MaintenanceScheduler.new_scheduler"
         )
@@ -83,7 +109,7 @@ class TestMain:
         self.controller.links.get.assert_has_calls(
             link_calls
         )
-        args, kwargs = self.scheduler.add.call_args
+        args, kwargs = self.scheduler.aadd.call_args
         window: MW = args[0]
 
         assert window.start == start.replace(microsecond=0)
@@ -120,7 +146,7 @@ class TestMain:
         current_data = response.json()
         assert response.status_code == 201, current_data
         self.controller.switches.get.assert_called_with("00:00:00:00:00:00:00:01")
-        args, kwargs = self.scheduler.add.call_args
+        args, kwargs = self.scheduler.aadd.call_args
         window: MW = args[0]
 
         assert window.start == start.replace(microsecond=0)
@@ -157,8 +183,7 @@ class TestMain:
             "00:00:00:00:00:00:00:01:1"
         )
         assert response.status_code == 201, current_data
-        args, kwargs = self.scheduler.add.call_args
-        response = await self.api.get(f"{url}/some_mw")
+        args, kwargs = self.scheduler.aadd.call_args
         window: MW = args[0]
 
         assert window.start == start.replace(microsecond=0)
@@ -192,7 +217,7 @@ class TestMain:
             "cf0f4071be426b3f745027f5d22bc61f8312ae86293c9b28e7e66015607a9260"
         )
         assert response.status_code == 201, current_data
-        args, kwargs = self.scheduler.add.call_args
+        args, kwargs = self.scheduler.aadd.call_args
         window: MW = args[0]
 
         assert window.start == start.replace(microsecond=0)
@@ -219,7 +244,7 @@ class TestMain:
         }
         response = await self.api.post(url, json=payload)
         assert response.status_code == 400
-        self.scheduler.add.assert_not_called()
+        self.scheduler.aadd.assert_not_called()
 
     async def test_create_mw_case_6(self):
         """Test a fail case of the REST to create a maintenance window."""
@@ -241,7 +266,7 @@ class TestMain:
         current_data = response.json()
         assert response.status_code == 400
         assert current_data["description"] == "start: Value error, Start in the past not allowed"
-        self.scheduler.add.assert_not_called()
+        self.scheduler.aadd.assert_not_called()
 
     async def test_create_mw_case_7(self):
         """Test a fail case of the REST to create a maintenance window."""
@@ -264,7 +289,7 @@ class TestMain:
 
         assert response.status_code == 400
         assert current_data["description"] == "end: Value error, End before start not allowed"
-        self.scheduler.add.assert_not_called()
+        self.scheduler.aadd.assert_not_called()
 
     @pytest.mark.skip(reason="Future feature")
     async def test_create_mw_case_8(self):
@@ -289,7 +314,7 @@ class TestMain:
 
         assert response.status_code == 400
         assert current_data["description"] == "Setting a maintenance id is not allowed"
-        self.scheduler.add.assert_not_called()
+        self.scheduler.aadd.assert_not_called()
 
     async def test_create_mw_case_9(self):
         """Test a fail case of the REST to create a maintenance window."""
@@ -315,19 +340,17 @@ class TestMain:
         assert (
             current_data["description"] == "Setting a maintenance status is not allowed"
         )
-        self.scheduler.add.assert_not_called()
+        self.scheduler.aadd.assert_not_called()
 
     async def test_get_mw_case_1(self):
         """Test get all maintenance windows, empty list."""
-        self.scheduler.list_maintenances.return_value = MaintenanceWindows.model_construct(
-            root=[]
-        )
+        self.scheduler.alist_maintenance_documents.return_value = []
         url = f"{self.base_endpoint}"
         response = await self.api.get(url)
         current_data = response.json()
         assert response.status_code == 200
         assert current_data == []
-        self.scheduler.list_maintenances.assert_called_once()
+        self.scheduler.alist_maintenance_documents.assert_called_once()
 
     async def test_get_mw_case_2(self):
         """Test get all maintenance windows."""
@@ -336,34 +359,32 @@ class TestMain:
         end1 = start1 + timedelta(hours=6)
         start2 = datetime.now(pytz.utc) + timedelta(hours=5)
         end2 = start2 + timedelta(hours=1, minutes=30)
-        self.scheduler.list_maintenances.return_value = MaintenanceWindows.model_construct(
-            root=[
-                MW.model_construct(
-                    id="1234",
-                    start=start1.replace(microsecond=0),
-                    end=end1.replace(microsecond=0),
-                    switches=["00:00:00:00:00:00:12:23"],
-                    description="",
-                    links=[],
-                    interfaces=[],
-                    status="pending",
-                    updated_at=now.replace(microsecond=0),
-                    inserted_at=now.replace(microsecond=0),
-                ),
-                MW.model_construct(
-                    id="4567",
-                    start=start2.replace(microsecond=0),
-                    end=end2.replace(microsecond=0),
-                    switches=["12:34:56:78:90:ab:cd:ef"],
-                    description="",
-                    links=[],
-                    interfaces=[],
-                    status="pending",
-                    updated_at=now.replace(microsecond=0),
-                    inserted_at=now.replace(microsecond=0),
-                ),
-            ]
-        )
+        self.scheduler.alist_maintenance_documents.return_value = [
+            dict(
+                id="1234",
+                start=start1.replace(microsecond=0),
+                end=end1.replace(microsecond=0),
+                switches=["00:00:00:00:00:00:12:23"],
+                description="",
+                links=[],
+                interfaces=[],
+                status="pending",
+                updated_at=now.replace(microsecond=0),
+                inserted_at=now.replace(microsecond=0),
+            ),
+            dict(
+                id="4567",
+                start=start2.replace(microsecond=0),
+                end=end2.replace(microsecond=0),
+                switches=["12:34:56:78:90:ab:cd:ef"],
+                description="",
+                links=[],
+                interfaces=[],
+                status="pending",
+                updated_at=now.replace(microsecond=0),
+                inserted_at=now.replace(microsecond=0),
+            ),
+        ]
         mw_dict = [
             {
                 "id": "1234",
@@ -374,6 +395,8 @@ class TestMain:
                 "links": [],
                 "interfaces": [],
                 "status": "pending",
+                "recurrence": None,
+                "occurrence": 0,
                 "updated_at": now.strftime(TIME_FMT),
                 "inserted_at": now.strftime(TIME_FMT),
             },
@@ -386,6 +409,8 @@ class TestMain:
                 "links": [],
                 "interfaces": [],
                 "status": "pending",
+                "recurrence": None,
+                "occurrence": 0,
                 "updated_at": now.strftime(TIME_FMT),
                 "inserted_at": now.strftime(TIME_FMT),
             },
@@ -396,24 +421,24 @@ class TestMain:
         current_data = response.json()
         assert response.status_code == 200
         assert current_data == mw_dict
-        self.scheduler.list_maintenances.assert_called_once()
+        self.scheduler.alist_maintenance_documents.assert_called_once()
 
     async def test_get_mw_case_3(self):
         """Test get non-existent id."""
-        self.scheduler.get_maintenance.return_value = None
+        self.scheduler.aget_maintenance.return_value = None
         url = f"{self.base_endpoint}/2345"
         response = await self.api.get(url)
         current_data = response.json()
         assert response.status_code == 404
         assert current_data["description"] == "Maintenance with id 2345 not found"
-        self.scheduler.get_maintenance.assert_called_once_with("2345")
+        self.scheduler.aget_maintenance.assert_called_once_with("2345")
 
     async def test_get_mw_case_4(self):
         """Test get existent id."""
         now = datetime.now(pytz.utc)
         start2 = datetime.now(pytz.utc) + timedelta(hours=5)
         end2 = start2 + timedelta(hours=1, minutes=30)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="4567",
             start=start2.replace(microsecond=0),
             end=end2.replace(microsecond=0),
@@ -430,6 +455,8 @@ class TestMain:
             "links": [],
             "interfaces": [],
             "status": "pending",
+            "recurrence": None,
+            "occurrence": 0,
             "updated_at": now.strftime(TIME_FMT),
             "inserted_at": now.strftime(TIME_FMT),
         }
@@ -438,24 +465,24 @@ class TestMain:
         current_data = response.json()
         assert response.status_code == 200
         assert current_data == mw_dict
-        self.scheduler.get_maintenance.assert_called_once_with("4567")
+        self.scheduler.aget_maintenance.assert_called_once_with("4567")
 
     async def test_remove_mw_case_1(self):
         """Test remove non-existent id."""
-        self.scheduler.get_maintenance.return_value = None
+        self.scheduler.aget_maintenance.return_value = None
         url = f"{self.base_endpoint}/2345"
         response = await self.api.delete(url)
         current_data = response.json()
         assert response.status_code == 404
         assert current_data["description"] == "Maintenance with id 2345 not found"
-        self.scheduler.get_maintenance.assert_called_once_with("2345")
-        self.scheduler.remove.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("2345")
+        self.scheduler.aremove.assert_not_called()
 
     async def test_remove_mw_case_2(self):
         """Test remove existent id."""
         start1 = datetime.now(pytz.utc) + timedelta(hours=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -468,14 +495,14 @@ class TestMain:
         assert current_data == {
             "response": "Maintenance with id 1234 " "successfully removed"
         }
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.remove.assert_called_once_with("1234")
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aremove.assert_called_once_with("1234")
 
     async def test_remove_mw_case_3(self):
         """Test remove existent id."""
         start1 = datetime.now(pytz.utc) - timedelta(days=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -490,14 +517,14 @@ class TestMain:
             current_data["description"]
             == "Deleting a running maintenance is not allowed"
         )
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.remove.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aremove.assert_not_called()
 
     async def test_update_mw_case_1(self):
         """Test update non-existent id."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(days=1)
-        self.scheduler.get_maintenance.return_value = None
+        self.scheduler.aget_maintenance.return_value = None
         payload = {
             "start": start1.strftime(TIME_FMT),
         }
@@ -506,27 +533,34 @@ class TestMain:
         current_data = response.json()
         assert response.status_code == 404
         assert current_data["description"] == "Maintenance with id 2345 not found"
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_update_mw_case_2(self):
-        """Test update missing required field."""
+        """Test update clearing a required field."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(days=1)
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
+            id="1234",
+            start=start1.replace(microsecond=0),
+            end=start1.replace(microsecond=0) + timedelta(hours=6),
+            switches=["00:00:00:00:00:00:12:23"],
+        )
         payload = {
-            "end": start1.strftime(TIME_FMT),
+            "start": None,
         }
         url = f"{self.base_endpoint}/1234"
         response = await self.api.patch(url, json=payload)
         current_data = response.json()
         assert response.status_code == 400
-        assert "Field required" in current_data["description"]
+        assert "start: Input should be a valid datetime" in current_data["description"]
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_update_mw_case_3(self):
         """Test successful update."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(days=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -541,8 +575,8 @@ class TestMain:
         current_data = response.json()
         assert current_data == {"response": "Maintenance 1234 updated"}
         assert response.status_code == 200
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.update.assert_called_once_with(
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aupdate.assert_called_once_with(
             MW.model_construct(
                 id="1234",
                 start=start_new.replace(microsecond=0),
@@ -556,7 +590,7 @@ class TestMain:
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(days=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -571,15 +605,15 @@ class TestMain:
         current_data = response.json()
         assert response.status_code == 400
         assert current_data["description"] == "start: Value error, Start in the past not allowed"
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_update_mw_case_5(self):
         """Test successful update."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(days=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -596,15 +630,15 @@ class TestMain:
         current_data = response.json()
         assert response.status_code == 400
         assert current_data["description"] == "end: Value error, End before start not allowed"
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_update_mw_case_6(self):
         """Test successful update."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(days=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -626,15 +660,15 @@ class TestMain:
             current_data["description"]
             == ": Value error, At least one item must be provided"
         )
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_update_mw_case_7(self):
         """Test successful update."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(days=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -651,11 +685,11 @@ class TestMain:
             current_data["description"]
             == "Updating a maintenance status is not allowed"
         )
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_end_mw_case_1(self):
         """Test method that finishes the maintenance now."""
-        self.scheduler.get_maintenance.return_value = None
+        self.scheduler.aget_maintenance.return_value = None
         url = f"{self.base_endpoint}/2345/end"
         response = await self.api.patch(url)
         current_data = response.json()
@@ -666,7 +700,7 @@ class TestMain:
         """Test method that finishes the maintenance now."""
         start1 = datetime.now(pytz.utc) - timedelta(hours=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -677,7 +711,7 @@ class TestMain:
         response = await self.api.patch(url)
         current_data = response.json()
         self.scheduler.get.asssert_called_once_with("1234")
-        self.scheduler.end_maintenance_early.assert_called_once_with("1234")
+        self.scheduler.aend_maintenance_early.assert_called_once_with("1234")
         assert response.status_code == 200
         assert current_data == {"response": "Maintenance window 1234 finished"}
 
@@ -685,7 +719,7 @@ class TestMain:
         """Test method that finishes the maintenance now."""
         start1 = datetime.now(pytz.utc) + timedelta(hours=1)
         end1 = start1 + timedelta(hours=6)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -696,7 +730,7 @@ class TestMain:
         response = await self.api.patch(url)
         current_data = response.json()
         self.scheduler.get.asssert_called_once_with("1234")
-        self.scheduler.end_maintenance_early.assert_not_called()
+        self.scheduler.aend_maintenance_early.assert_not_called()
         assert response.status_code == 400
         assert (
             current_data["description"] == "Maintenance window 1234 has not yet started"
@@ -706,7 +740,7 @@ class TestMain:
         """Test method that finishes the maintenance now."""
         start1 = datetime.now(pytz.utc) - timedelta(hours=5)
         end1 = start1 + timedelta(hours=4)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -717,7 +751,7 @@ class TestMain:
         response = await self.api.patch(url)
         current_data = response.json()
         self.scheduler.get.asssert_called_once_with("1234")
-        self.scheduler.end_maintenance_early.assert_not_called()
+        self.scheduler.aend_maintenance_early.assert_not_called()
         assert response.status_code == 400
         assert (
             current_data["description"]
@@ -729,7 +763,7 @@ class TestMain:
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) - timedelta(hours=3)
         end1 = (start1 + timedelta(hours=4)).replace(microsecond=0)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1,
@@ -740,8 +774,8 @@ class TestMain:
         payload = {"minutes": 45, "days": 1}
         response = await self.api.patch(url, json=payload)
         assert response.status_code == 200
-        self.scheduler.get_maintenance.called_with("1234")
-        self.scheduler.update.assert_called_with(
+        self.scheduler.aget_maintenance.called_with("1234")
+        self.scheduler.aupdate.assert_called_with(
             MW.model_construct(
                 id="1234",
                 start=start1.replace(microsecond=0),
@@ -751,6 +785,23 @@ class TestMain:
             )
         )
 
+    async def test_extend_recurring(self):
+        """Test recurring windows are not extended."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) - timedelta(hours=1)
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
+            id="1234",
+            start=start,
+            end=start + timedelta(hours=2),
+            switches=["00:00:00:00:00:00:12:23"],
+            status="running",
+            recurrence="FREQ=DAILY",
+        )
+        url = f"{self.base_endpoint}/1234/extend"
+        response = await self.api.patch(url, json={"minutes": 45})
+        assert response.status_code == 400
+        self.scheduler.aupdate.assert_not_called()
+
     async def test_extend_case_2(self):
         """Test no payload error."""
         self.napp.controller.loop = asyncio.get_running_loop()
@@ -759,7 +810,7 @@ class TestMain:
         assert response.status_code == 400
         current_data = response.json()
         assert "Missing required request body" in current_data["description"]
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_extend_case_3(self):
         """Test payload with unknown field."""
@@ -770,7 +821,7 @@ class TestMain:
         assert response.status_code == 400
         current_data = response.json()
         assert "'unknown' was unexpected" in current_data["description"]
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_extend_case_4(self):
         """Test no integer extension minutes."""
@@ -781,14 +832,14 @@ class TestMain:
         assert response.status_code == 400
         current_data = response.json()
         assert "'240' is not of type 'integer'" in current_data["description"]
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_extend_case_5(self):
         """Test maintenance did not start."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) + timedelta(hours=3)
         end1 = start1 + timedelta(hours=4)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -803,15 +854,15 @@ class TestMain:
         assert (
             current_data["description"] == "Maintenance window 1234 has not yet started"
         )
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_extend_case_6(self):
         """Test maintenance already finished."""
         self.napp.controller.loop = asyncio.get_running_loop()
         start1 = datetime.now(pytz.utc) - timedelta(hours=3)
         end1 = start1 + timedelta(hours=2)
-        self.scheduler.get_maintenance.return_value = MW.model_construct(
+        self.scheduler.aget_maintenance.return_value = MW.model_construct(
             id="1234",
             start=start1.replace(microsecond=0),
             end=end1.replace(microsecond=0),
@@ -827,18 +878,446 @@ class TestMain:
             current_data["description"]
             == "Maintenance window 1234 has already finished"
         )
-        self.scheduler.get_maintenance.assert_called_once_with("1234")
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("1234")
+        self.scheduler.aupdate.assert_not_called()
 
     async def test_extend_case_7(self):
         """Test no maintenace found."""
         self.napp.controller.loop = asyncio.get_running_loop()
-        self.scheduler.get_maintenance.return_value = None
+        self.scheduler.aget_maintenance.return_value = None
         url = f"{self.base_endpoint}/1235/extend"
         payload = {"minutes": 240}
         response = await self.api.patch(url, json=payload)
         assert response.status_code == 404
         current_data = response.json()
         assert current_data["description"] == "Maintenance with id 1235 not found"
-        self.scheduler.get_maintenance.assert_called_once_with("1235")
-        self.scheduler.update.assert_not_called()
+        self.scheduler.aget_maintenance.assert_called_once_with("1235")
+        self.scheduler.aupdate.assert_not_called()
+
+    async def test_report_mw(self):
+        """Test simulating a maintenance window."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) + timedelta(days=1)
+        end = start + timedelta(hours=2)
+        self.napp.maintenance_deployer = MagicMock()
+        self.napp.maintenance_deployer.simulate_mw.return_value = {
+            "switches": ["00:00:00:00:00:00:00:01"],
+            "interfaces": ["00:00:00:00:00:00:00:01:1"],
+            "links": ["some_link"],
+        }
+        self.scheduler.get_overlapping.return_value = MaintenanceWindows.model_construct(
+            root=[MW.model_construct(id="4567")]
+        )
+        payload = {
+            "id": "1234",
+            "start": start.strftime(TIME_FMT),
+            "end": end.strftime(TIME_FMT),
+            "switches": ["00:00:00:00:00:00:00:01"],
+            "force": True,
+        }
+        url = f"{self.base_endpoint}/report"
+        response = await self.api.post(url, json=payload)
+        assert response.status_code == 200
+        assert response.json() == {
+            "mw_id": "1234",
+            "switches": ["00:00:00:00:00:00:00:01"],
+            "interfaces": ["00:00:00:00:00:00:00:01:1"],
+            "links": ["some_link"],
+            "overlapping": ["4567"],
+        }
+        args, kwargs = self.scheduler.get_overlapping.call_args
+        assert args[0].id == "1234"
+        assert kwargs == {"force": True}
+        self.scheduler.aadd.assert_not_called()
+
+    async def test_report_mw_invalid(self):
+        """Test simulating an invalid maintenance window."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        url = f"{self.base_endpoint}/report"
+        payload = {"switches": ["00:00:00:00:00:00:00:01"]}
+        response = await self.api.post(url, json=payload)
+        assert response.status_code == 400
+        self.scheduler.get_overlapping.assert_not_called()
+
+    def test_handle_interface_changed(self):
+        """Test interface events invalidate the switch closure."""
+        self.napp.maintenance_deployer = MagicMock()
+        interface = MagicMock()
+        interface.switch.id = "00:00:00:00:00:00:00:01"
+        event = MagicMock(content={"interface": interface})
+        self.napp.handle_interface_changed(event)
+        self.napp.maintenance_deployer.refresh_topology.assert_called_once_with(
+            ["00:00:00:00:00:00:00:01"]
+        )
+
+    def test_handle_link_changed(self):
+        """Test link events invalidate the endpoint switch closures."""
+        self.napp.maintenance_deployer = MagicMock()
+        link = MagicMock()
+        link.endpoint_a.switch.id = "00:00:00:00:00:00:00:01"
+        link.endpoint_b.switch.id = "00:00:00:00:00:00:00:02"
+        event = MagicMock(content={"link": link})
+        self.napp.handle_link_changed(event)
+        self.napp.maintenance_deployer.refresh_topology.assert_called_once_with(
+            ["00:00:00:00:00:00:00:01", "00:00:00:00:00:00:00:02"]
+        )
+
+    async def test_get_mw_paginated(self):
+        """Test getting a filtered and projected page of windows."""
+        start = datetime.now(pytz.utc).replace(microsecond=0) + timedelta(days=1)
+        self.scheduler.alist_maintenance_documents.return_value = [
+            {"id": "1234", "start": start},
+            {"id": "4567", "start": start},
+            {"id": "7890", "start": start},
+        ]
+        url = (
+            f"{self.base_endpoint}?status=pending,running&switch=00:00:00:00:00:00:00:01"
+            "&fields=id&limit=2"
+        )
+        response = await self.api.get(url)
+        assert response.status_code == 200
+        assert response.json() == [{"id": "1234"}, {"id": "4567"}]
+        cursor = response.headers["X-Next-Cursor"]
+
+        args, kwargs = self.scheduler.alist_maintenance_documents.call_args
+        window_filter = args[0]
+        assert window_filter.status == ["pending", "running"]
+        assert window_filter.switches == ["00:00:00:00:00:00:00:01"]
+        assert kwargs == {
+            "fields": ["id"],
+            "limit": 3,
+            "after": None,
+            "archived": False,
+        }
+
+        self.scheduler.alist_maintenance_documents.return_value = [
+            {"id": "7890", "start": start},
+        ]
+        response = await self.api.get(f"{url}&cursor={cursor}")
+        assert response.status_code == 200
+        assert response.json() == [{"id": "7890"}]
+        assert "X-Next-Cursor" not in response.headers
+        _, kwargs = self.scheduler.alist_maintenance_documents.call_args
+        assert kwargs["after"] == (start, "4567")
+
+    async def test_get_mw_archived(self):
+        """Test getting windows including the archived ones."""
+        self.scheduler.alist_maintenance_documents.return_value = []
+        response = await self.api.get(f"{self.base_endpoint}?archived=true")
+        assert response.status_code == 200
+        _, kwargs = self.scheduler.alist_maintenance_documents.call_args
+        assert kwargs["archived"] is True
+
+    async def test_get_metrics(self):
+        """Test getting the metrics in the Prometheus text format."""
+        self.scheduler.window_cache.hits = 3
+        self.scheduler.window_cache.misses = 1
+        self.scheduler.alist_maintenance_documents.return_value = []
+        await self.api.get(f"{self.base_endpoint}")
+        response = await self.api.get(f"{self.base_endpoint}/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'maintenance_rest_request_seconds_count{handler="get_all_mw"}'
+            in response.text
+        )
+        assert (
+            'maintenance_window_cache_requests_total{result="hit"} 3.0'
+            in response.text
+        )
+        self.scheduler.aget_maintenance.assert_not_called()
+
+    @patch("napps.kytos.maintenance.main.settings")
+    def test_execute_archive(self, settings):
+        """Test archiving finished windows."""
+        settings.ARCHIVE_FINISHED_AFTER_DAYS = 0
+        self.napp.execute()
+        self.scheduler.archive_maintenances.assert_not_called()
+
+        settings.ARCHIVE_FINISHED_AFTER_DAYS = 30
+        settings.ARCHIVE_BATCH_SIZE = 100
+        self.scheduler.archive_maintenances.return_value = 5
+        now = datetime.now(pytz.utc)
+        self.napp.execute()
+        before, batch_size = self.scheduler.archive_maintenances.call_args[0]
+        assert batch_size == 100
+        assert now - timedelta(days=30) <= before
+        assert before <= datetime.now(pytz.utc) - timedelta(days=30)
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "status=unknown",
+            "since=2024-01-01T00:00:00",
+            "fields=unknown",
+            "limit=0",
+            "limit=many",
+            "cursor=invalid",
+            "archived=yes",
+        ],
+    )
+    async def test_get_mw_invalid_query(self, query):
+        """Test getting windows with invalid query arguments."""
+        response = await self.api.get(f"{self.base_endpoint}?{query}")
+        assert response.status_code == 400
+        self.scheduler.alist_maintenance_documents.assert_not_called()
+
+    async def test_create_mw_bulk(self):
+        """Test creating many maintenance windows at once."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) + timedelta(days=1)
+        end = start + timedelta(hours=2)
+        switches = {"00:00:00:00:00:00:00:01": 1}
+        self.controller.switches.get.side_effect = switches.get
+        self.scheduler.aadd_many.return_value = {
+            1: DuplicateKeyError("Window with id: 2 already exists"),
+        }
+        window = {
+            "start": start.strftime(TIME_FMT),
+            "end": end.strftime(TIME_FMT),
+            "switches": ["00:00:00:00:00:00:00:01"],
+        }
+        payload = {
+            "windows": [
+                {**window, "id": "1"},
+                {**window, "id": "2"},
+                {**window, "id": "3", "status": "running"},
+                {**window, "id": "4", "switches": ["00:00:00:00:00:00:00:02"]},
+                {**window, "id": "5", "end": start.strftime(TIME_FMT)},
+            ],
+            "force": True,
+        }
+        url = f"{self.base_endpoint}/bulk"
+        response = await self.api.post(url, json=payload)
+        assert response.status_code == 207
+        results = response.json()["windows"]
+        assert results[0] == {"mw_id": "1", "code": 201}
+        assert results[1]["code"] == 409
+        assert results[2] == {
+            "code": 400,
+            "description": "Setting a maintenance status is not allowed",
+        }
+        assert results[3]["code"] == 400
+        assert "non-existant items" in results[3]["description"]
+        assert results[4] == {
+            "code": 400,
+            "description": "end: Value error, End before start not allowed",
+        }
+        args, kwargs = self.scheduler.aadd_many.call_args
+        assert [window.id for window in args[0]] == ["1", "2"]
+        assert kwargs == {"force": True, "atomic": False}
+
+    async def test_create_mw_bulk_atomic(self):
+        """Test atomic bulk creation stops at any invalid window."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) + timedelta(days=1)
+        end = start + timedelta(hours=2)
+        window = {
+            "start": start.strftime(TIME_FMT),
+            "end": end.strftime(TIME_FMT),
+            "switches": ["00:00:00:00:00:00:00:01"],
+        }
+        payload = {
+            "windows": [window, {**window, "switches": []}],
+            "ignore_no_exists": True,
+            "atomic": True,
+        }
+        url = f"{self.base_endpoint}/bulk"
+        response = await self.api.post(url, json=payload)
+        assert response.status_code == 400
+        results = response.json()["windows"]
+        assert results[0] == {
+            "code": 400,
+            "description": "Window not created, other windows are invalid",
+        }
+        assert results[1]["code"] == 400
+        self.scheduler.aadd_many.assert_not_called()
+
+    async def test_create_mw_bulk_invalid(self):
+        """Test bulk creation with an invalid body."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        url = f"{self.base_endpoint}/bulk"
+        response = await self.api.post(url, json={"windows": []})
+        assert response.status_code == 400
+        response = await self.api.post(url, json=[{"id": "1"}])
+        assert response.status_code == 400
+        self.scheduler.aadd_many.assert_not_called()
+
+    async def test_remove_mw_bulk(self):
+        """Test deleting many maintenance windows at once."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) + timedelta(days=1)
+        pending = MW.model_construct(
+            id="1",
+            start=start,
+            end=start + timedelta(hours=1),
+            switches=["00:00:00:00:00:00:00:01"],
+            status="pending",
+        )
+        running = pending.copy(update={"id": "2", "status": "running"})
+        self.scheduler.alist_maintenances.return_value = MaintenanceWindows.model_construct(
+            root=[pending, running]
+        )
+        payload = {"mw_ids": ["1", "2", "3"]}
+        url = f"{self.base_endpoint}/bulk/delete"
+        response = await self.api.post(url, json=payload)
+        assert response.status_code == 207
+        assert response.json()["windows"] == [
+            {"mw_id": "3", "code": 404, "description": "Maintenance with id 3 not found"},
+            {"mw_id": "1", "code": 200},
+            {
+                "mw_id": "2",
+                "code": 400,
+                "description": "Deleting a running maintenance is not allowed",
+            },
+        ]
+        args, _ = self.scheduler.alist_maintenances.call_args
+        assert args[0].ids == ["1", "2", "3"]
+        self.scheduler.aremove_many.assert_called_once_with([pending])
+
+    async def test_end_mw_bulk(self):
+        """Test ending many maintenance windows selected by a filter."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) - timedelta(hours=1)
+        running = MW.model_construct(
+            id="1",
+            start=start,
+            end=start + timedelta(hours=2),
+            switches=["00:00:00:00:00:00:00:01"],
+            status="running",
+        )
+        self.scheduler.alist_maintenances.return_value = MaintenanceWindows.model_construct(
+            root=[running]
+        )
+        payload = {"filter": {"status": ["running"], "switches": running.switches}}
+        url = f"{self.base_endpoint}/bulk/end"
+        response = await self.api.post(url, json=payload)
+        assert response.status_code == 200
+        assert response.json()["windows"] == [{"mw_id": "1", "code": 200}]
+        args, _ = self.scheduler.alist_maintenances.call_args
+        assert args[0].status == ["running"]
+        assert args[0].switches == running.switches
+        self.scheduler.aend_maintenances_early.assert_called_once_with([running])
+
+    async def test_extend_mw_bulk(self):
+        """Test extending many running maintenance windows at once."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) - timedelta(hours=1)
+        running = MW.model_construct(
+            id="1",
+            start=start,
+            end=start + timedelta(hours=2),
+            switches=["00:00:00:00:00:00:00:01"],
+            status="running",
+        )
+        finished = running.copy(update={"id": "2", "status": "finished"})
+        self.scheduler.alist_maintenances.return_value = MaintenanceWindows.model_construct(
+            root=[running, finished]
+        )
+        payload = {"mw_ids": ["1", "2"], "extension": {"minutes": 30}}
+        url = f"{self.base_endpoint}/bulk/extend"
+        response = await self.api.post(url, json=payload)
+        assert response.status_code == 207
+        assert response.json()["windows"] == [
+            {"mw_id": "1", "code": 200},
+            {
+                "mw_id": "2",
+                "code": 400,
+                "description": "Maintenance window 2 has already finished",
+            },
+        ]
+        self.scheduler.aupdate_many.assert_called_once_with(
+            [running.copy(update={"end": running.end + timedelta(minutes=30)})]
+        )
+
+    async def test_mw_bulk_no_selection(self):
+        """Test bulk operations require mw_ids or a filter."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        url = f"{self.base_endpoint}/bulk/end"
+        response = await self.api.post(url, json={"mw_ids": []})
+        assert response.status_code == 400
+        self.scheduler.alist_maintenances.assert_not_called()
+
+    async def test_export_mw(self):
+        """Test exporting windows as newline delimited JSON."""
+        start = datetime.now(pytz.utc).replace(microsecond=0)
+        self.scheduler.aexport_maintenances.return_value = aiter_batches([
+            [
+                {"id": "1234", "start": start, "status": "finished"},
+                {"id": "4567", "start": start, "status": "finished"},
+            ],
+            [{"id": "7890", "start": start, "status": "finished"}],
+        ])
+        url = f"{self.base_endpoint}/export?status=finished&since=2019-01-01T00:00:00Z"
+        response = await self.api.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line)["id"] for line in lines] == ["1234", "4567", "7890"]
+        assert json.loads(lines[0])["start"] == start.strftime(TIME_FMT)
+        args, kwargs = self.scheduler.aexport_maintenances.call_args
+        assert args[0].status == ["finished"]
+        assert args[0].since == datetime(2019, 1, 1, tzinfo=timezone.utc)
+        assert kwargs["archived"] is False
+
+        self.scheduler.aexport_maintenances.return_value = aiter_batches([])
+        response = await self.api.get(f"{self.base_endpoint}/export?archived=true")
+        assert response.status_code == 200
+        assert self.scheduler.aexport_maintenances.call_args[1]["archived"] is True
+
+        response = await self.api.get(f"{self.base_endpoint}/export?status=unknown")
+        assert response.status_code == 400
+        response = await self.api.get(f"{self.base_endpoint}/export?archived=maybe")
+        assert response.status_code == 400
+
+    async def test_import_mw(self):
+        """Test importing windows from NDJSON and CSV."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        start = datetime.now(pytz.utc) - timedelta(days=2)
+        end = start + timedelta(days=1)
+        self.scheduler.aimport_windows.return_value = ["2"]
+        window = {
+            "start": start.strftime(TIME_FMT),
+            "end": end.strftime(TIME_FMT),
+            "switches": ["00:00:00:00:00:00:00:01"],
+            "status": "finished",
+        }
+        body = "\n".join(
+            [
+                json.dumps({**window, "id": "1"}),
+                json.dumps({**window, "id": "2"}),
+                json.dumps({**window, "id": "3", "end": window["start"]}),
+            ]
+        )
+        url = f"{self.base_endpoint}/import"
+        response = await self.api.post(
+            url, content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 207
+        data = response.json()
+        assert data["imported"] == 1
+        assert data["skipped"] == ["2"]
+        assert [error["line"] for error in data["errors"]] == [3]
+        args, kwargs = self.scheduler.aimport_windows.call_args
+        assert [window.id for window in args[0]] == ["1", "2"]
+        assert kwargs == {"upsert": False}
+
+        self.scheduler.aimport_windows.return_value = []
+        body = (
+            "id,start,end,switches,status\n"
+            f"1,{window['start']},{window['end']},00:00:00:00:00:00:00:01,finished\n"
+        )
+        response = await self.api.post(
+            f"{url}?duplicates=upsert",
+            content=body,
+            headers={"Content-Type": "text/csv"},
+        )
+        assert response.status_code == 201
+        assert response.json() == {"imported": 1, "skipped": [], "errors": []}
+        _, kwargs = self.scheduler.aimport_windows.call_args
+        assert kwargs == {"upsert": True}
+
+        response = await self.api.post(f"{url}?format=xml", content=body)
+        assert response.status_code == 415
+        response = await self.api.post(f"{url}?duplicates=fail", content=body)
+        assert response.status_code == 400
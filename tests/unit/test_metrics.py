@@ -0,0 +1,156 @@
+"""Tests for the metrics module."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from napps.kytos.maintenance import metrics
+
+
+class TestMetrics:
+    """Test the counters, histograms and summaries."""
+
+    def test_counter(self):
+        """Test counters are kept by label values."""
+        counter = metrics.Counter("test_total", "Test counter.", ("kind",))
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        counter.inc(kind="b")
+        assert counter.get(kind="a") == 3
+        assert counter.get(kind="c") == 0
+        with pytest.raises(ValueError):
+            counter.inc(other="a")
+        assert metrics.format_metric(
+            counter.name, counter.kind, counter.documentation, counter.samples()
+        ) == (
+            "# HELP test_total Test counter.\n"
+            "# TYPE test_total counter\n"
+            'test_total{kind="a"} 3.0\n'
+            'test_total{kind="b"} 1.0\n'
+        )
+        counter.clear()
+        assert not list(counter.samples())
+
+    def test_call_counter(self):
+        """Test call counters keep counting with bound incrementers."""
+        counter = metrics.CallCounter("test_total", "Test.", "kind", ("a", "b"))
+        count_a = counter.incrementer("a")
+        count_a()
+        count_a()
+        counter.inc(kind="b")
+        assert counter.get(kind="a") == 2
+        assert list(counter.samples()) == [
+            ("test_total", {"kind": "a"}, 2.0),
+            ("test_total", {"kind": "b"}, 1.0),
+        ]
+        with pytest.raises(ValueError):
+            counter.inc(other="a")
+        counter.clear()
+        assert not list(counter.samples())
+        count_a()
+        assert counter.get(kind="a") == 1
+        assert counter.get(kind="b") == 0
+
+    def test_histogram(self):
+        """Test observations are kept in cumulative buckets."""
+        histogram = metrics.Histogram("test", "Test.", buckets=(1, 5))
+        histogram.observe(0.5)
+        histogram.observe(1)
+        histogram.observe(3)
+        histogram.observe(10)
+        assert histogram.get() == 4
+        assert histogram.get_sum() == 14.5
+        assert list(histogram.samples()) == [
+            ("test_bucket", {"le": "1.0"}, 2),
+            ("test_bucket", {"le": "5.0"}, 3),
+            ("test_bucket", {"le": "+Inf"}, 4),
+            ("test_count", {}, 4),
+            ("test_sum", {}, 14.5),
+        ]
+
+    def test_summary(self):
+        """Test quantiles are taken from the last observations."""
+        summary = metrics.Summary("test", "Test.", size=4, quantiles=(0.5, 1))
+        for value in (100, 1, 2, 3, 4):
+            summary.observe(value)
+        assert summary.get() == [1, 2, 3, 4]
+        assert list(summary.samples()) == [
+            ("test", {"quantile": "0.5"}, 3),
+            ("test", {"quantile": "1.0"}, 4),
+            ("test_count", {}, 4),
+            ("test_sum", {}, 10),
+        ]
+
+    def test_label_escaping(self):
+        """Test label values are escaped."""
+        text = metrics.format_metric(
+            "test", "counter", "Test.", [("test", {"name": 'a"b\\c\n'}, 1)]
+        )
+        assert 'test{name="a\\"b\\\\c\\n"} 1.0' in text
+
+    def test_timed(self):
+        """Test sync and async functions are timed."""
+        histogram = metrics.Histogram("test", "Test.", ("name",))
+
+        @metrics.timed(histogram, "name", "sync")
+        def sync_func():
+            return 1
+
+        @metrics.timed(histogram, "name", "async")
+        async def async_func():
+            return 2
+
+        assert sync_func() == 1
+        assert asyncio.run(async_func()) == 2
+        assert sync_func.__name__ == "sync_func"
+        assert histogram.get(name="sync") == 1
+        assert histogram.get(name="async") == 1
+
+    def test_time_methods(self):
+        """Test the methods picked by the predicate are timed."""
+        histogram = metrics.Histogram("test", "Test.", ("method",))
+
+        @metrics.time_methods(histogram, "method", metrics.is_public)
+        class Timed:
+            """Class with timed methods."""
+
+            def public(self):
+                """Timed method."""
+                return self._private()
+
+            def _private(self):
+                return 1
+
+            def generator(self):
+                """Generator, left untimed."""
+                yield 1
+
+        timed = Timed()
+        assert timed.public() == 1
+        assert list(timed.generator()) == [1]
+        assert histogram.get(method="public") == 1
+        assert histogram.get(method="_private") == 0
+        assert histogram.get(method="generator") == 0
+
+    def test_observe_lag(self):
+        """Test the lag of jobs is observed."""
+        metrics.JOB_LAG.clear()
+        metrics.JOB_RECENT_LAG.clear()
+        assert metrics.observe_lag("start", None) is None
+        assert metrics.JOB_LAG.get(job="start") == 0
+        metrics.observe_lag("start", datetime.now(pytz.utc) - timedelta(seconds=2))
+        metrics.observe_lag("start", datetime.now(pytz.utc) + timedelta(seconds=2))
+        assert metrics.JOB_LAG.get(job="start") == 2
+        assert 2 <= metrics.JOB_LAG.get_sum(job="start") < 3
+        assert len(metrics.JOB_RECENT_LAG.get(job="start")) == 2
+
+    def test_render(self):
+        """Test every registered metric is rendered."""
+        metrics.clear()
+        metrics.STATUS_FUNC_CALLS.inc(kind="switch")
+        text = metrics.render()
+        for metric in metrics.REGISTRY:
+            assert f"# TYPE {metric.name} {metric.kind}\n" in text
+        assert 'maintenance_status_func_calls_total{kind="switch"} 1.0\n' in text
@@ -5,6 +5,9 @@ from datetime import datetime, timedelta, timezone
 import pytz
 from kytos.lib.helpers import get_controller_mock
 from napps.kytos.maintenance.models import MaintenanceWindow as MW, Status
+from napps.kytos.maintenance.models import Recurrence, parse_rrule, parse_time
+from napps.kytos.maintenance.models import validate_windows
+from pydantic import ValidationError
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
 
@@ -41,6 +44,8 @@ class TestMW:
             'interfaces': [],
             'links': [],
             'status': Status.PENDING,
+            'recurrence': None,
+            'occurrence': 0,
             'inserted_at': None,
             'updated_at': None,
         }
@@ -55,6 +60,15 @@ class TestMW:
             switches=self.switches,
         )
 
+    def test_start_in_past_allowed(self):
+        """Test the start check is skipped when importing windows."""
+        start = datetime.now(pytz.utc) - timedelta(days=1)
+        window = MW.model_validate(
+            {"start": start, "end": self.end, "switches": self.switches},
+            context={"allow_past_start": True},
+        )
+        assert window.start == start
+
     def test_end_before_start(self):
         end = datetime.now(pytz.utc) - timedelta(days=1)
 
@@ -77,3 +91,153 @@ class TestMW:
             {"start": self.start, "switches": self.switches}
         )
         assert window.end == datetime.max.replace(tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize(
+        "time",
+        [
+            "2030-01-02T03:04:05+0000",
+            "2030-01-02T03:04:05Z",
+            "2030-01-02T06:04:05+03:00",
+        ],
+    )
+    def test_parse_time(self, time):
+        """Test times are parsed as with TIME_FMT."""
+        assert parse_time(time) == datetime.strptime(time, TIME_FMT)
+        assert parse_time("2030-01-02T03:04:05.5+0000").microsecond == 500000
+        for invalid in ("2030-01-02T03:04:05", "2030-01-02", "tomorrow"):
+            with pytest.raises(ValueError, match="does not match format"):
+                parse_time(invalid)
+
+    def test_validate_changes(self):
+        """Test changes are validated, checking the start only if changed."""
+        start = self.start + timedelta(hours=1)
+        window = self.maintenance.validate_changes(
+            {"start": start.strftime(TIME_FMT), "force": True}
+        )
+        assert window.start == start.replace(microsecond=0)
+        assert window.end == self.end
+        assert self.maintenance.start == self.start
+
+        past = self.maintenance.model_copy(
+            update={"start": self.start - timedelta(days=2)}
+        )
+        assert past.validate_changes({"description": "x"}).description == "x"
+
+        cases = [
+            ({"start": self.end}, "End before start not allowed"),
+            ({"end": self.start}, "End before start not allowed"),
+            ({"switches": []}, "At least one item must be provided"),
+            ({"recurrence": "FREQ=HOURLY"}, "longer than their period"),
+            ({"occurrence": -1}, "greater than or equal to 0"),
+        ]
+        for changes, message in cases:
+            with pytest.raises(ValidationError, match=message):
+                self.maintenance.validate_changes(changes)
+
+    def test_validate_windows(self):
+        """Test validating many windows, locating the errors by position."""
+        item = {"start": self.start, "end": self.end, "switches": self.switches}
+        items = [item, {**item, "end": self.start}, item, {"switches": []}]
+        windows, errors = validate_windows(items)
+        assert [window.start for window in windows] == [self.start] * 2
+        assert list(errors) == [1, 3]
+        assert errors[1][0]["loc"] == ("end",)
+        assert {error["loc"] for error in errors[3]} == {("start",)}
+        windows, errors = validate_windows([item])
+        assert len(windows) == 1 and not errors
+
+    def test_parse_rrule(self):
+        """Test parsing the supported recurrence rules."""
+        assert parse_rrule("FREQ=WEEKLY;INTERVAL=2;COUNT=3") == Recurrence(
+            timedelta(weeks=2), 3
+        )
+        assert parse_rrule("RRULE:FREQ=daily;UNTIL=20300101T000000Z") == Recurrence(
+            timedelta(days=1), None, datetime(2030, 1, 1, tzinfo=timezone.utc)
+        )
+        for rule in [
+            "FREQ=MONTHLY",
+            "FREQ=DAILY;BYDAY=MO",
+            "FREQ=DAILY;COUNT=0",
+            "FREQ=DAILY;INTERVAL=x",
+            "FREQ=DAILY;COUNT=2;UNTIL=20300101T000000Z",
+            "FREQ=DAILY;FREQ=WEEKLY",
+            "FREQ=DAILY;UNTIL=2030",
+            "INTERVAL=2",
+        ]:
+            with pytest.raises(ValueError):
+                parse_rrule(rule)
+
+    def test_recurrence_validation(self):
+        """Test occurrences must not overlap each other."""
+        window = MW.model_validate({
+            "start": self.start,
+            "end": self.end,
+            "switches": self.switches,
+            "recurrence": "FREQ=DAILY;COUNT=2",
+        })
+        assert window.remaining_occurrences() == 2
+        assert window.last_end() == self.end + timedelta(days=1)
+        for data in [
+            {"recurrence": "FREQ=HOURLY"},
+            {"recurrence": "FREQ=DAILY", "end": None},
+            {"recurrence": "FREQ=DAILY;BYDAY=MO"},
+            {"recurrence": "FREQ=DAILY;COUNT=2", "occurrence": 2},
+            {"recurrence": "FREQ=DAILY;UNTIL=20000101T000000Z"},
+        ]:
+            with pytest.raises(ValueError):
+                MW.model_validate({**window.model_dump(), **data})
+
+    def test_occurrences(self):
+        """Test moving through the occurrences of a recurring window."""
+        window = self.maintenance.model_copy(
+            update={"recurrence": "FREQ=DAILY;COUNT=3"}
+        )
+        assert self.maintenance.next_occurrence() is None
+        second = window.next_occurrence()
+        assert (second.start, second.end) == (
+            self.start + timedelta(days=1), self.end + timedelta(days=1)
+        )
+        assert (second.occurrence, second.status) == (1, Status.PENDING)
+        assert second.next_occurrence().next_occurrence() is None
+
+        now = self.start + timedelta(days=1, hours=1)
+        assert window.catch_up(now) == second.model_copy(
+            update={"status": Status.RUNNING}
+        )
+        assert window.catch_up(now + timedelta(hours=6)).occurrence == 2
+        last = window.catch_up(now + timedelta(days=30))
+        assert (last.occurrence, last.status) == (2, Status.FINISHED)
+        endless = window.model_copy(update={"recurrence": "FREQ=DAILY"})
+        assert endless.remaining_occurrences() is None
+        assert endless.catch_up(now + timedelta(days=30)).occurrence == 31
+
+    @pytest.mark.parametrize(
+        "rule,other_rule,shift,expected",
+        [
+            (None, None, timedelta(hours=5), True),
+            (None, None, timedelta(hours=6), False),
+            ("FREQ=DAILY", None, timedelta(days=100), True),
+            ("FREQ=DAILY", None, timedelta(days=100, hours=6), False),
+            ("FREQ=DAILY;COUNT=3", None, timedelta(days=3), False),
+            ("FREQ=WEEKLY", "FREQ=WEEKLY", timedelta(days=1), False),
+            ("FREQ=WEEKLY", "FREQ=DAILY", timedelta(days=1), True),
+            ("FREQ=WEEKLY;INTERVAL=2", "FREQ=WEEKLY;INTERVAL=3",
+             timedelta(weeks=1), True),
+            ("FREQ=WEEKLY;INTERVAL=2", "FREQ=WEEKLY;INTERVAL=2",
+             timedelta(weeks=1), False),
+            ("FREQ=WEEKLY;INTERVAL=2;COUNT=2", "FREQ=WEEKLY;INTERVAL=3",
+             timedelta(weeks=1), False),
+        ],
+    )
+    def test_overlaps(self, rule, other_rule, shift, expected):
+        """Test occurrences of windows overlap when they share some time."""
+        window = self.maintenance.model_copy(update={"recurrence": rule})
+        other = self.maintenance.model_copy(
+            update={
+                "start": self.start + shift,
+                "end": self.end + shift,
+                "recurrence": other_rule,
+            }
+        )
+        assert window.overlaps(other) == expected
+        assert other.overlaps(window) == expected
@@ -0,0 +1,95 @@
+"""Tests for the serializers module."""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+import pytz
+
+from napps.kytos.maintenance import serializers
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.models import MaintenanceWindows
+from napps.kytos.maintenance.serializers import (
+    dump_window,
+    dump_windows,
+    dump_windows_ndjson,
+    format_datetime,
+)
+
+TIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
+
+
+class TestSerializers:
+    """Test the fast serialization of maintenance windows."""
+
+    def setup_method(self):
+        """Initialize before tests are executed."""
+        now = datetime.now(pytz.utc)
+        self.documents = [
+            {
+                "id": "1234",
+                "start": now,
+                "end": now + timedelta(hours=1),
+                "switches": ["00:00:00:00:00:00:00:01"],
+                "interfaces": [],
+                "links": ["link é"],
+                "description": 'a "quoted" description',
+                "status": "running",
+                "inserted_at": now.replace(tzinfo=None),
+                "updated_at": None,
+                "last_modified": now,
+            },
+            {
+                "id": "4567",
+                "start": now.astimezone(timezone(timedelta(hours=-3))),
+                "end": datetime.max.replace(tzinfo=timezone.utc),
+                "status": "pending",
+            },
+        ]
+
+    def expected(self) -> bytes:
+        windows = MaintenanceWindows.model_construct(
+            root=[MW.model_construct(**document) for document in self.documents]
+        )
+        return windows.json().encode()
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            datetime(2030, 1, 2, 3, 4, 5, 678, tzinfo=pytz.utc),
+            datetime(2030, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=5))),
+            datetime(2030, 1, 2, 3, 4, 5),
+            datetime(999, 1, 2, 3, 4, 5, tzinfo=pytz.utc),
+            datetime.max.replace(tzinfo=timezone.utc),
+        ],
+    )
+    def test_format_datetime(self, value):
+        """Test datetimes are formatted as with TIME_FMT."""
+        assert format_datetime(value) == value.strftime(TIME_FMT)
+
+    def test_dump_windows(self):
+        """Test windows are serialized as MaintenanceWindows.json() does."""
+        assert dump_windows(self.documents) == self.expected()
+
+    def test_dump_windows_without_orjson(self):
+        """Test the json module fallback gives the same result."""
+        with patch.object(serializers, "orjson", None):
+            assert dump_windows(self.documents) == self.expected()
+
+    def test_dump_windows_fields(self):
+        """Test only the given fields are serialized."""
+        start = format_datetime(self.documents[0]["start"])
+        assert dump_windows(self.documents[:1], ["id", "start"]) == (
+            f'[{{"start":"{start}","id":"1234"}}]'.encode()
+        )
+
+    def test_dump_window(self):
+        """Test a single window is serialized as its json() does."""
+        window = MW.model_construct(**self.documents[0])
+        assert dump_window(window) == window.json().encode()
+
+    def test_dump_windows_ndjson(self):
+        """Test windows are serialized as one JSON object per line."""
+        lines = dump_windows_ndjson(self.documents).split(b"\n")
+        assert lines[-1] == b""
+        assert b"[" + b",".join(lines[:-1]) + b"]" == self.expected()
+        assert dump_windows_ndjson([]) == b""
@@ -0,0 +1,107 @@
+"""Tests for the synthetic topologies and workloads."""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from threading import Lock
+
+import pytest
+import pytz
+
+from napps.kytos.maintenance.managers.deployer import MaintenanceDeployer
+from napps.kytos.maintenance.models import Status
+from napps.kytos.maintenance.tests import workload
+
+
+class TestWorkload:
+    """Test the topology and window generators."""
+
+    def setup_method(self):
+        """Initialize before tests are executed."""
+        self.topology = workload.make_topology(50, degree=3, seed=1)
+
+    def test_topology(self):
+        """Test topologies are connected and have the requested degree."""
+        assert len(self.topology.switches) == 50
+        assert len(self.topology.links) == 75
+        reached = set()
+        pending = [next(iter(self.topology.switches.values()))]
+        while pending:
+            switch = pending.pop()
+            if switch.id in reached:
+                continue
+            reached.add(switch.id)
+            for interface in switch.interfaces.values():
+                assert self.topology.get_interface_by_id(interface.id) is interface
+                assert interface.switch is switch
+                if interface.link is not None:
+                    link = interface.link
+                    assert interface in (link.endpoint_a, link.endpoint_b)
+                    pending.append(link.endpoint_a.switch)
+                    pending.append(link.endpoint_b.switch)
+        assert reached == set(self.topology.switches)
+        linked = sum(
+            interface.link is not None
+            for interface in self.topology.interfaces.values()
+        )
+        assert len(self.topology.interfaces) == linked + 2 * 50
+
+        same = workload.make_topology(50, degree=3, seed=1)
+        assert list(same.links) == list(self.topology.links)
+        assert len(workload.make_topology(1).switches) == 1
+        assert len(workload.make_topology(4, degree=10).links) == 6
+
+    @pytest.mark.parametrize("durations", sorted(workload.DURATIONS))
+    def test_windows(self, durations):
+        """Test windows follow the requested overlap and durations."""
+        start = datetime.now(pytz.utc)
+        spec = workload.WindowSpec(
+            concurrency=4,
+            mean_duration=timedelta(hours=1),
+            durations=durations,
+            mix={"switches": 1, "interfaces": 1, "links": 2},
+            devices=4,
+            start=start,
+            seed=2,
+        )
+        windows = workload.make_windows(self.topology, 2000, spec)
+        assert len({window.id for window in windows}) == 2000
+        assert all(window.status == Status.PENDING for window in windows)
+        starts = [window.start for window in windows]
+        assert starts == sorted(starts) and starts[0] > start
+        hours = [(w.end - w.start).total_seconds() / 3600 for w in windows]
+        assert 0.8 < sum(hours) / len(hours) < 1.2
+        span = (windows[-1].end - windows[0].start).total_seconds() / 3600
+        assert 3 < sum(hours) / span < 5
+
+        kinds = Counter()
+        for window in windows:
+            items = window.switches + window.interfaces + window.links
+            assert 1 <= len(items) <= 4
+            for kind in workload.DEVICE_KINDS:
+                kinds[kind] += len(getattr(window, kind))
+        assert kinds["switches"] < kinds["links"]
+        assert kinds["interfaces"] < kinds["links"]
+
+    def test_deployer(self):
+        """Test a workload can be deployed over its topology."""
+        controller = self.topology.controller()
+        deployer = MaintenanceDeployer(
+            controller, Counter(), Counter(), Counter(), Lock()
+        )
+        spec = workload.WindowSpec(
+            mix={"switches": 1, "interfaces": 1, "links": 1}, seed=3
+        )
+        windows = workload.make_windows(self.topology, 20, spec)
+        for window in windows:
+            deployer.start_mw(window)
+            affected = deployer.simulate_mw(window)
+            for switch_id in window.switches:
+                switch = self.topology.switches[switch_id]
+                assert {
+                    interface.id for interface in switch.interfaces.values()
+                } <= set(affected["interfaces"])
+            assert set(window.links) <= deployer.effective_links
+        for window in windows:
+            deployer.end_mw(window)
+        assert not deployer.effective_interfaces
+        assert len(controller.events) == 40
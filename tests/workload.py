@@ -0,0 +1,219 @@
+"""Synthetic topologies and maintenance window workloads.
+
+make_topology builds a connected graph of switches, interfaces and links
+with the attributes the NApp reads from the kytos ones, and make_windows
+a stream of windows over it, with the overlap, durations and mix of
+devices given by a WindowSpec. Both are deterministic for a given seed, so the same workload
+can be used by unit tests, benchmarks and the load replay command:
+
+    python -m tests.benchmarks.replay --switches 1000 --windows 10000
+"""
+
+import hashlib
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import pytz
+
+from napps.kytos.maintenance.models import MaintenanceWindow as MW
+from napps.kytos.maintenance.models import Status
+
+DEVICE_KINDS = ("switches", "interfaces", "links")
+
+# Samplers of window durations with the given mean
+DURATIONS: dict[str, Callable[[random.Random, float], float]] = {
+    "fixed": lambda rng, mean: mean,
+    "uniform": lambda rng, mean: rng.uniform(0, 2 * mean),
+    "exponential": lambda rng, mean: rng.expovariate(1 / mean),
+    # Lognormal with sigma 1, many short windows and a few long ones
+    "lognormal": lambda rng, mean: rng.lognormvariate(math.log(mean) - 0.5, 1),
+}
+
+
+class FakeSwitch:
+    """Switch with the attributes of kytos.core.switch.Switch the NApp
+    reads."""
+
+    __slots__ = ("id", "dpid", "interfaces")
+
+    def __init__(self, dpid: str):
+        self.id = self.dpid = dpid
+        self.interfaces: dict[int, FakeInterface] = {}
+
+
+class FakeInterface:
+    """Interface with the attributes of kytos.core.interface.Interface the
+    NApp reads."""
+
+    __slots__ = ("id", "port_number", "switch", "link")
+
+    def __init__(self, switch: FakeSwitch, port_number: int):
+        self.id = f"{switch.id}:{port_number}"
+        self.port_number = port_number
+        self.switch = switch
+        self.link: Optional[FakeLink] = None
+
+
+class FakeLink:
+    """Link with the attributes of kytos.core.link.Link the NApp reads.
+    Its ID is derived from the endpoints as kytos does."""
+
+    __slots__ = ("id", "endpoint_a", "endpoint_b")
+
+    def __init__(self, endpoint_a: FakeInterface, endpoint_b: FakeInterface):
+        self.endpoint_a = endpoint_a
+        self.endpoint_b = endpoint_b
+        ids = sorted((endpoint_a.id, endpoint_b.id))
+        self.id = hashlib.sha256("".join(ids).encode()).hexdigest()
+
+
+class Topology:
+    """Switches, interfaces and links of a synthetic network."""
+
+    def __init__(self):
+        self.switches: dict[str, FakeSwitch] = {}
+        self.interfaces: dict[str, FakeInterface] = {}
+        self.links: dict[str, FakeLink] = {}
+
+    def get_interface_by_id(self, interface_id: str) -> Optional[FakeInterface]:
+        """Get an interface by ID, as the kytos controller does."""
+        return self.interfaces.get(interface_id)
+
+    def add_switch(self, dpid: str) -> FakeSwitch:
+        """Add a switch without interfaces."""
+        switch = self.switches[dpid] = FakeSwitch(dpid)
+        return switch
+
+    def add_interface(self, switch: FakeSwitch) -> FakeInterface:
+        """Add an interface on the next port of a switch."""
+        interface = FakeInterface(switch, len(switch.interfaces) + 1)
+        switch.interfaces[interface.port_number] = interface
+        self.interfaces[interface.id] = interface
+        return interface
+
+    def add_link(self, switch_a: FakeSwitch, switch_b: FakeSwitch) -> FakeLink:
+        """Link two switches through new interfaces."""
+        link = FakeLink(self.add_interface(switch_a), self.add_interface(switch_b))
+        link.endpoint_a.link = link.endpoint_b.link = link
+        self.links[link.id] = link
+        return link
+
+    def install(self, controller):
+        """Make the controller, usually a mock, serve this topology."""
+        controller.switches = self.switches
+        controller.links = self.links
+        controller.get_interface_by_id = self.get_interface_by_id
+        return controller
+
+    def controller(self) -> SimpleNamespace:
+        """Create a controller serving this topology, keeping the events
+        put in its app buffer in its events list."""
+        events = []
+        return self.install(
+            SimpleNamespace(
+                events=events,
+                buffers=SimpleNamespace(app=SimpleNamespace(put=events.append)),
+            )
+        )
+
+
+def make_topology(
+    switches: int,
+    degree: float = 2.0,
+    access_ports: int = 2,
+    seed: int = 0,
+) -> Topology:
+    """Create a connected topology of the given number of switches.
+
+    Switches are linked along a random spanning tree, then random pairs
+    of switches are linked until switches have degree links on average.
+    Each switch also gets access_ports interfaces without links.
+    """
+    rng = random.Random(seed)
+    topology = Topology()
+    nodes = [topology.add_switch(f"{number:016x}") for number in range(switches)]
+    pairs = set()
+    for number in range(1, switches):
+        pairs.add((rng.randrange(number), number))
+    wanted = min(
+        max(len(pairs), round(switches * degree / 2)),
+        switches * (switches - 1) // 2,
+    )
+    while len(pairs) < wanted:
+        pair = tuple(sorted(rng.sample(range(switches), 2)))
+        pairs.add(pair)
+    for number_a, number_b in sorted(pairs):
+        topology.add_link(nodes[number_a], nodes[number_b])
+    for switch in nodes:
+        for _ in range(access_ports):
+            topology.add_interface(switch)
+    return topology
+
+
+@dataclass
+class WindowSpec:
+    """Knobs of the windows created by make_windows.
+
+    Windows start at random after start, a day from now by default, with
+    concurrency windows running at the same time on average, and last a
+    duration drawn from the durations sampler with mean_duration as mean.
+    Each window holds 1 to devices devices, of the kinds weighted by mix.
+    """
+
+    concurrency: float = 1.0
+    mean_duration: timedelta = timedelta(hours=2)
+    durations: str = "exponential"
+    mix: dict[str, float] = field(default_factory=lambda: {"switches": 1})
+    devices: int = 3
+    start: Optional[datetime] = None
+    seed: int = 0
+
+
+def _pick_devices(
+    rng: random.Random, spec: WindowSpec, pools: dict[str, list[str]]
+) -> dict[str, list[str]]:
+    """Pick the devices of a window, by kind."""
+    kinds = list(spec.mix)
+    weights = [spec.mix[kind] for kind in kinds]
+    items = {kind: set() for kind in DEVICE_KINDS}
+    for kind in rng.choices(kinds, weights, k=rng.randint(1, spec.devices)):
+        items[kind].add(rng.choice(pools[kind]))
+    return {kind: sorted(ids) for kind, ids in items.items()}
+
+
+def make_windows(
+    topology: Topology, count: int, spec: Optional[WindowSpec] = None
+) -> list[MW]:
+    """Create count pending windows over a topology, sorted by start, as
+    described by spec. Windows are built without validation, so they may
+    overlap each other.
+    """
+    spec = spec or WindowSpec()
+    rng = random.Random(spec.seed)
+    pools = {kind: list(getattr(topology, kind)) for kind in DEVICE_KINDS}
+    sample_duration = DURATIONS[spec.durations]
+    mean = spec.mean_duration.total_seconds()
+    time = spec.start or datetime.now(pytz.utc) + timedelta(days=1)
+    windows = []
+    for _ in range(count):
+        time += timedelta(seconds=rng.expovariate(spec.concurrency / mean))
+        devices = _pick_devices(rng, spec, pools)
+        windows.append(
+            MW.model_construct(
+                id=f"{rng.getrandbits(128):032x}",
+                description="",
+                start=time,
+                end=time + timedelta(seconds=max(1.0, sample_duration(rng, mean))),
+                status=Status.PENDING,
+                recurrence=None,
+                occurrence=0,
+                inserted_at=None,
+                updated_at=None,
+                **devices,
+            )
+        )
+    return windows